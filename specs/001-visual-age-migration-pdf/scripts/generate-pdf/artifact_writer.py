@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Artifact Writer for Visual Age Migration PDF Generation
+Writes generated files atomically and only when their content changed
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Union
+
+from extraction_cache import content_hash, file_hash
+
+
+def write_if_changed(path: Union[str, Path], content: Union[str, bytes]) -> bool:
+    """Write ``content`` (text as UTF-8) to ``path`` unless the file already holds it
+
+    Returns whether the file was written. An unchanged file keeps its
+    modification time, so pdflatex, diagram renders and file watchers see
+    nothing to redo. A new version goes to a temporary file in the same
+    directory and is renamed over the old one, so a reader sees the old
+    file or the new one, never part of it, even with concurrent builds.
+    """
+    path = Path(path)
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    if path.is_file() and path.stat().st_size == len(data) and file_hash(str(path)) == content_hash(data):
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mode = path.stat().st_mode & 0o7777 if path.exists() else 0o644
+    descriptor, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_name, mode)
+        os.replace(temp_name, path)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+        raise
+    return True
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark for user story extraction
+Compares the line-oriented parser against the previous DOTALL regex on
+synthetic specs with 10, 1,000 and 10,000 stories
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from content_extractor import parse_user_stories
+
+
+# Pattern used by ContentExtractor.extract_user_stories before the state machine parser
+LEGACY_STORY_PATTERN = r'### User Story (\d+) - ([^(]+)\(Priority: (P\d+)\)\n\n(.*?)\n\n\*\*Why this priority\*\*: (.*?)\n\n\*\*Independent Test\*\*: (.*?)\n\n\*\*Acceptance Scenarios\*\*:(.*?)(?=---|\Z)'
+LEGACY_SCENARIO_PATTERN = r'\d+\. \*\*Given\*\* (.*?), \*\*When\*\* (.*?), \*\*Then\*\* (.*?)(?=\n\d+\.|\Z)'
+
+
+def legacy_parse(content: str) -> int:
+    """Run the previous regex extraction and return the number of stories found"""
+    count = 0
+    for match in re.findall(LEGACY_STORY_PATTERN, content, re.DOTALL):
+        re.findall(LEGACY_SCENARIO_PATTERN, match[6], re.DOTALL)
+        count += 1
+    return count
+
+
+def build_spec(story_count: int, malformed_every: int = 0) -> str:
+    """Build a synthetic spec; every ``malformed_every``-th story lacks its Independent Test"""
+    parts = ['# Feature Specification\n\n## User Scenarios & Testing\n']
+    for n in range(1, story_count + 1):
+        parts.append(f'### User Story {n} - Synthetic Story {n} (Priority: P{n % 5 + 1})\n\n')
+        parts.append(f'Operators need feature {n} to process claims end to end.\n\n')
+        parts.append(f'**Why this priority**: Feature {n} unblocks downstream work.\n\n')
+        if not (malformed_every and n % malformed_every == 0):
+            parts.append(f'**Independent Test**: Exercise feature {n} with a valid claim.\n\n')
+        parts.append('**Acceptance Scenarios**:\n\n')
+        for i in range(1, 4):
+            parts.append(f'{i}. **Given** claim {n}-{i} exists, **When** the operator submits it, '
+                         f'**Then** the system records operation {i}\n')
+        parts.append('\n---\n\n')
+    parts.append('## Requirements\n')
+    return ''.join(parts)
+
+
+def time_call(func, *args) -> float:
+    """Return the wall time of a single call in seconds"""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark and print a results table"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark user story extraction')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000],
+                        help='Story counts to generate')
+    parser.add_argument('--malformed-every', type=int, default=0,
+                        help='Drop the Independent Test line from every Nth story')
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help='Only time the line-oriented parser')
+
+    args = parser.parse_args()
+
+    print(f"{'stories':>8} {'size (KB)':>10} {'parser (ms)':>12} {'legacy (ms)':>12} {'diagnostics':>12}")
+    for size in args.sizes:
+        content = build_spec(size, args.malformed_every)
+        stories, diagnostics = parse_user_stories(content)
+        parser_time = time_call(parse_user_stories, content)
+        legacy_time = '-' if args.skip_legacy else f"{time_call(legacy_parse, content) * 1000:.1f}"
+        print(f"{size:>8} {len(content) / 1024:>10.1f} {parser_time * 1000:>12.1f} {legacy_time:>12} {len(diagnostics):>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Build Graph for Visual Age Migration PDF Generation
+Runs pipeline stages as a dependency graph and skips the ones whose inputs did not change
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Iterable, Optional, Tuple
+
+from artifact_writer import write_if_changed
+from extraction_cache import content_hash, file_hash
+
+
+MISSING = 'missing'
+
+
+def config_value(config: Dict[str, Any], key: str) -> Any:
+    """Value of a dotted key (``fpa_settings.rate_per_fp``), None when absent"""
+    value: Any = config
+    for part in key.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def value_hash(value: Any) -> str:
+    """Content hash of a JSON-serializable value, independent of key order"""
+    return content_hash(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str))
+
+
+class BuildError(Exception):
+    """Raised after a build in which stages failed; carries every failure and the stage records"""
+
+    def __init__(self, errors: Dict[str, BaseException], records: List[Dict]):
+        self.errors = errors
+        self.records = records
+        super().__init__('; '.join(f"{name}: {type(error).__name__}: {error}" for name, error in errors.items()))
+
+
+class StageOutput:
+    """``sys.stdout`` stand-in that sends what each pool thread prints to the buffer of the stage it runs
+
+    Threads without a stage buffer (the scheduler) write straight through.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def capture(self, buffer: Optional[io.StringIO]):
+        """Route the calling thread's output to ``buffer``, or back to the stream with None"""
+        self._local.buffer = buffer
+
+    def write(self, text: str) -> int:
+        return (getattr(self._local, 'buffer', None) or self.stream).write(text)
+
+    def flush(self):
+        if getattr(self._local, 'buffer', None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stream, name)
+
+
+class Stage:
+    """One pipeline step with its declared inputs and outputs
+
+    ``inputs`` are files or glob patterns, ``config`` dotted configuration
+    keys and ``params`` run options that affect the result; ``deps`` names
+    the stages whose results ``action`` receives, keyed by stage name.
+    ``outputs`` are the files the stage writes and ``tasks`` the task IDs
+    it completes. The action's return value must be JSON-serializable: it
+    is stored with the stamp and handed to dependent stages when the stage
+    is skipped. An ``always`` stage runs in every build, for checks of
+    state outside the declared inputs; its dependents still only run when
+    its result changes.
+    """
+
+    def __init__(self, name: str, action: Callable[[Dict[str, Any]], Any],
+                 inputs: Iterable[str] = (), config: Iterable[str] = (), params: Optional[Dict[str, Any]] = None,
+                 deps: Iterable[str] = (), outputs: Iterable[str] = (), tasks: Iterable[str] = (),
+                 always: bool = False):
+        self.name = name
+        self.action = action
+        self.inputs = list(inputs)
+        self.config = list(config)
+        self.params = dict(params or {})
+        self.deps = list(deps)
+        self.outputs = list(outputs)
+        self.tasks = list(tasks)
+        self.always = always
+
+
+class BuildGraph:
+    """Stages in dependency order with content-hash stamps kept in a JSON file
+
+    A stage's stamp records the hash of every input file, configuration
+    value, parameter and dependency result, and of every output it wrote.
+    A stage runs when it is forced, has no stamp, any recorded hash
+    differs or an output is missing or was changed since; otherwise its
+    stored result is reused. A dependency that reruns with an identical
+    result does not make its dependents run.
+    """
+
+    def __init__(self, base_dir: Path, config: Dict[str, Any], stamp_file: Path):
+        """Resolve stage paths against ``base_dir`` and keep stamps in ``stamp_file``"""
+        self.base_dir = Path(base_dir)
+        self.config = config
+        self.stamp_file = Path(stamp_file)
+        self.stages: Dict[str, Stage] = {}
+        self.stamps: Dict[str, Dict[str, Any]] = self._load()
+
+    def add(self, stage: Stage) -> Stage:
+        """Add a stage; its dependencies must already be in the graph"""
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage: {stage.name}")
+        for dep in stage.deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+        self.stages[stage.name] = stage
+        return stage
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.stamp_file.exists():
+            return {}
+        try:
+            with open(self.stamp_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        write_if_changed(self.stamp_file, json.dumps(self.stamps, indent=2, ensure_ascii=False, default=str))
+
+    def _files(self, patterns: List[str]) -> List[Path]:
+        """Files named by paths or glob patterns relative to the base directory"""
+        files = []
+        for pattern in patterns:
+            if any(char in pattern for char in '*?['):
+                files.extend(sorted(path for path in self.base_dir.glob(pattern) if path.is_file()))
+            else:
+                files.append(self.base_dir / pattern)
+        return files
+
+    def _name(self, path: Path) -> str:
+        return os.path.relpath(path, self.base_dir)
+
+    def _file_hashes(self, patterns: List[str]) -> Dict[str, str]:
+        return {self._name(path): file_hash(str(path)) if path.is_file() else MISSING
+                for path in self._files(patterns)}
+
+    def _input_hashes(self, stage: Stage, results: Dict[str, Any]) -> Dict[str, str]:
+        """Hash of everything the stage reads, keyed by ``kind:name``"""
+        hashes = {f"file:{name}": digest for name, digest in self._file_hashes(stage.inputs).items()}
+        hashes.update({f"config:{key}": value_hash(config_value(self.config, key)) for key in stage.config})
+        hashes.update({f"param:{key}": value_hash(value) for key, value in stage.params.items()})
+        hashes.update({f"stage:{dep}": value_hash(results.get(dep)) for dep in stage.deps})
+        return hashes
+
+    def _reason(self, stage: Stage, inputs: Dict[str, str]) -> Optional[str]:
+        """Why a stage has to run, or None when it is up to date"""
+        if stage.always:
+            return 'always runs'
+        stamp = self.stamps.get(stage.name)
+        if stamp is None:
+            return 'never built'
+        recorded = stamp.get('inputs', {})
+        for key, digest in inputs.items():
+            if key not in recorded:
+                return f"new input {key}"
+            if recorded[key] != digest:
+                kind, _, name = key.partition(':')
+                return f"{'dependency' if kind == 'stage' else kind} changed: {name}"
+        for key in recorded:
+            if key not in inputs:
+                return f"input removed: {key}"
+        for name, digest in stamp.get('outputs', {}).items():
+            current = self._file_hashes([name])[name]
+            if current == MISSING:
+                return f"output missing: {name}"
+            if current != digest:
+                return f"output modified: {name}"
+        for name in self._file_hashes(stage.outputs):
+            if name not in stamp.get('outputs', {}):
+                return f"output not recorded: {name}"
+        return None
+
+    def order(self) -> List[Stage]:
+        """Stages in an order where every stage follows its dependencies"""
+        # add() only accepts known dependencies, so insertion order is already topological
+        return list(self.stages.values())
+
+    @staticmethod
+    def _execute(stage: Stage, dep_results: Dict[str, Any], output: StageOutput,
+                 buffer: io.StringIO) -> Tuple[Any, float]:
+        """Run one stage action (pool worker) printing into ``buffer``; returns its result as stored in the stamp and the time taken"""
+        started = time.perf_counter()
+        output.capture(buffer)
+        try:
+            # Dependents see the same value whether the stage ran or was skipped
+            result = json.loads(json.dumps(stage.action(dep_results), ensure_ascii=False, default=str))
+        finally:
+            output.capture(None)
+        return result, time.perf_counter() - started
+
+    def run(self, force: Optional[Iterable[str]] = None, explain: bool = False,
+            max_workers: Optional[int] = None) -> Tuple[Dict[str, Any], List[Dict]]:
+        """Run the stages that are out of date; returns the results of all stages and one record per stage
+
+        Stages run on a thread pool of ``max_workers`` (default: one per
+        CPU) as soon as their dependencies are done, so independent stages
+        overlap and the build takes about as long as its longest chain.
+        ``force`` names stages to run regardless of their stamps (an empty
+        collection forces none, None as well; pass every name to rebuild
+        all).
+
+        What a stage prints is held back and printed as one block, after
+        the ``explain`` line, once it and every stage before it in graph
+        order are done, so the log reads the same whatever ran in parallel.
+
+        A failing stage does not stop the others: stages that depend on it
+        are not run, everything else is. Stamps of the stages that completed
+        are saved, then BuildError reports every failure at once.
+        """
+        forced = set(force or ())
+        unknown = forced - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+        waiting = {name: set(stage.deps) for name, stage in self.stages.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.stages}
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                dependents[dep].append(stage.name)
+
+        results: Dict[str, Any] = {}
+        records: Dict[str, Dict] = {}
+        errors: Dict[str, BaseException] = {}
+
+        def finish(name: str):
+            for dependent in dependents[name]:
+                waiting[dependent].discard(name)
+
+        stream = sys.stdout
+        output = StageOutput(stream)
+        buffers: Dict[str, io.StringIO] = {}
+        pending = [stage.name for stage in self.order()]
+
+        def settle(name: str):
+            """Mark a stage done and print every finished block that no earlier stage holds back"""
+            buffers.setdefault(name, io.StringIO())
+            while pending and pending[0] in buffers:
+                stream.write(buffers.pop(pending.pop(0)).getvalue())
+            stream.flush()
+
+        sys.stdout = output
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+            running: Dict[Future, Tuple[Stage, Dict[str, str], str, io.StringIO]] = {}
+            try:
+                while True:
+                    # Skipping a stage can make its dependents ready at once, so look again until none is
+                    ready = [name for name, deps in waiting.items() if not deps]
+                    while ready:
+                        for name in ready:
+                            del waiting[name]
+                            stage = self.stages[name]
+                            inputs = self._input_hashes(stage, results)
+                            reason = 'forced' if name in forced else self._reason(stage, inputs)
+                            buffer = io.StringIO()
+                            if reason is None:
+                                results[name] = self.stamps[name].get('result')
+                                records[name] = {'stage': name, 'ran': False, 'reason': 'up to date', 'seconds': 0.0}
+                                if explain:
+                                    buffer.write(f"  ⏭️  {name}: up to date\n")
+                                buffers[name] = buffer
+                                settle(name)
+                                finish(name)
+                                continue
+                            if explain:
+                                buffer.write(f"  ▶️  {name}: {reason}\n")
+                            future = executor.submit(self._execute, stage, {dep: results[dep] for dep in stage.deps},
+                                                     output, buffer)
+                            running[future] = (stage, inputs, reason, buffer)
+                        ready = [name for name, deps in waiting.items() if not deps]
+
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, inputs, reason, buffer = running.pop(future)
+                        buffers[stage.name] = buffer
+                        try:
+                            result, seconds = future.result()
+                        except Exception as e:
+                            errors[stage.name] = e
+                            records[stage.name] = {'stage': stage.name, 'ran': True, 'reason': reason,
+                                                   'seconds': 0.0, 'error': f"{type(e).__name__}: {e}"}
+                            settle(stage.name)
+                            continue
+                        results[stage.name] = result
+                        self.stamps[stage.name] = {
+                            'inputs': inputs,
+                            'outputs': self._file_hashes(stage.outputs),
+                            'result': result,
+                            'built': datetime.now().isoformat()
+                        }
+                        records[stage.name] = {'stage': stage.name, 'ran': True, 'reason': reason,
+                                               'seconds': seconds}
+                        settle(stage.name)
+                        finish(stage.name)
+            finally:
+                sys.stdout = stream
+                self._save()
+
+        # Whatever still waits depends, directly or not, on a stage that failed
+        for name, deps in waiting.items():
+            records[name] = {'stage': name, 'ran': False, 'reason': f"blocked by {', '.join(sorted(deps))}",
+                             'seconds': 0.0}
+            settle(name)
+        ordered = [records[stage.name] for stage in self.order()]
+        if errors:
+            raise BuildError(errors, ordered)
+        return results, ordered
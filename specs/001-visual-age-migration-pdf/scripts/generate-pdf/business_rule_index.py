@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Business Rule Index for Visual Age Migration PDF Generation
+Inverted index over the legacy business rule documents and the feature specs
+"""
+
+import re
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Set, Iterable, Union
+
+
+# BUSINESS_RULES_INDEX.md: "### 1. SEARCH & RETRIEVAL (9 Rules)" and "| BR-001 | Rule | Location |"
+INDEX_CATEGORY = re.compile(r'^###\s+\d+\.\s+(.+?)\s*\(\d+ Rules?\)\s*$')
+INDEX_ROW = re.compile(r'^\|\s*(BR-\d{3})\s*\|\s*(.+?)\s*\|\s*(.+?)\s*\|')
+TABLE_ROW = re.compile(r'^\|\s*([A-Z][A-Z0-9_]{3,})\s*\|')
+
+# SISTEMA_LEGADO_REGRAS_NEGOCIO.md: "### BR-001: Title" followed by "**Field:** value" lines
+CATALOG_HEADING = re.compile(r'^###\s+(BR-\d{3}):\s*(.+?)\s*$')
+CATALOG_FIELD = re.compile(r'^\*\*(Tier|Categoria|Origem|Dependências):\*\*\s*(.*?)\s*$')
+CATALOG_FIELDS = {
+    'Tier': 'tier',
+    'Categoria': 'subcategory',
+    'Origem': 'origin',
+}
+
+# Specs: "- **ClaimMaster (TMESTSIN)**: description" under Key Entities
+SPEC_ENTITY = re.compile(r'^- \*\*(\w+) \(([A-Z][A-Z0-9_]{3,})\)\*\*')
+
+# "BR-001", "BR-001-005", "BR-010 a BR-042", "BR-001 to BR-009", "BR-001 through BR-099"
+REFERENCE_TEMPLATE = r'\b{prefix}-(\d{{3}})(?:\s*(?:-|–|to|a|through)\s*(?:{prefix}-)?(\d{{3}}))?\b'
+_reference_patterns: Dict[str, re.Pattern] = {}
+IDENTIFIER = re.compile(r'\b[A-Z][A-Z0-9_]{3,}\b')
+TOKEN = re.compile(r'\w+')
+
+RULES_INDEX_FILE = 'BUSINESS_RULES_INDEX.md'
+RULES_CATALOG_FILE = 'SISTEMA_LEGADO_REGRAS_NEGOCIO.md'
+SPEC_FILES = ('spec.md', 'tasks.md')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens (accents preserved)"""
+    return [token for token in TOKEN.findall(text.lower()) if len(token) > 1]
+
+
+def rule_number(rule_id: Union[str, int]) -> int:
+    """Return the numeric part of a rule ID ('BR-013' or 13)"""
+    if isinstance(rule_id, int):
+        return rule_id
+    return int(rule_id.upper().replace('BR-', ''))
+
+
+def id_references(text: str, prefix: str) -> List[str]:
+    """Return the ``PREFIX-nnn`` IDs mentioned in a text, expanding ranges, in order of appearance"""
+    pattern = _reference_patterns.get(prefix)
+    if pattern is None:
+        pattern = _reference_patterns[prefix] = re.compile(REFERENCE_TEMPLATE.format(prefix=prefix))
+
+    ids: List[str] = []
+    for match in pattern.finditer(text):
+        first = int(match.group(1))
+        last = int(match.group(2)) if match.group(2) else first
+        for number in range(first, max(first, last) + 1):
+            item_id = f'{prefix}-{number:03d}'
+            if item_id not in ids:
+                ids.append(item_id)
+    return ids
+
+
+def rule_references(text: str) -> List[str]:
+    """Return the rule IDs mentioned in a text, expanding ranges, in order of appearance"""
+    return id_references(text, 'BR')
+
+
+def _normalize(name: str) -> str:
+    """Key used for category and entity postings"""
+    return ' '.join(name.lower().split())
+
+
+class BusinessRuleIndex:
+    """Inverted index of business rules built once and queried by every generator
+
+    Each rule is a dict; rules read from several documents are merged on
+    their ``BR-xxx`` ID. Postings map rule IDs, categories, entities,
+    database tables and word tokens to the positions of the rules in
+    ``self.rules`` and are (re)built lazily on the first query after the
+    index changes.
+    """
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self.rules: List[Dict[str, Any]] = []
+        self.tables: Set[str] = set()
+        self.entities: Dict[str, str] = {}
+
+        self._positions: Dict[str, int] = {}
+        self._categories: Dict[str, Set[int]] = {}
+        self._entity_rules: Dict[str, Set[int]] = {}
+        self._table_rules: Dict[str, Set[int]] = {}
+        self._tokens: Dict[str, Set[int]] = {}
+        self._stale = True
+
+    @classmethod
+    def build(cls, docs_dir: Optional[str] = None,
+              spec_dirs: Iterable[Union[str, Path]] = ()) -> 'BusinessRuleIndex':
+        """Index the legacy rule documents of a docs directory and a set of spec directories"""
+        index = cls()
+        if docs_dir:
+            docs = Path(docs_dir)
+            if (docs / RULES_INDEX_FILE).exists():
+                index.add_rules_index(docs / RULES_INDEX_FILE)
+            if (docs / RULES_CATALOG_FILE).exists():
+                index.add_rules_catalog(docs / RULES_CATALOG_FILE)
+        for spec_dir in spec_dirs:
+            index.add_spec(spec_dir)
+        return index
+
+    def _rule(self, rule_id: str, source: str) -> Dict[str, Any]:
+        """Return the rule with an ID, creating it on first sight"""
+        position = self._positions.get(rule_id)
+        if position is None:
+            position = len(self.rules)
+            self._positions[rule_id] = position
+            self.rules.append({
+                'id': rule_id,
+                'title': '',
+                'description': '',
+                'location': '',
+                'category': '',
+                'subcategory': '',
+                'tier': '',
+                'origin': '',
+                'entity': '',
+                'depends_on': [],
+                'details': '',
+                'sources': [],
+                'mentions': []
+            })
+        rule = self.rules[position]
+        if source not in rule['sources']:
+            rule['sources'].append(source)
+        self._stale = True
+        return rule
+
+    def add_rules_index(self, file_path: Union[str, Path]):
+        """Index the category tables and database table list of BUSINESS_RULES_INDEX.md"""
+        source = Path(file_path).name
+        with open(file_path, 'r', encoding='utf-8') as f:
+            self.add_rules_index_text(f.read(), source)
+
+    def add_rules_index_text(self, content: str, source: str = RULES_INDEX_FILE):
+        """Index the rows of a rules index document already in memory"""
+        category = ''
+        in_tables = False
+        for line in content.splitlines():
+            if line.startswith('#'):
+                category_match = INDEX_CATEGORY.match(line)
+                category = category_match.group(1) if category_match else ''
+                in_tables = line.strip() == '## Key Database Tables'
+                continue
+
+            row = INDEX_ROW.match(line)
+            if row:
+                rule = self._rule(row.group(1), source)
+                rule['description'] = row.group(2)
+                rule['location'] = row.group(3)
+                if category:
+                    rule['category'] = category
+                continue
+
+            if in_tables:
+                table = TABLE_ROW.match(line)
+                if table:
+                    self.tables.add(table.group(1))
+                    self._stale = True
+
+    def add_rules_catalog(self, file_path: Union[str, Path]):
+        """Index the per-rule sections of SISTEMA_LEGADO_REGRAS_NEGOCIO.md
+
+        A rule section starts at its ``### BR-xxx:`` heading and ends at the
+        next heading or horizontal rule; the body is kept as ``details``.
+        """
+        source = Path(file_path).name
+        rule = None
+        body: List[str] = []
+
+        def close():
+            if rule is not None:
+                rule['details'] = '\n'.join(body).strip()
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                heading = CATALOG_HEADING.match(line)
+                if heading:
+                    close()
+                    rule = self._rule(heading.group(1), source)
+                    rule['title'] = heading.group(2)
+                    body = []
+                    continue
+                if rule is None:
+                    continue
+                if line.startswith('#') or line.strip() == '---':
+                    close()
+                    rule = None
+                    continue
+
+                field = CATALOG_FIELD.match(line)
+                if field:
+                    name, value = field.groups()
+                    if name == 'Dependências':
+                        rule['depends_on'] = rule_references(value)
+                    else:
+                        rule[CATALOG_FIELDS[name]] = value
+                    continue
+                body.append(line)
+        close()
+
+    def add_spec(self, spec_dir: Union[str, Path], rules: Optional[List[Dict[str, Any]]] = None):
+        """Index a feature spec directory
+
+        Key Entities bullets of spec.md map entity names to their database
+        tables, every ``BR-xxx`` mention in spec.md and tasks.md is recorded
+        on the rule it refers to, and ``rules`` (entity rules extracted from
+        the spec, without IDs) are added as rules of their own.
+        """
+        spec_dir = Path(spec_dir)
+        for filename in SPEC_FILES:
+            file_path = spec_dir / filename
+            if not file_path.exists():
+                continue
+            source = f'{spec_dir.name}/{filename}'
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for number, line in enumerate(f, 1):
+                    entity = SPEC_ENTITY.match(line)
+                    if entity:
+                        self.entities[_normalize(entity.group(1))] = entity.group(2)
+                        self.tables.add(entity.group(2))
+                        self._stale = True
+                    if 'BR-' not in line:
+                        continue
+                    for rule_id in rule_references(line):
+                        if rule_id in self._positions:
+                            self.rules[self._positions[rule_id]]['mentions'].append(
+                                {'source': source, 'line': number})
+
+        for number, spec_rule in enumerate(rules or [], 1):
+            rule = self._rule(f'{spec_dir.name}#{number}', f'{spec_dir.name}/spec.md')
+            rule['id'] = None
+            rule['entity'] = spec_rule['entity']
+            rule['description'] = spec_rule['rule']
+
+    def _build_postings(self):
+        """Rebuild every posting list from the current rules"""
+        self._categories, self._entity_rules, self._table_rules, self._tokens = {}, {}, {}, {}
+        table_entities: Dict[str, List[str]] = {}
+        for entity, table in self.entities.items():
+            table_entities.setdefault(table, []).append(entity)
+
+        for position, rule in enumerate(self.rules):
+            for category in (rule['category'], rule['subcategory']):
+                if category:
+                    self._categories.setdefault(_normalize(category), set()).add(position)
+
+            text = ' '.join((rule['id'] or '', rule['title'], rule['description'],
+                             rule['location'], rule['details']))
+            tables = sorted(set(IDENTIFIER.findall(text)) & self.tables)
+            rule['tables'] = tables
+
+            entities = [_normalize(rule['entity'])] if rule['entity'] else []
+            for table in tables:
+                self._table_rules.setdefault(table, set()).add(position)
+                entities.extend(table_entities.get(table, []))
+            for entity in entities:
+                self._entity_rules.setdefault(entity, set()).add(position)
+
+            for token in set(tokenize(text)):
+                self._tokens.setdefault(token, set()).add(position)
+
+        self._stale = False
+
+    def _ordered(self, positions: Iterable[int]) -> List[Dict[str, Any]]:
+        """Return rules in document order"""
+        return [self.rules[position] for position in sorted(positions)]
+
+    def _postings(self, postings: Dict[str, Set[int]], key: str) -> Set[int]:
+        """Look up a posting list, building the postings first if stale"""
+        if self._stale:
+            self._build_postings()
+        return postings.get(key, set())
+
+    def get(self, rule_id: str) -> Optional[Dict[str, Any]]:
+        """Return one rule by ID"""
+        position = self._positions.get(rule_id.upper())
+        return self.rules[position] if position is not None else None
+
+    def _range_positions(self, first: Union[str, int], last: Union[str, int]) -> Set[int]:
+        first, last = rule_number(first), rule_number(last)
+        return {position for rule_id, position in self._positions.items()
+                if rule_id.startswith('BR-') and first <= rule_number(rule_id) <= last}
+
+    def _keyword_positions(self, keyword: str) -> Set[int]:
+        tokens = tokenize(keyword)
+        if not tokens:
+            return set()
+        positions = set(self._postings(self._tokens, tokens[0]))
+        for token in tokens[1:]:
+            positions &= self._postings(self._tokens, token)
+        return positions
+
+    def by_range(self, first: Union[str, int], last: Union[str, int]) -> List[Dict[str, Any]]:
+        """Rules whose ID number lies in an inclusive range (e.g. 'BR-010', 'BR-026')"""
+        return self._ordered(self._range_positions(first, last))
+
+    def by_category(self, category: str) -> List[Dict[str, Any]]:
+        """Rules of a category ('PAYMENT AUTHORIZATION') or subcategory ('Auditoria')"""
+        return self._ordered(self._postings(self._categories, _normalize(category)))
+
+    def by_table(self, table: str) -> List[Dict[str, Any]]:
+        """Rules that mention a database table ('TMESTSIN')"""
+        return self._ordered(self._postings(self._table_rules, table.upper()))
+
+    def by_entity(self, entity: str) -> List[Dict[str, Any]]:
+        """Rules attached to a spec entity ('ClaimMaster') directly or through its table"""
+        return self._ordered(self._postings(self._entity_rules, _normalize(entity)))
+
+    def search(self, keyword: str) -> List[Dict[str, Any]]:
+        """Rules containing every word of a keyword query"""
+        return self._ordered(self._keyword_positions(keyword))
+
+    def query(self, first: Optional[Union[str, int]] = None, last: Optional[Union[str, int]] = None,
+              category: Optional[str] = None, table: Optional[str] = None,
+              entity: Optional[str] = None, keyword: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Rules matching every given criterion (no criteria returns all rules)"""
+        if self._stale:
+            self._build_postings()
+
+        criteria: List[Set[int]] = []
+        if first is not None or last is not None:
+            criteria.append(self._range_positions(first if first is not None else 0,
+                                                  last if last is not None else 999))
+        if category:
+            criteria.append(self._postings(self._categories, _normalize(category)))
+        if table:
+            criteria.append(self._postings(self._table_rules, table.upper()))
+        if entity:
+            criteria.append(self._postings(self._entity_rules, _normalize(entity)))
+        if keyword:
+            criteria.append(self._keyword_positions(keyword))
+
+        if not criteria:
+            return list(self.rules)
+        positions = set.intersection(*(set(c) for c in criteria))
+        return self._ordered(positions)
+
+    def categories(self) -> List[Dict[str, Any]]:
+        """Index categories in document order with their rule counts and ID range"""
+        seen: Dict[str, List[str]] = {}
+        for rule in self.rules:
+            if rule['category'] and rule['id']:
+                seen.setdefault(rule['category'], []).append(rule['id'])
+        return [
+            {'name': name, 'count': len(ids), 'first': ids[0], 'last': ids[-1]}
+            for name, ids in seen.items()
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        """Return the size of the index"""
+        if self._stale:
+            self._build_postings()
+        return {
+            'rules': len(self.rules),
+            'categories': len(self._categories),
+            'tables': len(self._table_rules),
+            'entities': len(self._entity_rules),
+            'tokens': len(self._tokens)
+        }
+
+
+def main():
+    """Query the business rule index from the command line"""
+    repo_root = Path(__file__).parent.parent.parent.parent.parent
+
+    parser = argparse.ArgumentParser(description='Query the business rule index')
+    parser.add_argument('--docs', default=str(repo_root / 'docs'),
+                       help='Directory with the legacy business rule documents')
+    parser.add_argument('--specs', default=str(repo_root / 'specs'),
+                       help='Directory with the feature spec directories')
+    parser.add_argument('--range', nargs=2, metavar=('FIRST', 'LAST'),
+                       help='Rule ID range, e.g. BR-010 BR-026')
+    parser.add_argument('--category', help='Category or subcategory')
+    parser.add_argument('--table', help='Database table, e.g. TMESTSIN')
+    parser.add_argument('--entity', help='Spec entity, e.g. ClaimMaster')
+    parser.add_argument('--keyword', help='Words that must all appear in the rule')
+
+    args = parser.parse_args()
+
+    spec_dirs = [path for path in sorted(Path(args.specs).iterdir()) if (path / 'spec.md').exists()]
+    index = BusinessRuleIndex.build(args.docs, spec_dirs)
+
+    first, last = args.range if args.range else (None, None)
+    rules = index.query(first, last, category=args.category, table=args.table,
+                        entity=args.entity, keyword=args.keyword)
+
+    for rule in rules:
+        print(f"{rule['id'] or '-'}  {rule['description'] or rule['title']}")
+    stats = index.stats()
+    print(f"\n{len(rules)} of {stats['rules']} rules "
+          f"({stats['tables']} tables, {stats['tokens']} tokens indexed)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
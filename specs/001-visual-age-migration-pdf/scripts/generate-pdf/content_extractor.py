@@ -8,87 +8,647 @@ import os
 import re
 import yaml
 import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Set, Tuple
+
+if __name__ == '__main__':
+    # Run as a script: the caches build on utils/persistent_cache.py
+    sys.path.insert(0, str(Path(__file__).parent / "utils"))
+
+from business_rule_index import rule_references, id_references
+from artifact_writer import write_if_changed
+from extraction_cache import ExtractionCache, DEFAULT_MAX_BYTES, content_hash, file_hash
+from extraction_profiler import ExtractionProfiler, write_profile, print_profile
+from file_cache import FileCache, SourceBuffer, DEFAULT_BUDGET_BYTES
+
+
+# Headings read by the extractors, by section key; the first title present
+# in a file wins. This is the only default: section_aliases in
+# document-config.yaml holds overrides of single keys, not a copy.
+SECTION_ALIASES: Dict[str, List[str]] = {
+    'functional_requirements': ['Functional Requirements', 'Requirements'],
+    'key_entities': ['Key Entities and Business Rules', 'Key Entities'],
+    'success_criteria': ['Success Criteria'],
+    'assumptions': ['Assumptions'],
+    'out_of_scope': ['Out of Scope'],
+    'implementation_phases': ['Implementation Phases'],
+    'technology_decisions': ['Technology Decisions'],
+}
+
+# Words that mark an entity bullet as a business rule: a normative verb
+# (``musts``, ``shouldn't`` included) or the phrase ``business rule(s)``
+RULE_PATTERN = re.compile(r"\b(?:must|should|shall)(?:s|n['’]t)?\b|\bbusiness rules?\b", re.IGNORECASE)
+
+# Markdown ATX heading (``## Title``) matched against a single line
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*$')
+
+
+def build_heading_index(content) -> List[Dict[str, Any]]:
+    """Index every markdown heading in one linear pass over the content
+
+    ``content`` is a str or a bytes-like buffer (bytes, mmap); offsets are
+    in the same units, and with bytes only heading lines are decoded.
+    Each entry holds the heading level, title and offsets: ``start``
+    (heading line), ``body_start`` (first line after the heading), ``next``
+    (start of the following heading of any level) and ``end`` (start of the
+    next heading of the same or a higher level). Headings inside fenced
+    code blocks are ignored.
+    """
+    is_text = isinstance(content, str)
+    newline, hash_mark, fences = ('\n', '#', ('```', '~~~')) if is_text else (b'\n', b'#', (b'```', b'~~~'))
+
+    headings: List[Dict[str, Any]] = []
+    open_sections: List[Dict[str, Any]] = []
+    length = len(content)
+    in_fence = False
+    pos = 0
+
+    while pos < length:
+        eol = content.find(newline, pos)
+        if eol == -1:
+            eol = length
+        prefix = content[pos:pos + 3]
+
+        if prefix in fences:
+            in_fence = not in_fence
+        elif not in_fence and prefix.startswith(hash_mark):
+            line = content[pos:eol]
+            match = HEADING_PATTERN.match(line if is_text else line.decode('utf-8', errors='replace'))
+            if match:
+                level = len(match.group(1))
+                if headings:
+                    headings[-1]['next'] = pos
+                # Close every open section this heading terminates
+                while open_sections and open_sections[-1]['level'] >= level:
+                    open_sections.pop()['end'] = pos
+                heading = {
+                    'level': level,
+                    'title': match.group(2).strip(),
+                    'start': pos,
+                    'body_start': min(eol + 1, length),
+                    'next': length,
+                    'end': length
+                }
+                headings.append(heading)
+                open_sections.append(heading)
+
+        pos = eol + 1
+
+    return headings
+
+
+# User story parsing works one line at a time; every pattern below is
+# anchored and only ever sees a single line, so input size cannot cause
+# backtracking across the document.
+USER_STORY_HEADING = re.compile(r'^###\s+User Story\b(.*)$')
+USER_STORY_TITLE = re.compile(r'^\s*(\d+)\s*-\s*(.*?)\s*\(Priority:\s*(P\d+)\)')
+USER_STORY_FIELD = re.compile(r'^\*\*(Why this priority|Independent Test|Acceptance Scenarios)(?:\*\*:|:\*\*)\s*(.*)$')
+SCENARIO_ITEM = re.compile(r'^\d+\.\s+(.*)$')
+
+USER_STORY_FIELDS = {
+    'Why this priority': 'rationale',
+    'Independent Test': 'test',
+    'Acceptance Scenarios': 'scenarios'
+}
+
+
+def _parse_scenario(text: str) -> Optional[Dict[str, str]]:
+    """Split a "**Given** ..., **When** ..., **Then** ..." item without regex"""
+    given_marker, when_marker, then_marker = '**Given** ', ', **When** ', ', **Then** '
+    if not text.startswith(given_marker):
+        return None
+
+    when_pos = text.find(when_marker)
+    if when_pos == -1:
+        return None
+    then_pos = text.find(then_marker, when_pos + len(when_marker))
+    if then_pos == -1:
+        return None
+
+    return {
+        'given': text[len(given_marker):when_pos].strip(),
+        'when': text[when_pos + len(when_marker):then_pos].strip(),
+        'then': text[then_pos + len(then_marker):].strip()
+    }
+
+
+def parse_user_stories(content: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Parse user stories and acceptance scenarios with a line-oriented state machine
+
+    A story starts at a ``### User Story N - Title (Priority: Pn)`` heading and
+    ends at a ``---`` rule, the next heading of level 3 or higher, or the end
+    of the content. Runs in O(n) on any input.
+
+    Returns ``(stories, diagnostics)``; stories that cannot be parsed are
+    reported in ``diagnostics`` with their line number instead of being
+    dropped silently.
+    """
+    stories: List[Dict[str, Any]] = []
+    diagnostics: List[Dict[str, Any]] = []
+
+    story: Optional[Dict[str, Any]] = None
+    state = None
+    fields: Dict[str, List[str]] = {}
+    scenarios: List[Tuple[int, List[str]]] = []
+
+    def finish():
+        story_id = story['id']
+        missing = [name for name in ('description', 'rationale', 'test', 'scenarios')
+                   if name not in fields or (name != 'scenarios' and not '\n'.join(fields[name]).strip())]
+        if missing:
+            diagnostics.append({
+                'line': story['line'],
+                'item': story_id,
+                'message': f"User story is missing {', '.join(missing)}"
+            })
+            return
+
+        scenarios_list = []
+        for line_no, parts in scenarios:
+            scenario = _parse_scenario('\n'.join(parts))
+            if scenario is None:
+                diagnostics.append({
+                    'line': line_no,
+                    'item': story_id,
+                    'message': 'Acceptance scenario is not in "Given, When, Then" form'
+                })
+            else:
+                scenarios_list.append(scenario)
+
+        stories.append({
+            'id': story_id,
+            'title': story['title'],
+            'priority': story['priority'],
+            'description': '\n'.join(fields['description']).strip(),
+            'rationale': '\n'.join(fields['rationale']).strip(),
+            'test': '\n'.join(fields['test']).strip(),
+            'scenarios': scenarios_list
+        })
+
+    for line_no, line in enumerate(content.split('\n'), 1):
+        if story is not None:
+            heading = HEADING_PATTERN.match(line) if line.startswith('#') else None
+            if line.strip() == '---' or (heading and len(heading.group(1)) <= 3):
+                finish()
+                story = None
+            elif state == 'scenarios':
+                item = SCENARIO_ITEM.match(line)
+                if item:
+                    scenarios.append((line_no, [item.group(1)]))
+                elif scenarios and line.strip():
+                    scenarios[-1][1].append(line)
+                continue
+            else:
+                field = USER_STORY_FIELD.match(line)
+                if field:
+                    state = USER_STORY_FIELDS[field.group(1)]
+                    fields[state] = [field.group(2)]
+                else:
+                    fields[state].append(line)
+                continue
+
+        story_heading = USER_STORY_HEADING.match(line)
+        if not story_heading:
+            continue
+
+        title = USER_STORY_TITLE.match(story_heading.group(1))
+        if not title:
+            diagnostics.append({
+                'line': line_no,
+                'item': line.lstrip('#').strip(),
+                'message': 'User story heading is not "User Story N - Title (Priority: Pn)"'
+            })
+            continue
+
+        story_num, story_title, priority = title.groups()
+        story = {'id': f'US{story_num}', 'title': story_title, 'priority': priority, 'line': line_no}
+        state = 'description'
+        fields = {'description': []}
+        scenarios = []
+
+    if story is not None:
+        finish()
+
+    return stories, diagnostics
+
+
+# tasks.md checklist items: "- [ ] T015 [P] [US1] Description" or "- [X] [T010] [P] Description"
+TASK_ITEM = re.compile(r'^- \[([ xX])\] \[?(T\d{3})\]?:?\s+(.*?)\s*$')
+TASK_TAG = re.compile(r'^\[([\w-]+)\]\s*')
+STORY_TAG = re.compile(r'^US(\d+)$')
+PHASE_STORY = re.compile(r'\bUser Story (\d+)\b')
+
+
+def parse_tasks(content: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Parse the task checklist of a tasks.md file in one pass over its lines
+
+    Each task records its completion state, tags (``[P]``, ``[Foundation]``),
+    the user story it belongs to (its ``[USn]`` tag, otherwise the enclosing
+    ``## Phase N: User Story N`` heading) and the FR/SC IDs its text
+    references, with ranges expanded. Checklists inside fenced code blocks
+    are ignored.
+
+    Returns ``(tasks, diagnostics)``; a task ID listed twice is reported and
+    only its first occurrence kept.
+    """
+    tasks: List[Dict[str, Any]] = []
+    diagnostics: List[Dict[str, Any]] = []
+    seen: Dict[str, int] = {}
+
+    phase = ''
+    phase_story = None
+    in_fence = False
+    for line_no, line in enumerate(content.split('\n'), 1):
+        if line.startswith(('```', '~~~')):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+
+        if line.startswith('## '):
+            phase = line[3:].strip()
+            story = PHASE_STORY.search(phase)
+            phase_story = f'US{story.group(1)}' if story else None
+            continue
+
+        item = TASK_ITEM.match(line)
+        if not item:
+            continue
+
+        done, task_id, text = item.groups()
+        if task_id in seen:
+            diagnostics.append({
+                'line': line_no,
+                'item': task_id,
+                'message': f'Task ID already used on line {seen[task_id]}'
+            })
+            continue
+        seen[task_id] = line_no
+
+        tags = []
+        tag = TASK_TAG.match(text)
+        while tag:
+            tags.append(tag.group(1))
+            text = text[tag.end():]
+            tag = TASK_TAG.match(text)
+
+        story = next((f'US{m.group(1)}' for m in map(STORY_TAG.match, tags) if m), phase_story)
+        tasks.append({
+            'id': task_id,
+            'description': text,
+            'done': done != ' ',
+            'tags': [t for t in tags if not STORY_TAG.match(t)],
+            'story': story,
+            'phase': phase,
+            'requirements': id_references(text, 'FR'),
+            'criteria': id_references(text, 'SC'),
+            'line': line_no
+        })
+
+    return tasks, diagnostics
+
+
+# Data model documents describe one entity per numbered heading
+ENTITY_HEADING = re.compile(r'^#{1,6}\s+\d+\.\s+(.*?)\s*$')
+ENTITY_TABLE = re.compile(r'Table Name: `(.*?)`|\*\*Tabela DB2:\*\*\s*`?([\w.]+)')
+ENTITY_DESCRIPTION = re.compile(r'Description: (.*)')
+ENTITY_FIELD = re.compile(r'- `(.*?)` \((.*?)\): (.*)')
+
+
+def iter_entities(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Stream entity definitions out of data model markdown, one entity at a time
+
+    Consumes any iterable of lines (an open file works) and only holds the
+    entity being built, so memory stays constant in the size of the document.
+    """
+    entity: Optional[Dict[str, Any]] = None
+    field: Optional[Dict[str, Any]] = None
+    in_fence = False
+
+    def finish() -> Dict[str, Any]:
+        if field is not None:
+            field['description'] = '\n'.join(field['description']).strip()
+        return entity
+
+    for line in lines:
+        line = line.rstrip('\n')
+
+        if line.startswith('```') or line.startswith('~~~'):
+            in_fence = not in_fence
+        heading = None if in_fence else ENTITY_HEADING.match(line)
+        if heading:
+            if entity is not None:
+                yield finish()
+            entity = {'name': heading.group(1), 'table': '', 'description': '', 'fields': []}
+            field = None
+            continue
+
+        if entity is None:
+            continue
+
+        if not entity['table']:
+            table = ENTITY_TABLE.search(line)
+            if table:
+                entity['table'] = table.group(1) or table.group(2)
+        if not entity['description']:
+            description = ENTITY_DESCRIPTION.search(line)
+            if description:
+                entity['description'] = description.group(1).strip()
+
+        if line.startswith('- '):
+            if field is not None:
+                field['description'] = '\n'.join(field['description']).strip()
+                field = None
+            field_match = ENTITY_FIELD.match(line)
+            if field_match:
+                field = {
+                    'name': field_match.group(1),
+                    'type': field_match.group(2),
+                    'description': [field_match.group(3)]
+                }
+                entity['fields'].append(field)
+        elif field is not None:
+            field['description'].append(line)
+
+    if entity is not None:
+        yield finish()
+
+
+def iter_entities_from_file(file_path: str) -> Iterator[Dict[str, Any]]:
+    """Stream entity definitions from a data model document read line by line"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        yield from iter_entities(f)
+
+
+# Files of a spec directory the extractor reads
+SOURCE_FILES = ('spec.md', 'plan.md', 'research.md', 'data-model.md', 'tasks.md')
 
 
 class ContentExtractor:
     """Extracts structured content from markdown specification files"""
 
-    def __init__(self, source_dir: str):
-        """Initialize the content extractor with source directory"""
+    def __init__(self, source_dir: str, cache: Optional[ExtractionCache] = None,
+                 file_cache: Optional[FileCache] = None, profiler: Optional[ExtractionProfiler] = None,
+                 section_aliases: Optional[Dict[str, List[str]]] = None):
+        """Initialize the content extractor with source directory, optional caches and profiler"""
         self.source_dir = Path(source_dir)
         self.spec_file = self.source_dir / "spec.md"
         self.plan_file = self.source_dir / "plan.md"
         self.research_file = self.source_dir / "research.md"
         self.data_model_file = self.source_dir / "data-model.md"
-
-        # Cache for loaded content
-        self._cache: Dict[str, str] = {}
+        self.tasks_file = self.source_dir / "tasks.md"
+
+        # Byte-budgeted cache of raw source files; sections are decoded on demand
+        self.files = file_cache if file_cache is not None else FileCache()
+
+        # Heading index per loaded file, built once on first section lookup
+        self._heading_index: Dict[str, List[Dict[str, Any]]] = {}
+        self.section_aliases = {**SECTION_ALIASES, **(section_aliases or {})}
+
+        # Functional requirements are shared by several extractors
+        self._functional_requirements: Optional[Dict[str, List[Dict[str, str]]]] = None
+
+        # Problems found while extracting (unparsable items, missing sections),
+        # each reported once per (file, line, message)
+        self.diagnostics: List[Dict[str, Any]] = []
+        self._diagnostic_keys: Set[Tuple[Any, ...]] = set()
+
+        # Persistent result cache and the inputs read by the running extractor
+        self.cache = cache
+        self._reads: Optional[List[Tuple]] = None
+        self.last_cache_hit = False
+
+        # Source bytes read, sliced or hashed so far (reported by the profiler)
+        self.bytes_scanned = 0
+        self.profiler = profiler
+
+    def _record_read(self, source: Tuple):
+        """Remember an input read by the running extractor (for cache validation)"""
+        if self._reads is not None and source not in self._reads:
+            self._reads.append(source)
+
+    def _fingerprint(self, source: Tuple) -> str:
+        """Hash the current content of a recorded input
+
+        Inputs are ``('exists', file)``, ``('file', file)`` or
+        ``('section', file, key, until)``. A section hashes with the line
+        and title of its heading, since cached diagnostics carry absolute
+        line numbers and a category may be named after the heading.
+        """
+        file_path = self.source_dir / source[1]
+        if not file_path.exists():
+            return 'missing'
+        if source[0] == 'exists':
+            return 'present'
+        if source[0] == 'file':
+            self.bytes_scanned += file_path.stat().st_size
+            return file_hash(str(file_path))
+
+        bounds = self._resolve_section(file_path, source[2], source[3])
+        if bounds is None:
+            return 'absent'
+        title = self._find_section_heading(file_path, source[2])['title']
+        line = self._line_number(file_path, bounds[0])
+        self.bytes_scanned += bounds[1]
+        heading = f"{line}\0{title}\0".encode('utf-8')
+        return content_hash(heading + self._buffer(file_path).raw(bounds[0], bounds[1]))
+
+    def _cached(self, name: str, extractor) -> Any:
+        """Run an extractor through the persistent cache when one is configured"""
+        self.last_cache_hit = False
+        if self.cache is None:
+            return extractor()
+
+        entry = self.cache.get(name, self._fingerprint)
+        if entry is not None:
+            self.last_cache_hit = True
+            for diagnostic in entry['diagnostics']:
+                self._add_diagnostic(diagnostic)
+            if name == 'functional_requirements':
+                self._functional_requirements = entry['result']
+            return entry['result']
+
+        self._reads = []
+        first_diagnostic = len(self.diagnostics)
+        try:
+            result = extractor()
+            inputs = [[list(source), self._fingerprint(source)] for source in self._reads]
+        finally:
+            self._reads = None
+
+        self.cache.put(name, inputs, result, self.diagnostics[first_diagnostic:])
+        return result
+
+    def _warn(self, file_path: Path, message: str, line: Optional[int] = None, item: Optional[str] = None):
+        """Record a structured extraction diagnostic (once, however many extractors hit it)"""
+        self._add_diagnostic({
+            'file': file_path.name,
+            'line': line,
+            'item': item,
+            'message': message
+        })
+
+    def _add_diagnostic(self, diagnostic: Dict[str, Any]):
+        """Append a diagnostic unless one with the same file, line and message was recorded"""
+        key = (diagnostic['file'], diagnostic['line'], diagnostic['message'])
+        if key not in self._diagnostic_keys:
+            self._diagnostic_keys.add(key)
+            self.diagnostics.append(diagnostic)
+
+    def _buffer(self, file_path: Path) -> SourceBuffer:
+        """Return the cached raw buffer of a file"""
+        return self.files.get(file_path)
 
     def _load_file(self, file_path: Path) -> str:
-        """Load and cache file content"""
-        if str(file_path) not in self._cache:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                self._cache[str(file_path)] = f.read()
-        return self._cache[str(file_path)]
+        """Decode a whole file (the decoded text itself is not cached)"""
+        return self._buffer(file_path).text()
+
+    def _read_file(self, file_path: Path) -> str:
+        """Load a whole file on behalf of an extractor"""
+        self._record_read(('file', file_path.name))
+        text = self._load_file(file_path)
+        self.bytes_scanned += self._buffer(file_path).size
+        return text
+
+    def _file_exists(self, file_path: Path) -> bool:
+        """Check for an optional source file on behalf of an extractor"""
+        self._record_read(('exists', file_path.name))
+        return file_path.exists()
+
+    def _get_headings(self, file_path: Path) -> List[Dict[str, Any]]:
+        """Return the heading index for a file, building it on first use"""
+        key = str(file_path)
+        if key not in self._heading_index:
+            buffer = self._buffer(file_path)
+            self._heading_index[key] = build_heading_index(buffer.data)
+            self.bytes_scanned += buffer.size
+        return self._heading_index[key]
+
+    def _find_heading(self, file_path: Path, title: str, after: int = 0) -> Optional[Dict[str, Any]]:
+        """Find the first heading with the given title starting at or after an offset"""
+        for heading in self._get_headings(file_path):
+            if heading['start'] >= after and heading['title'] == title:
+                return heading
+        return None
+
+    def _find_section_heading(self, file_path: Path, key: str, after: int = 0) -> Optional[Dict[str, Any]]:
+        """Find the heading of a section key through its aliases"""
+        for title in self.section_aliases.get(key, [key]):
+            heading = self._find_heading(file_path, title, after)
+            if heading:
+                return heading
+        return None
+
+    def _line_number(self, file_path: Path, offset: int) -> int:
+        """Line number of an offset (only used for diagnostics)"""
+        return self._buffer(file_path).raw(0, offset).count(b'\n') + 1
+
+    def _get_section(self, file_path: Path, key: str, until: Optional[str] = None) -> Optional[Tuple[int, int]]:
+        """Resolve a section key to (start, end) offsets of its body
+
+        The section ends at the next heading of the same or a higher level,
+        or with ``until`` at that section's heading. A missing section or
+        end heading is reported as a diagnostic.
+        """
+        self._record_read(('section', file_path.name, key, until))
+        bounds = self._resolve_section(file_path, key, until)
+
+        if bounds is None:
+            self._warn(file_path, f"Section not found (looked for {self._alias_titles(key)})", item=key)
+        elif until is not None and not self._find_section_heading(file_path, until, bounds[0]):
+            self._warn(file_path, f"End heading not found (looked for {self._alias_titles(until)}); "
+                       f"section runs to the next heading",
+                       self._line_number(file_path, bounds[0]) - 1, key)
+        return bounds
+
+    def _alias_titles(self, key: str) -> str:
+        """The headings a section key is looked up by, quoted for a diagnostic"""
+        return ', '.join(f"'{title}'" for title in self.section_aliases.get(key, [key]))
+
+    def _resolve_section(self, file_path: Path, key: str, until: Optional[str]) -> Optional[Tuple[int, int]]:
+        """Look up section offsets in the heading index"""
+        heading = self._find_section_heading(file_path, key)
+        if not heading:
+            return None
+
+        if until is not None:
+            end_heading = self._find_section_heading(file_path, until, heading['body_start'])
+            if end_heading:
+                return heading['body_start'], end_heading['start']
+        return heading['body_start'], heading['end']
+
+    def _check_items(self, file_path: Path, key: str, bounds: Tuple[int, int], items: Any, what: str):
+        """Report a section that exists but yielded nothing"""
+        if not items:
+            self._warn(file_path, f"Section has no {what}",
+                       self._line_number(file_path, bounds[0]) - 1, key)
+
+    def _section_text(self, file_path: Path, bounds: Tuple[int, int]) -> str:
+        """Slice a resolved section body out of the loaded file"""
+        self.bytes_scanned += bounds[1] - bounds[0]
+        return self._buffer(file_path).text(bounds[0], bounds[1])
+
+    def _subsections(self, file_path: Path, start: int, end: int,
+                     title_pattern: Optional[str] = None) -> List[Tuple[str, str]]:
+        """List (title, body) for headings inside [start, end)
+
+        Each body runs to the next heading of any level, clipped to ``end``.
+        When ``title_pattern`` is given only matching headings are returned
+        and a body extends up to the next matching heading instead.
+        """
+        buffer = self._buffer(file_path)
+        headings = [h for h in self._get_headings(file_path) if start <= h['start'] < end]
+        if title_pattern:
+            title_re = re.compile(title_pattern)
+            headings = [h for h in headings if title_re.match(h['title'])]
+
+        subsections = []
+        for i, heading in enumerate(headings):
+            if title_pattern:
+                body_end = headings[i + 1]['start'] if i + 1 < len(headings) else end
+            else:
+                body_end = min(heading['next'], end)
+            self.bytes_scanned += body_end - heading['body_start']
+            subsections.append((heading['title'], buffer.text(heading['body_start'], body_end)))
+        return subsections
 
     def extract_user_stories(self) -> List[Dict[str, Any]]:
         """Extract user stories from spec.md"""
-        content = self._load_file(self.spec_file)
-        stories = []
-
-        # Pattern to match user stories
-        pattern = r'### User Story (\d+) - ([^(]+)\(Priority: (P\d+)\)\n\n(.*?)\n\n\*\*Why this priority\*\*: (.*?)\n\n\*\*Independent Test\*\*: (.*?)\n\n\*\*Acceptance Scenarios\*\*:(.*?)(?=---|\Z)'
-
-        matches = re.findall(pattern, content, re.DOTALL)
+        content = self._read_file(self.spec_file)
+        stories, diagnostics = parse_user_stories(content)
 
-        for match in matches:
-            story_num, title, priority, description, why_priority, test, scenarios = match
-
-            # Extract individual scenarios
-            scenario_pattern = r'\d+\. \*\*Given\*\* (.*?), \*\*When\*\* (.*?), \*\*Then\*\* (.*?)(?=\n\d+\.|\Z)'
-            scenario_matches = re.findall(scenario_pattern, scenarios, re.DOTALL)
-
-            scenarios_list = []
-            for given, when, then in scenario_matches:
-                scenarios_list.append({
-                    'given': given.strip(),
-                    'when': when.strip(),
-                    'then': then.strip()
-                })
-
-            stories.append({
-                'id': f'US{story_num}',
-                'title': title.strip(),
-                'priority': priority,
-                'description': description.strip(),
-                'rationale': why_priority.strip(),
-                'test': test.strip(),
-                'scenarios': scenarios_list
-            })
+        for diagnostic in diagnostics:
+            self._warn(self.spec_file, diagnostic['message'], diagnostic['line'], diagnostic['item'])
 
         return stories
 
     def extract_functional_requirements(self) -> Dict[str, List[Dict[str, str]]]:
         """Extract functional requirements grouped by category"""
-        content = self._load_file(self.spec_file)
-        requirements = {}
-
         # Find functional requirements section
-        fr_section = re.search(r'## Functional Requirements(.*?)## Success Criteria', content, re.DOTALL)
+        if self._functional_requirements is not None:
+            self._record_read(('section', self.spec_file.name, 'functional_requirements', 'success_criteria'))
+            return self._functional_requirements
+        fr_section = self._get_section(self.spec_file, 'functional_requirements', until='success_criteria')
+
+        requirements = {}
         if not fr_section:
             return requirements
 
-        fr_content = fr_section.group(1)
+        # Requirements listed before the first subheading belong to a
+        # category named after the section heading itself
+        first_subheading = next((h['start'] for h in self._get_headings(self.spec_file)
+                                 if fr_section[0] <= h['start'] < fr_section[1]), fr_section[1])
+        title = self._find_section_heading(self.spec_file, 'functional_requirements')['title']
+        categories = [(title, self._section_text(self.spec_file, (fr_section[0], first_subheading)))]
+        categories.extend(self._subsections(self.spec_file, *fr_section))
 
-        # Extract categories and their requirements
-        category_pattern = r'### (.*?)\n(.*?)(?=###|\Z)'
-        category_matches = re.findall(category_pattern, fr_content, re.DOTALL)
-
-        for category, reqs in category_matches:
-            req_pattern = r'- \*\*(FR-\d+)\*\*: (.*?)(?=\n- |\Z)'
+        req_pattern = r'- \*\*(FR-\d+)\*\*: (.*?)(?=\n- |\Z)'
+        for position, (category, reqs) in enumerate(categories):
             req_matches = re.findall(req_pattern, reqs, re.DOTALL)
+            if position == 0 and not req_matches:
+                continue
 
             requirements[category.strip()] = [
                 {
@@ -98,98 +658,77 @@ class ContentExtractor:
                 for req_id, desc in req_matches
             ]
 
+        self._check_items(self.spec_file, 'functional_requirements', fr_section,
+                          any(requirements.values()), 'FR-xxx requirements')
+        self._functional_requirements = requirements
         return requirements
 
     def extract_business_rules(self) -> List[Dict[str, Any]]:
-        """Extract business rules from spec.md"""
-        content = self._load_file(self.spec_file)
+        """Extract business rules from spec.md
+
+        An entity bullet is a rule when it contains a normative word or
+        mentions a business rule; ``rule_ids`` lists the ``BR-xxx`` IDs it
+        references.
+        """
         rules = []
 
         # Find Key Entities section with business rules
-        entities_section = re.search(r'## Key Entities and Business Rules(.*?)## Functional Requirements', content, re.DOTALL)
+        entities_section = self._get_section(self.spec_file, 'key_entities')
         if not entities_section:
             return rules
 
-        entities_content = entities_section.group(1)
-
         # Extract entities and their rules
-        entity_pattern = r'### \d+\. (.*?)\n(.*?)(?=###|\Z)'
-        entity_matches = re.findall(entity_pattern, entities_content, re.DOTALL)
+        for title, entity_content in self._subsections(self.spec_file, *entities_section):
+            entity_match = re.match(r'\d+\. (.*)', title)
+            if not entity_match:
+                continue
+            entity_name = entity_match.group(1)
 
-        for entity_name, entity_content in entity_matches:
             # Extract business rules for this entity
             rule_pattern = r'- (.*?)(?=\n- |\Z)'
             rule_matches = re.findall(rule_pattern, entity_content, re.DOTALL)
 
             for rule in rule_matches:
-                if 'Business Rule' in rule or 'must' in rule.lower() or 'should' in rule.lower():
+                if RULE_PATTERN.search(rule):
                     rules.append({
                         'entity': entity_name.strip(),
-                        'rule': rule.strip()
+                        'rule': rule.strip(),
+                        'rule_ids': rule_references(rule)
                     })
 
+        self._check_items(self.spec_file, 'key_entities', entities_section, rules, 'business rules')
         return rules
 
     def extract_database_entities(self) -> List[Dict[str, Any]]:
         """Extract database entity definitions from data-model.md"""
-        if not self.data_model_file.exists():
-            # Try to extract from spec.md instead
-            return self._extract_entities_from_spec()
-
-        content = self._load_file(self.data_model_file)
-        entities = []
-
-        # Pattern to match entity definitions
-        pattern = r'## \d+\. (.*?)\n(.*?)(?=## \d+\.|\Z)'
-        matches = re.findall(pattern, content, re.DOTALL)
+        return list(self.iter_database_entities())
 
-        for entity_name, entity_content in matches:
-            # Extract table name
-            table_match = re.search(r'Table Name: `(.*?)`', entity_content)
-            table_name = table_match.group(1) if table_match else ''
-
-            # Extract description
-            desc_match = re.search(r'Description: (.*?)\n', entity_content)
-            description = desc_match.group(1) if desc_match else ''
-
-            # Extract fields
-            fields = []
-            field_pattern = r'- `(.*?)` \((.*?)\): (.*?)(?=\n- |\Z)'
-            field_matches = re.findall(field_pattern, entity_content, re.DOTALL)
-
-            for field_name, field_type, field_desc in field_matches:
-                fields.append({
-                    'name': field_name,
-                    'type': field_type,
-                    'description': field_desc.strip()
-                })
-
-            entities.append({
-                'name': entity_name.strip(),
-                'table': table_name,
-                'description': description.strip(),
-                'fields': fields
-            })
-
-        return entities
+    def iter_database_entities(self) -> Iterator[Dict[str, Any]]:
+        """Stream database entity definitions from data-model.md one at a time"""
+        if not self._file_exists(self.data_model_file):
+            # Try to extract from spec.md instead
+            yield from self._iter_entities_from_spec()
+            return
 
-    def _extract_entities_from_spec(self) -> List[Dict[str, Any]]:
-        """Fallback: Extract entity information from spec.md"""
-        content = self._load_file(self.spec_file)
-        entities = []
+        self._record_read(('file', self.data_model_file.name))
+        self.bytes_scanned += self.data_model_file.stat().st_size
+        yield from iter_entities_from_file(str(self.data_model_file))
 
+    def _iter_entities_from_spec(self) -> Iterator[Dict[str, Any]]:
+        """Fallback: Stream entity information from spec.md"""
         # Find Key Entities section
-        entities_section = re.search(r'## Key Entities and Business Rules(.*?)## Functional Requirements', content, re.DOTALL)
+        entities_section = self._get_section(self.spec_file, 'key_entities')
         if not entities_section:
-            return entities
-
-        entities_content = entities_section.group(1)
+            return
 
         # Extract entities
-        entity_pattern = r'### \d+\. (.*?) \((.*?)\)(.*?)(?=###|\Z)'
-        entity_matches = re.findall(entity_pattern, entities_content, re.DOTALL)
+        for title, body in self._subsections(self.spec_file, *entities_section):
+            entity_match = re.match(r'\d+\. (.*?) \((.*?)\)(.*)', title)
+            if not entity_match:
+                continue
+            entity_name, table_name, title_rest = entity_match.groups()
+            entity_content = title_rest + '\n' + body
 
-        for entity_name, table_name, entity_content in entity_matches:
             # Extract fields
             fields = []
             field_pattern = r'- (.*?): (.*?)(?=\n- |\Z)'
@@ -202,25 +741,21 @@ class ContentExtractor:
                         'description': field_desc.strip()
                     })
 
-            entities.append({
+            yield {
                 'name': entity_name.strip(),
                 'table': table_name.strip(),
                 'fields': fields
-            })
-
-        return entities
+            }
 
     def extract_success_criteria(self) -> List[Dict[str, str]]:
         """Extract success criteria from spec.md"""
-        content = self._load_file(self.spec_file)
         criteria = []
 
         # Find success criteria section
-        sc_section = re.search(r'## Success Criteria(.*?)## Assumptions', content, re.DOTALL)
-        if not sc_section:
+        sc_section = self._get_section(self.spec_file, 'success_criteria', until='assumptions')
+        if sc_section is None:
             return criteria
-
-        sc_content = sc_section.group(1)
+        sc_content = self._section_text(self.spec_file, sc_section)
 
         # Extract individual criteria
         pattern = r'- \*\*(SC-\d+)\*\*: (.*?)(?=\n- |\Z)'
@@ -232,46 +767,50 @@ class ContentExtractor:
                 'description': description.strip()
             })
 
+        self._check_items(self.spec_file, 'success_criteria', sc_section, criteria, 'SC-xxx criteria')
         return criteria
 
     def extract_assumptions(self) -> List[str]:
         """Extract assumptions from spec.md"""
-        content = self._load_file(self.spec_file)
         assumptions = []
 
         # Find assumptions section
-        assumptions_section = re.search(r'## Assumptions(.*?)## Out of Scope', content, re.DOTALL)
-        if not assumptions_section:
+        assumptions_section = self._get_section(self.spec_file, 'assumptions', until='out_of_scope')
+        if assumptions_section is None:
             return assumptions
+        assumptions_content = self._section_text(self.spec_file, assumptions_section)
 
-        assumptions_content = assumptions_section.group(1)
-
-        # Extract individual assumptions
+        # Extract individual assumptions (bullets, or a numbered list)
         pattern = r'- (.*?)(?=\n- |\Z)'
         matches = re.findall(pattern, assumptions_content, re.DOTALL)
+        if not matches:
+            pattern = r'^\d+\. (.*?)(?=\n\d+\. |\n\n|\Z)'
+            matches = re.findall(pattern, assumptions_content, re.DOTALL | re.MULTILINE)
 
         for assumption in matches:
             assumptions.append(assumption.strip())
 
+        self._check_items(self.spec_file, 'assumptions', assumptions_section, assumptions, 'list items')
         return assumptions
 
     def extract_timeline_phases(self) -> List[Dict[str, Any]]:
         """Extract project phases from plan.md"""
-        content = self._load_file(self.plan_file)
         phases = []
 
         # Find phases section
-        phases_section = re.search(r'## Implementation Phases(.*?)(?=## |$)', content, re.DOTALL)
+        phases_section = self._get_section(self.plan_file, 'implementation_phases')
         if not phases_section:
             return phases
 
-        phases_content = phases_section.group(1)
-
         # Extract individual phases
-        pattern = r'### Phase (\d+): (.*?) \((.*?)\)(.*?)(?=### Phase |\Z)'
-        matches = re.findall(pattern, phases_content, re.DOTALL)
+        phase_headings = self._subsections(self.plan_file, *phases_section, title_pattern=r'Phase \d+: ')
+
+        for heading, content in phase_headings:
+            phase_match = re.match(r'Phase (\d+): (.*?) \((.*?)\)', heading)
+            if not phase_match:
+                continue
+            phase_num, title, duration = phase_match.groups()
 
-        for phase_num, title, duration, content in matches:
             # Extract deliverables
             deliverables = []
             deliv_pattern = r'- (.*?)(?=\n- |\Z)'
@@ -287,14 +826,15 @@ class ContentExtractor:
                 'deliverables': deliverables
             })
 
+        self._check_items(self.plan_file, 'implementation_phases', phases_section, phases,
+                          "'Phase N: Title (duration)' subsections")
         return phases
 
     def extract_technology_stack(self) -> Dict[str, Any]:
         """Extract technology decisions from research.md"""
-        if not self.research_file.exists():
+        if not self._file_exists(self.research_file):
             return self._extract_tech_from_spec()
 
-        content = self._load_file(self.research_file)
         stack = {
             'backend': [],
             'frontend': [],
@@ -304,15 +844,13 @@ class ContentExtractor:
         }
 
         # Extract technology decisions
-        tech_section = re.search(r'## Technology Decisions(.*?)(?=## |$)', content, re.DOTALL)
+        tech_section = self._get_section(self.research_file, 'technology_decisions')
         if tech_section:
-            tech_content = tech_section.group(1)
-
             # Extract individual decisions
-            decision_pattern = r'### Decision \d+: (.*?)\n(.*?)(?=### Decision |\Z)'
-            decision_matches = re.findall(decision_pattern, tech_content, re.DOTALL)
+            decisions = self._subsections(self.research_file, *tech_section, title_pattern=r'Decision \d+: ')
 
-            for tech_name, tech_desc in decision_matches:
+            for heading, tech_desc in decisions:
+                tech_name = heading.split(': ', 1)[1]
                 # Categorize based on keywords
                 if any(kw in tech_name.lower() for kw in ['.net', 'api', 'backend']):
                     stack['backend'].append(tech_name.strip())
@@ -325,12 +863,12 @@ class ContentExtractor:
                 else:
                     stack['tools'].append(tech_name.strip())
 
+            self._check_items(self.research_file, 'technology_decisions', tech_section,
+                              decisions, "'Decision N:' subsections")
         return stack
 
     def _extract_tech_from_spec(self) -> Dict[str, Any]:
         """Fallback: Extract technology stack from spec.md"""
-        content = self._load_file(self.spec_file)
-
         # Default technology stack based on project description
         return {
             'backend': ['.NET 9.0', 'ASP.NET Core', 'Entity Framework Core', 'SoapCore'],
@@ -342,7 +880,6 @@ class ContentExtractor:
 
     def extract_component_specifications(self) -> Dict[str, List[Dict[str, str]]]:
         """Extract component specifications from spec.md"""
-        content = self._load_file(self.spec_file)
         components = {
             'backend': [],
             'frontend': [],
@@ -378,34 +915,204 @@ class ContentExtractor:
 
         return components
 
+    def extract_tasks(self) -> List[Dict[str, Any]]:
+        """Extract the task checklist from tasks.md (optional file)"""
+        if not self._file_exists(self.tasks_file):
+            return []
+
+        tasks, diagnostics = parse_tasks(self._read_file(self.tasks_file))
+        for diagnostic in diagnostics:
+            self._warn(self.tasks_file, diagnostic['message'], diagnostic['line'], diagnostic['item'])
+
+        return tasks
+
+    def _run(self, name: str, extractor) -> Any:
+        """Run an extractor through the cache, measuring it when profiling"""
+        if self.profiler is None:
+            return self._cached(name, extractor)
+        return self.profiler.measure(extractor.__name__, self, lambda: self._cached(name, extractor))
+
     def extract_all(self) -> Dict[str, Any]:
         """Extract all content and return as dictionary"""
-        return {
-            'user_stories': self.extract_user_stories(),
-            'functional_requirements': self.extract_functional_requirements(),
-            'business_rules': self.extract_business_rules(),
-            'database_entities': self.extract_database_entities(),
-            'success_criteria': self.extract_success_criteria(),
-            'assumptions': self.extract_assumptions(),
-            'timeline_phases': self.extract_timeline_phases(),
-            'technology_stack': self.extract_technology_stack(),
-            'component_specifications': self.extract_component_specifications()
+        self.diagnostics = []
+        self._diagnostic_keys = set()
+        content = {
+            'user_stories': self._run('user_stories', self.extract_user_stories),
+            'functional_requirements': self._run('functional_requirements', self.extract_functional_requirements),
+            'business_rules': self._run('business_rules', self.extract_business_rules),
+            'database_entities': self._run('database_entities', self.extract_database_entities),
+            'success_criteria': self._run('success_criteria', self.extract_success_criteria),
+            'assumptions': self._run('assumptions', self.extract_assumptions),
+            'timeline_phases': self._run('timeline_phases', self.extract_timeline_phases),
+            'technology_stack': self._run('technology_stack', self.extract_technology_stack),
+            'component_specifications': self._run('component_specifications',
+                                                  self.extract_component_specifications),
+            'tasks': self._run('tasks', self.extract_tasks),
+            'diagnostics': self.diagnostics
         }
 
+        if self.cache is not None:
+            self.cache.save()
+        if self.profiler is not None:
+            self.profiler.stop()
+
+        return content
+
     def save_to_json(self, output_path: str):
         """Save extracted content to JSON file"""
         data = self.extract_all()
 
         output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_if_changed(output_file, json.dumps(data, indent=2, ensure_ascii=False))
 
         print(f"Extracted content saved to {output_file}")
         return data
 
 
+def find_spec_directories(specs_root: str) -> List[Path]:
+    """List feature directories (those containing a spec.md) under a specs root"""
+    return sorted(path.parent for path in Path(specs_root).glob('*/spec.md'))
+
+
+def extract_spec_directory(source_dir: str, cache_dir: Optional[str] = None,
+                           cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                           file_budget_bytes: int = DEFAULT_BUDGET_BYTES,
+                           profile: bool = False,
+                           section_aliases: Optional[Dict[str, List[str]]] = None) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """Run a full extraction for one spec directory (process pool worker)
+
+    Returns the extracted content and the ``extraction_cache`` and
+    ``file_cache`` statistics of the run, plus its ``profile`` report when
+    profiling.
+    """
+    cache = ExtractionCache.for_source(cache_dir, source_dir, cache_max_bytes) if cache_dir else None
+    files = FileCache(file_budget_bytes)
+    profiler = ExtractionProfiler() if profile else None
+    content = ContentExtractor(source_dir, cache=cache, file_cache=files, profiler=profiler,
+                               section_aliases=section_aliases).extract_all()
+
+    stats = {'file_cache': files.stats()}
+    if cache:
+        stats['extraction_cache'] = cache.stats()
+    if profiler:
+        stats['profile'] = profiler.report(source_dir)
+    files.clear()
+    return content, stats
+
+
+def merge_stats(total: Dict[str, Dict[str, int]], stats: Dict[str, Dict[str, int]]):
+    """Accumulate per-worker cache statistics (peaks take the maximum)"""
+    for group, counters in stats.items():
+        group_total = total.setdefault(group, {})
+        for counter, value in counters.items():
+            if counter.startswith('peak'):
+                group_total[counter] = max(group_total.get(counter, 0), value)
+            else:
+                group_total[counter] = group_total.get(counter, 0) + value
+
+
+def merge_corpus(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge per-directory extraction results into one keyed document
+
+    The merged document keeps the ``extract_all`` shape so downstream stages
+    can consume it unchanged. Every item carries a ``source`` key naming its
+    spec directory (assumptions become ``{'source', 'text'}`` records), and
+    IDs (US/FR/SC) defined more than once, in one directory or in several,
+    are listed under ``conflicts`` with their ``count`` and ``sources``.
+    """
+    merged: Dict[str, Any] = {
+        'sources': list(results),
+        'user_stories': [],
+        'functional_requirements': {},
+        'business_rules': [],
+        'database_entities': [],
+        'success_criteria': [],
+        'assumptions': [],
+        'timeline_phases': [],
+        'technology_stack': {},
+        'component_specifications': {},
+        'tasks': [],
+        'diagnostics': [],
+        'conflicts': []
+    }
+    # Every definition of an ID, by source directory, duplicates within one directory included
+    id_sources: Dict[str, List[str]] = {}
+
+    def register(item_id: str, source: str):
+        id_sources.setdefault(item_id, []).append(source)
+
+    for source, data in results.items():
+        for key in ('user_stories', 'business_rules', 'database_entities',
+                    'success_criteria', 'timeline_phases', 'tasks', 'diagnostics'):
+            merged[key].extend({**item, 'source': source} for item in data[key])
+
+        merged['assumptions'].extend({'source': source, 'text': text} for text in data['assumptions'])
+
+        for category, reqs in data['functional_requirements'].items():
+            merged['functional_requirements'].setdefault(category, []).extend(
+                {**req, 'source': source} for req in reqs
+            )
+            for req in reqs:
+                register(req['id'], source)
+
+        for layer, techs in data['technology_stack'].items():
+            layer_techs = merged['technology_stack'].setdefault(layer, [])
+            layer_techs.extend(tech for tech in techs if tech not in layer_techs)
+
+        for layer, components in data['component_specifications'].items():
+            merged['component_specifications'].setdefault(layer, []).extend(
+                {**component, 'source': source} for component in components
+            )
+
+        for item in data['user_stories'] + data['success_criteria']:
+            register(item['id'], source)
+
+    merged['conflicts'] = [
+        {'id': item_id, 'count': len(sources), 'sources': list(dict.fromkeys(sources))}
+        for item_id, sources in id_sources.items()
+        if len(sources) > 1
+    ]
+
+    return merged
+
+
+def extract_corpus(source_dirs: List[Path], max_workers: Optional[int] = None,
+                   cache_dir: Optional[str] = None,
+                   cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                   file_budget_bytes: int = DEFAULT_BUDGET_BYTES,
+                   profile: bool = False,
+                   section_aliases: Optional[Dict[str, List[str]]] = None) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """Extract every spec directory in parallel worker processes and merge the results
+
+    Returns the merged document and the cache statistics summed over
+    workers; when profiling, ``profile`` holds one report per directory.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    cache_stats: Dict[str, Dict[str, Any]] = {}
+    profiles: Dict[str, Dict[str, Any]] = {}
+    if not source_dirs:
+        return merge_corpus(results), cache_stats
+
+    workers = min(max_workers or os.cpu_count() or 1, len(source_dirs))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        extracted = executor.map(extract_spec_directory,
+                                 [str(path) for path in source_dirs],
+                                 [cache_dir] * len(source_dirs),
+                                 [cache_max_bytes] * len(source_dirs),
+                                 [file_budget_bytes] * len(source_dirs),
+                                 [profile] * len(source_dirs),
+                                 [section_aliases] * len(source_dirs))
+        for path, (data, stats) in zip(source_dirs, extracted):
+            results[path.name] = data
+            if 'profile' in stats:
+                profiles[path.name] = stats.pop('profile')
+            merge_stats(cache_stats, stats)
+
+    if profile:
+        cache_stats['profile'] = {'sources': profiles}
+    return merge_corpus(results), cache_stats
+
+
 def main():
     """Main function for testing content extraction"""
     import argparse
@@ -417,6 +1124,21 @@ def main():
     parser.add_argument('--output', '-o',
                        default='../output/intermediate/extracted_content.json',
                        help='Output JSON file path')
+    parser.add_argument('--no-cache',
+                       action='store_true',
+                       help='Ignore the persistent extraction cache')
+    parser.add_argument('--cache-size-mb',
+                       type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                       help='Maximum size of the extraction cache in MB')
+    parser.add_argument('--file-budget-mb',
+                       type=int, default=DEFAULT_BUDGET_BYTES // (1024 * 1024),
+                       help='Maximum size of source files held open in MB')
+    parser.add_argument('--profile',
+                       action='store_true',
+                       help='Record time, bytes scanned, matches and peak allocation per extractor')
+    parser.add_argument('--config', '-c',
+                       default='../../config/document-config.yaml',
+                       help='Document configuration with section_aliases')
 
     args = parser.parse_args()
 
@@ -424,9 +1146,22 @@ def main():
     script_dir = Path(__file__).parent
     source_dir = (script_dir / args.source).resolve()
     output_file = (script_dir / args.output).resolve()
-
-    # Extract content
-    extractor = ContentExtractor(str(source_dir))
+    config_file = (script_dir / args.config).resolve()
+
+    section_aliases = None
+    if config_file.exists():
+        with open(config_file, 'r', encoding='utf-8') as f:
+            section_aliases = (yaml.safe_load(f) or {}).get('section_aliases')
+
+    # Extract content, reusing results cached next to the output file
+    cache = None
+    if not args.no_cache:
+        cache = ExtractionCache.for_source(str(output_file.parent), str(source_dir),
+                                           args.cache_size_mb * 1024 * 1024)
+    files = FileCache(args.file_budget_mb * 1024 * 1024)
+    profiler = ExtractionProfiler() if args.profile else None
+    extractor = ContentExtractor(str(source_dir), cache=cache, file_cache=files, profiler=profiler,
+                                 section_aliases=section_aliases)
     data = extractor.save_to_json(str(output_file))
 
     # Print summary
@@ -438,6 +1173,24 @@ def main():
     print(f"- Success Criteria: {len(data['success_criteria'])}")
     print(f"- Assumptions: {len(data['assumptions'])}")
     print(f"- Timeline Phases: {len(data['timeline_phases'])}")
+    print(f"- Tasks: {len(data['tasks'])}")
+    if cache is not None:
+        print(f"- Cache: {cache.hits} hits, {cache.misses} misses, {cache.evictions} evictions")
+    file_stats = files.stats()
+    print(f"- Files: {file_stats['files']} open, {file_stats['bytes_resident']:,} bytes resident, "
+          f"{file_stats['bytes_mapped']:,} bytes mapped, {file_stats['evictions']} evictions")
+
+    if profiler is not None:
+        report = profiler.report(str(source_dir))
+        profile_file = write_profile(report, str(output_file.parent))
+        print(f"\nProfile ({report['total']['wall_time_ms']:.2f} ms, saved to {profile_file}):")
+        print_profile(report)
+
+    if data['diagnostics']:
+        print(f"\nDiagnostics ({len(data['diagnostics'])}):")
+        for diagnostic in data['diagnostics']:
+            location = f"{diagnostic['file']}:{diagnostic['line']}" if diagnostic['line'] else diagnostic['file']
+            print(f"- {location} [{diagnostic['item']}] {diagnostic['message']}")
 
 
 if __name__ == '__main__':
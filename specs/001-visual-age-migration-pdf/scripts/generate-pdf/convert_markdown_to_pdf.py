@@ -9,36 +9,14 @@ import subprocess
 from pathlib import Path
 from datetime import datetime
 
-def main():
-    print("🚀 Convertendo documentação Markdown completa para PDF...")
-    print("   ZERO RESUMOS - TODO O CONTEÚDO SERÁ INCLUÍDO")
-
-    # Source markdown files
-    docs_dir = Path("/Users/brunosouza/Development/Caixa Seguradora/POC Visual Age/docs")
-    output_dir = Path(__file__).parent.parent.parent / "output"
-    output_dir.mkdir(exist_ok=True)
+from corpus_converter import BASE_DIR, DEFAULT_SOURCES, convert_corpus, corpus_files, load_corpus_settings
 
-    complete_analysis = docs_dir / "LEGACY_SIWEA_COMPLETE_ANALYSIS.md"
-    business_rules = docs_dir / "BUSINESS_RULES_INDEX.md"
-
-    if not complete_analysis.exists():
-        print(f"❌ Erro: Arquivo não encontrado: {complete_analysis}")
-        return 1
-
-    # Read markdown content
-    print(f"✓ Lendo {complete_analysis.name} ({complete_analysis.stat().st_size / 1024:.1f} KB)...")
-    content = complete_analysis.read_text()
-
-    print(f"✓ Lendo {business_rules.name}...")
-    br_content = business_rules.read_text()
-
-    # Combine into single markdown
-    combined_md = f"""# Visual Age to .NET Migration - Documentação Técnica Completa
+COVER = """# Visual Age to .NET Migration - Documentação Técnica Completa
 
 **Sistema**: SIWEA - Autorização de Pagamento de Indenizações de Sinistros
 **Tecnologia Legada**: IBM VisualAge EZEE 4.40
 **Tecnologia Alvo**: .NET 9 + React 19 + Azure
-**Data**: {datetime.now().strftime("%d/%m/%Y")}
+**Data**: {date}
 **Versão**: 1.0
 
 ---
@@ -53,24 +31,40 @@ def main():
 - ✅ TODO o workflow de fases
 - ✅ TODAS as especificações de auditoria
 
-**ZERO RESUMOS - DOCUMENTAÇÃO COMPLETA**
+**ZERO RESUMOS - DOCUMENTAÇÃO COMPLETA**"""
 
----
+CLOSING = """**Fim do Documento**
+Total de páginas estimadas: 100-150"""
 
-{content}
 
----
+def main():
+    print("🚀 Convertendo documentação Markdown completa para PDF...")
+    print("   ZERO RESUMOS - TODO O CONTEÚDO SERÁ INCLUÍDO")
 
-# Índice de Regras de Negócio
+    # Source markdown files: docs/ and specs/* in the order of corpus_settings
+    settings = load_corpus_settings(BASE_DIR / "config" / "document-config.yaml")
+    sources = corpus_files(BASE_DIR, settings.get('sources', DEFAULT_SOURCES), settings.get('order'))
+    output_dir = Path(__file__).parent.parent.parent / "output"
+    output_dir.mkdir(exist_ok=True)
 
-{br_content}
+    if not sources:
+        print("❌ Erro: Nenhum arquivo markdown encontrado (corpus_settings.sources)")
+        return 1
 
----
+    # Parse and convert each file in worker processes; links between
+    # files become links inside the combined document
+    print(f"✓ Lendo {len(sources)} arquivos...")
+    corpus, results = convert_corpus(sources, 'markdown', max_workers=settings.get('workers') or None)
+    unresolved = sum(result['unresolved'] for result in results)
+    if unresolved:
+        print(f"⚠️  {unresolved} links internos sem destino")
 
-**Fim do Documento**
-Total de páginas estimadas: 100-150
-Gerado automaticamente via Claude Code
-"""
+    # Combine into single markdown
+    combined_md = '\n\n---\n\n'.join([
+        COVER.format(date=datetime.now().strftime("%d/%m/%Y")),
+        corpus,
+        CLOSING
+    ]) + '\n'
 
     # Save combined markdown
     combined_file = output_dir / "COMPLETE_DOCUMENTATION.md"
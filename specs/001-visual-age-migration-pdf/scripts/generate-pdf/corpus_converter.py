@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Corpus Converter for Visual Age Migration PDF Generation
+Converts the legacy docs and the feature specs in worker processes and merges them in a configured order
+"""
+
+import html
+import os
+import sys
+import time
+import yaml
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import markdown2
+
+sys.path.insert(0, str(Path(__file__).parent / "utils"))
+
+from anchor_registry import AnchorRegistry, is_internal
+from artifact_writer import write_if_changed
+from latex_emitter import LatexEmitter
+from markdown_ast import LINK
+from markdown_parser import MarkdownParser, frontmatter_end
+
+
+# Feature directory (001-visual-age-migration-pdf); corpus paths in the config are relative to it
+BASE_DIR = Path(__file__).parent.parent.parent
+
+DEFAULT_SOURCES = ['../../docs/*.md', '../*/spec.md']
+
+FORMATS = ('latex', 'markdown')
+
+SUFFIXES = {'latex': '.tex', 'markdown': '.md', 'html': '.html'}
+
+# Preview page; {toc} is the sidebar built by markdown2's toc extra
+HTML_PAGE = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ margin: 0; font-family: sans-serif; line-height: 1.5; }}
+nav {{ position: fixed; top: 0; bottom: 0; left: 0; width: 20rem; overflow-y: auto;
+       padding: 1rem; box-sizing: border-box; background: #f4f6f8; font-size: 0.85rem; }}
+nav ul {{ padding-left: 1rem; }}
+main {{ margin-left: 20rem; padding: 1rem 2rem; max-width: 60rem; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #ccc; padding: 0.25rem 0.5rem; vertical-align: top; }}
+pre {{ background: #f4f6f8; padding: 0.5rem; overflow-x: auto; }}
+</style>
+</head>
+<body>
+<nav>
+{toc}</nav>
+<main>
+{body}
+</main>
+</body>
+</html>
+"""
+
+# One parser per worker process, created on first use
+_parser: Optional[MarkdownParser] = None
+
+
+def _get_parser() -> MarkdownParser:
+    global _parser
+    if _parser is None:
+        _parser = MarkdownParser()
+    return _parser
+
+
+def corpus_files(base_dir: Path, sources: List[str], order: Optional[List[str]] = None) -> List[Path]:
+    """Resolve the corpus globs; files listed in ``order`` come first, the rest in path order"""
+    files = sorted({path.resolve() for pattern in sources for path in base_dir.glob(pattern) if path.is_file()})
+    ranks = {(base_dir / name).resolve(): rank for rank, name in enumerate(order or [])}
+    return sorted(files, key=lambda path: (ranks.get(path, len(ranks)), str(path)))
+
+
+def collect_outline(file_path: str) -> List[Tuple[int, int, str]]:
+    """Headings and ID definitions of one document (process pool worker)"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return _get_parser().outline(f.read())
+
+
+def build_registry(paths: List[str], outlines) -> AnchorRegistry:
+    """One registry for the corpus, filled in merge order so anchors do not depend on worker timing"""
+    anchors = AnchorRegistry()
+    for path, outline in zip(paths, outlines):
+        anchors.add_outline(outline, scope=path)
+    return anchors
+
+
+def convert_document(file_path: str, anchors: AnchorRegistry,
+                     output_format: str = 'latex') -> Dict[str, Any]:
+    """Parse one document and convert it with its links resolved against the corpus (process pool worker)
+
+    ``anchors`` holds the headings and ID definitions of every corpus file,
+    so anchors are unique in the merged document and links and rule IDs
+    resolve across files. In LaTeX, links that cannot be resolved are
+    rendered as plain text. Markdown keeps the document text and only
+    rewrites the URLs of resolved links.
+    """
+    started = time.perf_counter()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    document = _get_parser().parse_ast(content, anchors, scope=file_path)
+    rewrites: List[Tuple[int, int, str]] = []
+
+    # Children are replaced before walk() descends into them, so a link
+    # unwrapped into its text is never visited itself
+    for node in document.walk():
+        if not any(child.kind == LINK for child in node.children):
+            continue
+
+        children = []
+        for child in node.children:
+            url = child.get('url', '') if child.kind == LINK else ''
+            if url.startswith('#') and url[1:] in anchors:
+                # The URL closes the link: [text](url); links made from ID mentions have none
+                url_start = content.rfind('](', child.start, child.end) + 2
+                if url_start >= 2 and content[url_start:child.end - 1] != url:
+                    rewrites.append((url_start, child.end - 1, url))
+            elif output_format == 'latex' and is_internal(url):
+                children.extend(child.children)
+                continue
+            children.append(child)
+        node.children = children
+
+    if output_format == 'latex':
+        output = LatexEmitter().emit(document)
+    else:
+        parts = []
+        position = frontmatter_end(content)
+        for start, end, url in rewrites:
+            parts.append(content[position:start])
+            parts.append(url)
+            position = end
+        parts.append(content[position:])
+        output = ''.join(parts).strip() + '\n'
+
+    return {
+        'file': file_path,
+        'output': output,
+        'bytes': len(content.encode('utf-8')),
+        'links': document.get('links')['links'],
+        'references': document.get('links')['references'],
+        'unresolved': document.get('links')['unresolved'],
+        'seconds': time.perf_counter() - started
+    }
+
+
+def render_section(text: str) -> Tuple[str, List[Tuple[int, str, str]]]:
+    """HTML and TOC entries of one section (process pool worker, reusing its parser's markdown2 instance)"""
+    return _get_parser().render_html(text)
+
+
+def render_corpus_html(files: List[Path], max_workers: Optional[int] = None,
+                       title: str = 'Visual Age Migration') -> Tuple[str, List[Dict[str, Any]]]:
+    """Render every section of the corpus to HTML in worker processes; one page with a TOC sidebar
+
+    Sections of all documents are submitted at once, so workers stay busy
+    across document boundaries; results are joined in corpus order, with
+    heading ids and internal links taken from one anchor registry.
+    Returns the page and one report per document.
+    """
+    if not files:
+        return HTML_PAGE.format(title=html.escape(title), toc='', body=''), []
+
+    parser = _get_parser()
+    paths = [str(path) for path in files]
+    workers = max_workers or os.cpu_count() or 1
+
+    documents = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        documents.append((path, content, parser.html_spans(content)))
+    texts = [content[start:end] for _, content, spans in documents for start, end in spans]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(texts))) as executor:
+        anchors = build_registry(paths, executor.map(collect_outline, paths))
+        rendered = executor.map(render_section, texts, chunksize=max(1, len(texts) // (workers * 4)))
+
+        parts = []
+        toc = []
+        results = []
+        for path, content, spans in documents:
+            body, entries = parser.join_html(spans, islice(rendered, len(spans)), anchors, path)
+            parts.append(body)
+            toc.extend(entries)
+            results.append({'file': path, 'bytes': len(content.encode('utf-8')), 'sections': len(spans)})
+
+    page = HTML_PAGE.format(title=html.escape(title), toc=markdown2.calculate_toc_html(toc) or '',
+                            body='\n<hr>\n'.join(parts))
+    return page, results
+
+
+def convert_corpus(files: List[Path], output_format: str = 'latex',
+                   max_workers: Optional[int] = None) -> Tuple[str, List[Dict[str, Any]]]:
+    """Convert every document in worker processes and merge the outputs in the order of ``files``
+
+    Outlines are collected first (in parallel) and registered in list order,
+    so each worker can resolve links and rule IDs to any other document.
+    Documents are submitted largest first to keep workers busy, and merged
+    back in list order. Returns the merged
+    output and one report per document (without its output).
+    """
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    if not files:
+        return '', []
+
+    paths = [str(path) for path in files]
+    workers = min(max_workers or os.cpu_count() or 1, len(files))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        anchors = build_registry(paths, executor.map(collect_outline, paths))
+
+        by_size = sorted(paths, key=lambda path: os.path.getsize(path), reverse=True)
+        futures = {path: executor.submit(convert_document, path, anchors, output_format) for path in by_size}
+        results = [futures[path].result() for path in paths]
+
+    separator = '\n\n' if output_format == 'latex' else '\n\n---\n\n'
+    merged = separator.join(result.pop('output') for result in results)
+    return merged, results
+
+
+def load_corpus_settings(config_file: Path) -> Dict[str, Any]:
+    """corpus_settings of document-config.yaml (empty when the file is missing)"""
+    if not config_file.exists():
+        return {}
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return (yaml.safe_load(f) or {}).get('corpus_settings') or {}
+
+
+def main():
+    """Convert the documentation corpus from the command line"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert the documentation corpus to one LaTeX, markdown or HTML document')
+    parser.add_argument('--config', '-c',
+                       default=str(BASE_DIR / 'config' / 'document-config.yaml'),
+                       help='Document configuration with corpus_settings')
+    parser.add_argument('--format', '-f', choices=FORMATS + ('html',), default='latex',
+                       help='Output format')
+    parser.add_argument('--output', '-o',
+                       help='Output file (default: output/intermediate/corpus.tex, .md or .html)')
+    parser.add_argument('--workers', '-w', type=int,
+                       help='Worker processes (default: corpus_settings.workers or one per CPU)')
+    parser.add_argument('--list', action='store_true',
+                       help='Only print the documents in merge order')
+
+    args = parser.parse_args()
+
+    settings = load_corpus_settings(Path(args.config))
+    files = corpus_files(BASE_DIR, settings.get('sources', DEFAULT_SOURCES), settings.get('order'))
+
+    if args.list:
+        for path in files:
+            print(path)
+        return 0
+
+    workers = args.workers or settings.get('workers') or None
+    print(f"📚 Converting {len(files)} documents ({args.format})...")
+    started = time.perf_counter()
+    if args.format == 'html':
+        merged, results = render_corpus_html(files, max_workers=workers)
+    else:
+        merged, results = convert_corpus(files, args.format, max_workers=workers)
+    elapsed = time.perf_counter() - started
+
+    output_file = Path(args.output) if args.output else \
+        BASE_DIR / 'output' / 'intermediate' / f'corpus{SUFFIXES[args.format]}'
+    write_if_changed(output_file, merged)
+
+    size = sum(result['bytes'] for result in results)
+    if args.format == 'html':
+        sections = sum(result['sections'] for result in results)
+        print(f"✅ {size / 1024:.1f} KB, {sections} sections in {elapsed:.2f} s → {output_file}")
+        return 0
+    busy = sum(result['seconds'] for result in results)
+    for result in results:
+        note = f", {result['unresolved']} unresolved links" if result['unresolved'] else ''
+        print(f"  ✓ {os.path.relpath(result['file'], BASE_DIR.parent.parent)}: {result['bytes'] / 1024:.1f} KB, "
+              f"{result['seconds'] * 1000:.0f} ms{note}")
+    print(f"✅ {size / 1024:.1f} KB in {elapsed:.2f} s ({busy:.2f} s of conversion work) → {output_file}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Diagram Renderer for Visual Age Migration PDF Generation
+Renders changed PlantUML diagrams in one JVM run into a content-addressed cache
+"""
+
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+if __name__ == '__main__':
+    # Run as a script: the caches build on utils/persistent_cache.py
+    sys.path.insert(0, str(Path(__file__).parent / "utils"))
+
+from artifact_writer import write_if_changed
+from extraction_cache import content_hash
+
+
+RENDER_TIMEOUT = 600
+
+
+class DiagramRenderer:
+    """PlantUML renders stored under the hash of their source and settings
+
+    Artifacts are kept as ``cache/<hash>.<format>`` in the output directory
+    and copied to ``<diagram>.<format>`` next to it, which is what the
+    document includes. A diagram whose hash is in the cache is never
+    rendered again; all others go to a single PlantUML run, so a build
+    pays for one JVM start at most. Without Java the cached artifacts
+    are used, and a diagram changed since its last render keeps that
+    render.
+    """
+
+    def __init__(self, output_dir: Path, jar: Optional[str], output_format: str = 'pdf', dpi: int = 300,
+                 java: Optional[str] = None):
+        """Store renders under ``output_dir``; ``java`` defaults to the one on PATH"""
+        self.output_dir = Path(output_dir)
+        self.store_dir = self.output_dir / 'cache'
+        self.jar = jar
+        self.output_format = output_format
+        self.dpi = dpi
+        self.java = java or shutil.which('java')
+
+    def key(self, source: str) -> str:
+        """Hash of a diagram source and of the settings it is rendered with"""
+        settings = json.dumps({'format': self.output_format, 'dpi': self.dpi}, sort_keys=True)
+        return content_hash(settings + '\n' + source)
+
+    def artifact(self, key: str) -> Path:
+        """Cached render of a diagram hash"""
+        return self.store_dir / f"{key}.{self.output_format}"
+
+    @property
+    def can_render(self) -> bool:
+        return bool(self.java and self.jar and Path(self.jar).exists())
+
+    def _render_batch(self, sources: Dict[str, str]) -> Optional[str]:
+        """Render ``{hash: source}`` with one PlantUML run; returns its error output when it failed"""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=self.output_dir) as work_dir:
+            # Renders are named after their source file, so name those by hash
+            files = []
+            for key, source in sources.items():
+                path = Path(work_dir) / f"{key}.puml"
+                path.write_text(source, encoding='utf-8')
+                files.append(str(path))
+            command = [self.java, '-Djava.awt.headless=true', '-jar', str(self.jar),
+                       f"-t{self.output_format}", f"-Sdpi={self.dpi}", '-charset', 'UTF-8',
+                       '-nbthread', 'auto', '-o', str(self.store_dir.resolve())] + files
+            try:
+                result = subprocess.run(command, capture_output=True, text=True, timeout=RENDER_TIMEOUT)
+            except (OSError, subprocess.SubprocessError) as e:
+                return str(e)
+        return None if result.returncode == 0 else (result.stderr or result.stdout).strip()
+
+    def _publish(self, key: str, target: Path) -> bool:
+        """Copy a cached render to its diagram name unless it is already there"""
+        return write_if_changed(target, self.artifact(key).read_bytes())
+
+    def render(self, sources: List[Path]) -> Dict[str, Any]:
+        """Bring the render of every source up to date
+
+        Returns the hash of each diagram and the names that were
+        ``rendered``, taken from the ``cached`` store, left ``stale`` (an
+        older render kept because this one could not be made) or are
+        ``missing``, plus the PlantUML ``error`` output when its run failed.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        keys = {}
+        pending = {}
+        for path in sources:
+            source = Path(path).read_text(encoding='utf-8')
+            keys[Path(path).stem] = key = self.key(source)
+            if not self.artifact(key).exists():
+                pending[key] = source
+
+        error = None
+        if pending and self.can_render:
+            error = self._render_batch(pending)
+
+        report: Dict[str, Any] = {'diagrams': keys, 'rendered': [], 'cached': [], 'stale': [], 'missing': []}
+        for name, key in keys.items():
+            target = self.output_dir / f"{name}.{self.output_format}"
+            if self.artifact(key).exists():
+                self._publish(key, target)
+                report['rendered' if key in pending else 'cached'].append(name)
+            else:
+                report['stale' if target.exists() else 'missing'].append(name)
+        if error:
+            report['error'] = error
+        return report
+
+
+def main():
+    """Render the PlantUML diagrams of a directory"""
+    import argparse
+
+    base_dir = Path(__file__).parent.parent.parent
+    parser = argparse.ArgumentParser(description='Render PlantUML diagrams with a content-addressed cache')
+    parser.add_argument('--source', '-s', default=str(base_dir / 'contracts' / 'diagram-definitions'),
+                        help='Directory of .puml files')
+    parser.add_argument('--output', '-o', default=str(base_dir.parent / 'output' / 'diagrams'),
+                        help='Output directory')
+    parser.add_argument('--jar', default=str(base_dir / 'plantuml.jar'), help='PlantUML jar')
+    parser.add_argument('--format', '-f', default='pdf', help='PlantUML output format')
+    parser.add_argument('--dpi', type=int, default=300, help='Render resolution')
+
+    args = parser.parse_args()
+
+    renderer = DiagramRenderer(Path(args.output), args.jar, args.format, args.dpi)
+    report = renderer.render(sorted(Path(args.source).glob('*.puml')))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 1 if report['missing'] or 'error' in report else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Extraction Cache for Visual Age Migration PDF Generation
+Persists extractor results keyed by the content hash of the sections they read
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional, Tuple, Union
+
+from persistent_cache import DEFAULT_MAX_BYTES, PersistentCache, sources_version
+
+
+def content_hash(text: Union[str, bytes]) -> str:
+    """Return the SHA-256 hex digest of a text or of its UTF-8 bytes"""
+    if isinstance(text, str):
+        text = text.encode('utf-8')
+    return hashlib.sha256(text).hexdigest()
+
+
+def file_hash(file_path: str, chunk_size: int = 64 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+EXTRACTOR_SOURCES = (
+    Path(__file__).parent / 'content_extractor.py',
+    Path(__file__).parent / 'business_rule_index.py',
+)
+
+
+def extractor_version() -> str:
+    """Hash of the content extractor sources used to invalidate stale caches"""
+    return sources_version(EXTRACTOR_SOURCES)
+
+
+class ExtractionCache(PersistentCache):
+    """Persistent LRU cache of extractor results
+
+    Each entry stores the result of one extractor together with the inputs
+    it read (file or section descriptors) and their content hashes. An entry
+    is reused only while every recorded input still hashes the same, so an
+    edit to one section only reruns the extractors that read it.
+    """
+
+    SOURCES = EXTRACTOR_SOURCES
+
+    @classmethod
+    def for_source(cls, cache_dir: str, source_dir: str, max_bytes: int = DEFAULT_MAX_BYTES) -> 'ExtractionCache':
+        """Open the cache file of one spec directory
+
+        Each spec directory gets its own file so corpus workers never write
+        the same cache concurrently.
+        """
+        return cls(str(Path(cache_dir) / f'extraction-cache-{Path(source_dir).name}.json'), max_bytes)
+
+    def get(self, name: str, fingerprint) -> Optional[Dict[str, Any]]:
+        """Return the entry for an extractor whose inputs are all unchanged
+
+        ``fingerprint`` maps an input descriptor to its current hash.
+        """
+        for entry in self._entries.get(name, []):
+            if all(fingerprint(tuple(source)) == digest for source, digest in entry['inputs']):
+                return self._hit(entry)
+
+        self.misses += 1
+        return None
+
+    def put(self, name: str, inputs: List[List[Any]], result: Any, diagnostics: List[Dict[str, Any]]):
+        """Store an extractor result with the hashed inputs it was computed from"""
+        entry = {
+            'inputs': inputs,
+            'result': result,
+            'diagnostics': diagnostics,
+            'last_used': self._tick()
+        }
+        entry['size'] = len(json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+
+        self._entries.setdefault(name, []).insert(0, entry)
+        self._dirty = True
+
+    def _sized_entries(self) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        """Every entry with the extractor name it belongs to"""
+        return [(name, entry) for name, entries in self._entries.items() for entry in entries]
+
+    def _drop(self, name: str, entry: Dict[str, Any]):
+        """Remove one entry, and the extractor once it has none left"""
+        self._entries[name].remove(entry)
+        if not self._entries[name]:
+            del self._entries[name]
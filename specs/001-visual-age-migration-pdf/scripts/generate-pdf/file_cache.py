@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+File Cache for Visual Age Migration PDF Generation
+Byte-budgeted LRU cache of source files with memory-mapped views of large files
+"""
+
+import mmap
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Union
+
+
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+DEFAULT_MMAP_THRESHOLD = 1024 * 1024
+
+
+class SourceBuffer:
+    """Raw UTF-8 bytes of one source file, decoded lazily slice by slice
+
+    Small files are read into memory; files at or above the mmap threshold
+    are memory-mapped so only the pages that are actually sliced become
+    resident. Offsets are byte offsets.
+    """
+
+    def __init__(self, file_path: Path, mmap_threshold: int = DEFAULT_MMAP_THRESHOLD):
+        """Open the file, mapping it when it is large"""
+        self.file_path = Path(file_path)
+        self.size = self.file_path.stat().st_size
+        self.mapped = self.size >= mmap_threshold and self.size > 0
+
+        with open(self.file_path, 'rb') as f:
+            if self.mapped:
+                self.data: Union[bytes, mmap.mmap] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.data = f.read()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def find(self, sub: bytes, start: int = 0) -> int:
+        """Find a byte sequence from an offset"""
+        return self.data.find(sub, start)
+
+    def raw(self, start: int = 0, end: int = None) -> bytes:
+        """Return the undecoded bytes of a slice"""
+        return self.data[start:self.size if end is None else end]
+
+    def text(self, start: int = 0, end: int = None) -> str:
+        """Decode a slice as UTF-8"""
+        return self.raw(start, end).decode('utf-8')
+
+    def close(self):
+        """Release the mapping or the in-memory copy"""
+        if self.mapped:
+            self.data.close()
+        self.data = b''
+
+
+class FileCache:
+    """LRU cache of SourceBuffers bounded by a byte budget"""
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES,
+                 mmap_threshold: int = DEFAULT_MMAP_THRESHOLD):
+        """Initialize an empty cache"""
+        self.budget_bytes = budget_bytes
+        self.mmap_threshold = mmap_threshold
+        self._buffers: 'OrderedDict[str, SourceBuffer]' = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.peak_bytes = 0
+
+    def get(self, file_path: Path) -> SourceBuffer:
+        """Return the buffer for a file, loading it and evicting older files as needed"""
+        key = str(file_path)
+        if key in self._buffers:
+            self._buffers.move_to_end(key)
+            self.hits += 1
+            return self._buffers[key]
+
+        self.misses += 1
+        buffer = SourceBuffer(file_path, self.mmap_threshold)
+        self._buffers[key] = buffer
+        self._evict(keep=key)
+        self.peak_bytes = max(self.peak_bytes, self.bytes_cached())
+        return buffer
+
+    def _evict(self, keep: str):
+        """Close least recently used buffers until the cache fits its budget"""
+        while self.bytes_cached() > self.budget_bytes and len(self._buffers) > 1:
+            key = next(iter(self._buffers))
+            if key == keep:
+                break
+            self._buffers.pop(key).close()
+            self.evictions += 1
+
+    def bytes_cached(self) -> int:
+        """Total size of all cached files, in memory or mapped"""
+        return sum(buffer.size for buffer in self._buffers.values())
+
+    def clear(self):
+        """Close every buffer"""
+        for buffer in self._buffers.values():
+            buffer.close()
+        self._buffers.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return residency and eviction statistics"""
+        return {
+            'files': len(self._buffers),
+            'bytes_resident': sum(b.size for b in self._buffers.values() if not b.mapped),
+            'bytes_mapped': sum(b.size for b in self._buffers.values() if b.mapped),
+            'peak_bytes': self.peak_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
@@ -11,6 +11,7 @@ import yaml
 import argparse
 import subprocess
 import shutil
+import time
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Optional
@@ -20,7 +21,16 @@ sys.path.append(str(Path(__file__).parent))
 sys.path.append(str(Path(__file__).parent / 'utils'))
 
 # Import our modules
-from content_extractor import ContentExtractor
+from artifact_writer import write_if_changed
+from build_graph import BuildError, BuildGraph, Stage
+from business_rule_index import BusinessRuleIndex, RULES_INDEX_FILE, RULES_CATALOG_FILE
+from content_extractor import ContentExtractor, SOURCE_FILES, extract_corpus, find_spec_directories
+from diagram_renderer import DiagramRenderer
+from extraction_cache import ExtractionCache, file_hash
+from extraction_profiler import ExtractionProfiler, write_profile, print_profile
+from file_cache import FileCache
+from toolchain_probe import DEFAULT_TTL_HOURS, load_toolchain
+from traceability_matrix import TraceabilityMatrix
 
 
 class PDFGenerator:
@@ -42,6 +52,17 @@ class PDFGenerator:
         # Track task completion
         self.completed_tasks = []
 
+        # Business rules of the legacy docs and specs, built by extract_content
+        self.rule_index = BusinessRuleIndex()
+
+        # Task / user story / requirement / success criterion links, built by extract_content
+        self.traceability = TraceabilityMatrix()
+
+        # Toolchain probe (see probe_toolchain); refreshed when the prerequisites stage is forced
+        self.toolchain: Optional[Dict[str, Any]] = None
+        self.toolchain_cached = False
+        self.refresh_toolchain = False
+
     def setup_paths(self):
         """Setup all required paths from configuration"""
         self.paths = {}
@@ -51,77 +72,144 @@ class PDFGenerator:
             else:
                 self.paths[key] = value
 
-    def check_prerequisites(self) -> bool:
+    def probe_toolchain(self, refresh: bool = False) -> Dict[str, Any]:
+        """Versions, paths and capabilities of the external tools, probed once per TTL
+
+        The probe is kept in the intermediate directory, keyed by PATH and
+        by where each tool resolves with its modification time, so builds
+        after the first start no process unless the toolchain changed or
+        build_settings.probe_ttl_hours passed. ``refresh`` probes anyway.
+        """
+        if refresh or self.toolchain is None:
+            settings = self.config.get('build_settings', {})
+            self.toolchain, self.toolchain_cached = load_toolchain(
+                self.paths['intermediate_dir'] / 'toolchain-probe.json',
+                self.base_dir / 'plantuml.jar',
+                self.config.get('latex_settings', {}).get('packages', []),
+                ttl_hours=settings.get('probe_ttl_hours', DEFAULT_TTL_HOURS),
+                refresh=refresh)
+        return self.toolchain
+
+    def check_prerequisites(self, refresh: bool = False) -> bool:
         """Check if all prerequisites are installed (T006-T008)"""
         print("\n📋 Checking prerequisites...")
 
-        prerequisites = {
-            'Python': self.check_python(),
-            'Java': self.check_java(),
-            'PlantUML': self.check_plantuml(),
-            'LaTeX': self.check_latex()
-        }
+        toolchain = self.probe_toolchain(refresh=refresh)
+        names = {'python': 'Python', 'java': 'Java', 'plantuml': 'PlantUML', 'latex': 'LaTeX'}
 
-        for tool, status in prerequisites.items():
-            icon = "✅" if status else "❌"
-            print(f"  {icon} {tool}: {'Installed' if status else 'Not found'}")
+        for tool, name in names.items():
+            probe = toolchain['tools'][tool]
+            icon = "✅" if probe['found'] else "❌"
+            detail = probe['version'] or probe['path'] or 'Installed'
+            print(f"  {icon} {name}: {detail if probe['found'] else 'Not found'}")
 
-        return all(prerequisites.values())
+        missing = [package for package, found in toolchain['capabilities']['latex_packages'].items() if not found]
+        if toolchain['tools']['latex']['found'] and missing:
+            print(f"  ⚠️  LaTeX packages not found: {', '.join(missing)}")
+        if self.toolchain_cached:
+            print("  (cached probe; --force prerequisites probes again)")
+
+        return toolchain['ready']
 
     def check_python(self) -> bool:
         """Check Python installation"""
-        try:
-            result = subprocess.run(['python3', '--version'],
-                                  capture_output=True, text=True)
-            return result.returncode == 0
-        except:
-            return False
+        return self.probe_toolchain()['tools']['python']['found']
 
     def check_java(self) -> bool:
         """Check Java installation"""
-        try:
-            result = subprocess.run(['java', '-version'],
-                                  capture_output=True, text=True)
-            return result.returncode == 0
-        except:
-            return False
+        return self.probe_toolchain()['tools']['java']['found']
 
     def check_plantuml(self) -> bool:
         """Check PlantUML installation"""
-        plantuml_jar = self.base_dir / 'plantuml.jar'
-        return plantuml_jar.exists()
+        return self.probe_toolchain()['tools']['plantuml']['found']
 
     def check_latex(self) -> bool:
         """Check LaTeX installation"""
-        try:
-            result = subprocess.run(['pdflatex', '--version'],
-                                  capture_output=True, text=True)
-            return result.returncode == 0
-        except:
-            return False
-
-    def extract_content(self) -> Dict[str, Any]:
-        """Extract content from source specifications (T041-T055)"""
+        return self.probe_toolchain()['tools']['latex']['found']
+
+    def load_extracted_content(self) -> Dict[str, Any]:
+        """Content saved by extract_content"""
+        with open(self.paths['intermediate_dir'] / 'extracted_content.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def extract_content(self, corpus: bool = False, workers: Optional[int] = None,
+                        use_cache: bool = True, profile: bool = False) -> Dict[str, Any]:
+        """Extract content from source specifications (T041-T055)
+
+        With ``corpus`` every feature directory under ``specs/`` is extracted
+        in parallel worker processes and merged into one document. Extractor
+        results are reused from the persistent cache in the intermediate
+        directory unless ``use_cache`` is off. With ``profile`` each
+        extractor is measured and the report is written next to
+        extracted_content.json.
+        """
         print("\n📊 Extracting content from source specifications...")
 
-        # Source specs are in sibling directory
-        source_dir = self.base_dir.parent / '001-visualage-dotnet-migration'
-        extractor = ContentExtractor(str(source_dir))
-
-        # Extract all content
-        content = extractor.extract_all()
+        cache_settings = self.config.get('cache_settings', {})
+        cache_dir = str(self.paths['intermediate_dir']) if use_cache else None
+        cache_max_bytes = cache_settings.get('extraction_cache_mb', 32) * 1024 * 1024
+        file_budget_bytes = cache_settings.get('file_cache_mb', 64) * 1024 * 1024
+        section_aliases = self.config.get('section_aliases')
+
+        if corpus:
+            source_dirs = find_spec_directories(str(self.base_dir.parent))
+            content, cache_stats = extract_corpus(source_dirs, max_workers=workers,
+                                                  cache_dir=cache_dir, cache_max_bytes=cache_max_bytes,
+                                                  file_budget_bytes=file_budget_bytes, profile=profile,
+                                                  section_aliases=section_aliases)
+            print(f"  ✅ Extracted {len(source_dirs)} spec directories: {', '.join(content['sources'])}")
+            if content['conflicts']:
+                print(f"  ⚠️  {len(content['conflicts'])} IDs defined more than once")
+        else:
+            # Source specs are in sibling directory
+            source_dir = self.base_dir.parent / '001-visualage-dotnet-migration'
+            source_dirs = [source_dir]
+            cache = ExtractionCache.for_source(cache_dir, str(source_dir), cache_max_bytes) if cache_dir else None
+            files = FileCache(file_budget_bytes)
+            profiler = ExtractionProfiler() if profile else None
+            extractor = ContentExtractor(str(source_dir), cache=cache, file_cache=files, profiler=profiler,
+                                         section_aliases=section_aliases)
+
+            # Extract all content
+            content = extractor.extract_all()
+            cache_stats = {'file_cache': files.stats()}
+            if cache:
+                cache_stats['extraction_cache'] = cache.stats()
+            if profiler:
+                cache_stats['profile'] = profiler.report(str(source_dir))
+            files.clear()
 
         # Save to intermediate file
         output_file = self.paths['intermediate_dir'] / 'extracted_content.json'
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(content, f, indent=2, ensure_ascii=False)
+        write_if_changed(output_file, json.dumps(content, indent=2, ensure_ascii=False))
 
         print(f"  ✅ Extracted {len(content['user_stories'])} user stories")
         print(f"  ✅ Extracted {sum(len(v) for v in content['functional_requirements'].values())} requirements")
         print(f"  ✅ Extracted {len(content['business_rules'])} business rules")
         print(f"  ✅ Extracted {len(content['database_entities'])} entities")
+        if content['diagnostics']:
+            print(f"  ⚠️  {len(content['diagnostics'])} extraction warnings:")
+            for diagnostic in content['diagnostics']:
+                location = '/'.join(filter(None, [diagnostic.get('source'), diagnostic['file']]))
+                if diagnostic['line']:
+                    location += f":{diagnostic['line']}"
+                print(f"     - {location} [{diagnostic['item']}] {diagnostic['message']}")
+
+        self.index_business_rules(content, source_dirs)
+        self.build_traceability(content)
+        if 'extraction_cache' in cache_stats:
+            extraction = cache_stats['extraction_cache']
+            print(f"  ✅ Extraction cache: {extraction['hits']} hits, {extraction['misses']} misses, "
+                  f"{extraction['evictions']} evictions")
+        files_stats = cache_stats['file_cache']
+        print(f"  ✅ Source files: peak {files_stats['peak_bytes']:,} bytes, "
+              f"{files_stats['evictions']} evictions")
+        if 'profile' in cache_stats:
+            profile_file = write_profile(cache_stats['profile'], str(output_file.parent))
+            print(f"  ✅ Extractor profile saved to {profile_file.name}")
+            for report in cache_stats['profile'].get('sources', {'': cache_stats['profile']}).values():
+                print(f"     {report['source']} ({report['total']['wall_time_ms']:.2f} ms):")
+                print_profile(report, indent='       ')
 
         self.completed_tasks.extend(['T041', 'T042', 'T043', 'T044', 'T045',
                                     'T046', 'T047', 'T048', 'T049', 'T050',
@@ -129,6 +217,25 @@ class PDFGenerator:
 
         return content
 
+    def index_business_rules(self, content: Dict, source_dirs: List[Path]):
+        """Index the legacy business rule documents and the extracted spec rules"""
+        self.rule_index = BusinessRuleIndex.build(str(self.paths['legacy_docs_dir']))
+        for source_dir in source_dirs:
+            rules = [rule for rule in content['business_rules']
+                     if rule.get('source', source_dir.name) == source_dir.name]
+            self.rule_index.add_spec(source_dir, rules)
+
+        stats = self.rule_index.stats()
+        print(f"  ✅ Indexed {stats['rules']} business rules across {stats['categories']} categories "
+              f"and {stats['tables']} tables")
+
+    def build_traceability(self, content: Dict):
+        """Link tasks to the user stories, requirements and success criteria they cover"""
+        self.traceability = TraceabilityMatrix.from_content(content)
+        for summary in self.traceability.summary():
+            coverage = ', '.join(f"{kind} {c['covered']}/{c['total']}" for kind, c in summary['coverage'].items())
+            print(f"  ✅ Traceability {summary['source'] or 'spec'}: {summary['tasks']} tasks, {coverage}")
+
     def calculate_function_points(self, content: Dict) -> Dict[str, Any]:
         """Calculate function point analysis (T056-T065)"""
         print("\n🧮 Calculating Function Point Analysis...")
@@ -225,11 +332,12 @@ class PDFGenerator:
         return budget_results
 
     def create_all_templates(self):
-        """Create all remaining LaTeX templates (T022-T030)"""
+        """Create all remaining LaTeX templates (T022-T030); returns how many changed"""
         print("\n📝 Creating LaTeX templates...")
+        changed = 0
 
         # Template 02: Legacy Analysis
-        self.create_template_file('02-legacy-analysis.tex', '''
+        changed += self.create_template_file('02-legacy-analysis.tex', '''
 % Legacy System Analysis Section
 \\section{Arquitetura Atual}
 {{ legacy_architecture_description }}
@@ -247,12 +355,19 @@ class PDFGenerator:
 {{ rule.rule }}
 {% endfor %}
 
+\\subsection{Catálogo de Regras do Sistema Legado}
+\\begin{itemize}
+{% for category in rule_categories %}
+    \\item {{ category.name }}: {{ category.count }} regras ({{ category.first }} a {{ category.last }})
+{% endfor %}
+\\end{itemize}
+
 \\section{Estrutura de Dados}
 {{ legacy_database_description }}
 ''')
 
         # Template 03: Target Architecture
-        self.create_template_file('03-target-architecture.tex', '''
+        changed += self.create_template_file('03-target-architecture.tex', '''
 % Target Architecture Section
 \\section{Clean Architecture}
 {{ clean_architecture_description }}
@@ -272,7 +387,7 @@ class PDFGenerator:
 ''')
 
         # Template 04: Function Points
-        self.create_template_file('04-function-points.tex', '''
+        changed += self.create_template_file('04-function-points.tex', '''
 % Function Point Analysis Section
 \\section{Contagem de Pontos de Função}
 
@@ -299,7 +414,7 @@ AFP = UFP × VAF = {{ fpa.ufp }} × {{ fpa.vaf }} = \\textbf{{{ fpa.afp }}}
 ''')
 
         # Template 05: Timeline
-        self.create_template_file('05-timeline.tex', '''
+        changed += self.create_template_file('05-timeline.tex', '''
 % Project Timeline Section
 \\section{Fases do Projeto}
 {% for phase in timeline_phases %}
@@ -312,7 +427,7 @@ Duração: {{ phase.duration }}
 ''')
 
         # Template 06: MIGRAI Methodology
-        self.create_template_file('06-migrai-methodology.tex', '''
+        changed += self.create_template_file('06-migrai-methodology.tex', '''
 % MIGRAI Methodology Section
 \\section{Os 6 Princípios MIGRAI}
 
@@ -336,7 +451,7 @@ Integração gradual com sistemas existentes mantendo interoperabilidade.
 ''')
 
         # Template 07: Budget and ROI
-        self.create_template_file('07-budget-roi.tex', '''
+        changed += self.create_template_file('07-budget-roi.tex', '''
 % Budget and ROI Section
 \\section{Detalhamento do Orçamento}
 
@@ -363,7 +478,7 @@ Contingência (15\\%) & \\num{{{ budget.contingency_cost }}} \\\\
 ''')
 
         # Template 08: Component Specifications
-        self.create_template_file('08-component-specs.tex', '''
+        changed += self.create_template_file('08-component-specs.tex', '''
 % Component Specifications Section
 \\section{Componentes Backend}
 {% for component in component_specifications.backend[:5] %}
@@ -379,7 +494,7 @@ Contingência (15\\%) & \\num{{{ budget.contingency_cost }}} \\\\
 ''')
 
         # Template 09: Risk Management
-        self.create_template_file('09-risk-management.tex', '''
+        changed += self.create_template_file('09-risk-management.tex', '''
 % Risk Management Section
 \\section{Riscos Identificados}
 
@@ -402,7 +517,7 @@ Contingência (15\\%) & \\num{{{ budget.contingency_cost }}} \\\\
 ''')
 
         # Template 10: Appendices
-        self.create_template_file('10-appendices.tex', '''
+        changed += self.create_template_file('10-appendices.tex', '''
 % Appendices Section
 \\section{Glossário}
 \\begin{description}
@@ -421,6 +536,29 @@ Contingência (15\\%) & \\num{{{ budget.contingency_cost }}} \\\\
 \\item IFPUG 4.3.1 Function Point Counting Practices
 \\end{itemize}
 
+\\section{Matriz de Rastreabilidade}
+{% for summary in traceability %}
+{% if summary.source %}\\subsection{{{ summary.source }}}{% endif %}
+Cobertura por tarefas: {{ summary.coverage.US.covered }}/{{ summary.coverage.US.total }} histórias,
+{{ summary.coverage.FR.covered }}/{{ summary.coverage.FR.total }} requisitos e
+{{ summary.coverage.SC.covered }}/{{ summary.coverage.SC.total }} critérios de sucesso.
+
+{% if summary.rows %}
+\\begin{table}[H]
+\\centering
+\\begin{tabular}{lrrrr}
+\\toprule
+História & Tarefas & Concluídas & Requisitos & Critérios \\\\
+\\midrule
+{% for row in summary.rows %}
+{{ row.story }} & {{ row.tasks }} & {{ row.done }} & {{ row.requirements }} & {{ row.criteria }} \\\\
+{% endfor %}
+\\bottomrule
+\\end{tabular}
+\\end{table}
+{% endif %}
+{% endfor %}
+
 \\section{Histórico de Versões}
 \\begin{table}[H]
 \\centering
@@ -434,26 +572,22 @@ Versão & Data & Descrição \\\\
 \\end{table}
 ''')
 
-        print("  ✅ Created all 10 section templates")
+        print(f"  ✅ Created all 10 section templates ({changed} changed)")
         self.completed_tasks.extend(['T022', 'T023', 'T024', 'T025', 'T026',
                                     'T027', 'T028', 'T029', 'T030'])
+        return changed
 
-    def create_template_file(self, filename: str, content: str):
-        """Helper to create template files"""
-        file_path = self.base_dir / 'contracts/section-templates' / filename
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content.strip())
+    def create_template_file(self, filename: str, content: str) -> bool:
+        """Helper to create template files; True when the file changed"""
+        return write_if_changed(self.base_dir / 'contracts/section-templates' / filename, content.strip())
 
     def create_plantuml_diagrams(self):
-        """Create all PlantUML diagram definitions (T031-T040)"""
+        """Create all PlantUML diagram definitions (T031-T040); returns how many changed"""
         print("\n📊 Creating PlantUML diagrams...")
-
-        diagrams_dir = self.base_dir / 'contracts/diagram-definitions'
-        diagrams_dir.mkdir(parents=True, exist_ok=True)
+        changed = 0
 
         # Architecture diagram
-        self.create_diagram_file('architecture.puml', '''
+        changed += self.create_diagram_file('architecture.puml', '''
 @startuml
 !theme plain
 title Visual Age Migration - High-Level Architecture
@@ -498,7 +632,7 @@ package "Infrastructure Layer" {
 ''')
 
         # Clean Architecture Onion
-        self.create_diagram_file('clean-architecture-onion.puml', '''
+        changed += self.create_diagram_file('clean-architecture-onion.puml', '''
 @startuml
 !theme plain
 title Clean Architecture - Onion Diagram
@@ -521,7 +655,7 @@ note right of External : Frameworks & Drivers\\nExternal Dependencies
 ''')
 
         # ER Diagram
-        self.create_diagram_file('er-diagram.puml', '''
+        changed += self.create_diagram_file('er-diagram.puml', '''
 @startuml
 !theme plain
 title Entity Relationship Diagram - Claims System
@@ -586,7 +720,7 @@ claim ||--o{ phase : has_phases
 ''')
 
         # Component Hierarchy
-        self.create_diagram_file('component-hierarchy.puml', '''
+        changed += self.create_diagram_file('component-hierarchy.puml', '''
 @startuml
 !theme plain
 title React Component Hierarchy
@@ -634,7 +768,7 @@ Dashboard --> Charts
 ''')
 
         # Payment Authorization Sequence
-        self.create_diagram_file('sequence-payment-auth.puml', '''
+        changed += self.create_diagram_file('sequence-payment-auth.puml', '''
 @startuml
 !theme plain
 title Payment Authorization Sequence Diagram
@@ -673,18 +807,40 @@ API -> UI: Payment authorized
 @enduml
 ''')
 
-        print("  ✅ Created 5 PlantUML diagrams")
+        print(f"  ✅ Created 5 PlantUML diagrams ({changed} changed)")
         self.completed_tasks.extend(['T031', 'T032', 'T033', 'T034', 'T035',
                                     'T036', 'T037', 'T038', 'T039', 'T040'])
-
-    def create_diagram_file(self, filename: str, content: str):
-        """Helper to create diagram files"""
-        file_path = self.base_dir / 'contracts/diagram-definitions' / filename
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content.strip())
+        return changed
+
+    def create_diagram_file(self, filename: str, content: str) -> bool:
+        """Helper to create diagram files; True when the file changed"""
+        return write_if_changed(self.base_dir / 'contracts/diagram-definitions' / filename, content.strip())
+
+    def render_diagrams(self, toolchain: Dict[str, Any]) -> Dict[str, Any]:
+        """Render the PlantUML diagrams into paths.diagrams_dir, reusing cached renders"""
+        print("\n🖼️  Rendering PlantUML diagrams...")
+
+        settings = self.config.get('plantuml_settings', {})
+        tools = toolchain['tools']
+        renderer = DiagramRenderer(self.paths['diagrams_dir'], tools['plantuml']['path'],
+                                   settings.get('output_format', 'pdf'), settings.get('dpi', 300),
+                                   java=tools['java']['path'])
+        if not toolchain['capabilities']['plantuml_render']:
+            # Only the cached renders can be used
+            renderer.java = None
+        report = renderer.render(sorted((self.base_dir / 'contracts/diagram-definitions').glob('*.puml')))
+
+        print(f"  ✅ {len(report['rendered'])} rendered, {len(report['cached'])} cached")
+        if report['stale'] or report['missing']:
+            reason = 'PlantUML failed' if 'error' in report else 'Java or PlantUML not found'
+            if report['stale']:
+                print(f"  ⚠️  {reason}; previous render kept: {', '.join(report['stale'])}")
+            if report['missing']:
+                print(f"  ⚠️  {reason}; not rendered: {', '.join(report['missing'])}")
+        return report
 
     def generate_timeline_gantt(self):
-        """Generate Gantt chart for timeline (T066-T070)"""
+        """Generate Gantt chart for timeline (T066-T070); True when the chart changed"""
         print("\n📅 Generating timeline and Gantt chart...")
 
         # Create Gantt in LaTeX format
@@ -738,14 +894,14 @@ API -> UI: Payment authorized
 
         # Save Gantt definition
         gantt_file = self.base_dir / 'contracts/diagram-definitions/gantt-timeline.tex'
-        with open(gantt_file, 'w', encoding='utf-8') as f:
-            f.write(gantt_content)
+        changed = write_if_changed(gantt_file, gantt_content)
 
-        print("  ✅ Created Gantt timeline chart")
+        print(f"  ✅ {'Created' if changed else 'Unchanged'} Gantt timeline chart")
         self.completed_tasks.extend(['T066', 'T067', 'T068', 'T069', 'T070'])
+        return changed
 
     def create_template_processor(self):
-        """Create template processor script (T050)"""
+        """Create template processor script (T050); True when the script changed"""
         processor_content = '''#!/usr/bin/env python3
 """Template processor for LaTeX generation"""
 
@@ -788,13 +944,10 @@ class TemplateProcessor:
 '''
 
         processor_file = self.base_dir / 'scripts/generate-pdf/template-processor.py'
-        with open(processor_file, 'w', encoding='utf-8') as f:
-            f.write(processor_content)
-
-        return True
+        return write_if_changed(processor_file, processor_content)
 
     def create_pdf_assembler(self):
-        """Create PDF assembler script (T076-T080)"""
+        """Create PDF assembler script (T076-T080); True when the script changed"""
         assembler_content = '''#!/usr/bin/env python3
 """PDF assembler for LaTeX compilation"""
 
@@ -827,14 +980,13 @@ class PDFAssembler:
 '''
 
         assembler_file = self.base_dir / 'scripts/generate-pdf/pdf-assembler.py'
-        with open(assembler_file, 'w', encoding='utf-8') as f:
-            f.write(assembler_content)
+        changed = write_if_changed(assembler_file, assembler_content)
 
         self.completed_tasks.extend(['T076', 'T077', 'T078', 'T079', 'T080'])
-        return True
+        return changed
 
     def create_validators(self):
-        """Create validation script (T081-T085)"""
+        """Create validation script (T081-T085); True when the script changed"""
         validator_content = '''#!/usr/bin/env python3
 """PDF validation utilities"""
 
@@ -877,14 +1029,23 @@ class PDFValidator:
 '''
 
         validator_file = self.base_dir / 'scripts/generate-pdf/validators.py'
-        with open(validator_file, 'w', encoding='utf-8') as f:
-            f.write(validator_content)
+        changed = write_if_changed(validator_file, validator_content)
 
         self.completed_tasks.extend(['T081', 'T082', 'T083', 'T084', 'T085'])
-        return True
-
-    def prepare_template_context(self, content: Dict, fpa: Dict, budget: Dict) -> Dict:
-        """Prepare context for template rendering"""
+        return changed
+
+    def prepare_template_context(self, content: Dict, fpa: Dict, budget: Dict,
+                                 rule_categories: Optional[List[Dict]] = None,
+                                 traceability: Optional[List[Dict]] = None) -> Dict:
+        """Prepare context for template rendering
+
+        Rule categories and the traceability summary default to those of the
+        indexes built by extract_content.
+        """
+        if rule_categories is None:
+            rule_categories = self.rule_index.categories()
+        if traceability is None:
+            traceability = self.traceability.summary()
         return {
             # Document metadata
             'document_title': 'Visual Age Migration Analysis & Planning',
@@ -902,7 +1063,10 @@ class PDFValidator:
             'user_stories': content['user_stories'],
             'functional_requirements': content['functional_requirements'],
             'business_rules': content['business_rules'],
+            'rule_categories': [dict(category, name=category['name'].replace('&', '\\&'))
+                                for category in rule_categories],
             'database_entities': content['database_entities'],
+            'traceability': traceability,
             'success_criteria': content['success_criteria'],
             'assumptions': content['assumptions'],
             'timeline_phases': content['timeline_phases'],
@@ -953,54 +1117,156 @@ class PDFValidator:
             'milestones_description': '8 marcos principais ao longo de 12 semanas'
         }
 
-    def run(self, skip_validation: bool = False):
-        """Run the complete PDF generation pipeline"""
+    def source_inputs(self, corpus: bool) -> List[str]:
+        """Files extract_content reads: spec directory sources and the legacy rule documents"""
+        if corpus:
+            source_dirs = find_spec_directories(str(self.base_dir.parent))
+        else:
+            source_dirs = [self.base_dir.parent / '001-visualage-dotnet-migration']
+        legacy_docs = self.paths['legacy_docs_dir']
+        return ([str(source_dir / name) for source_dir in source_dirs for name in SOURCE_FILES] +
+                [str(legacy_docs / RULES_INDEX_FILE), str(legacy_docs / RULES_CATALOG_FILE)])
+
+    def build_graph(self, corpus: bool = False, workers: Optional[int] = None,
+                    use_cache: bool = True, profile: bool = False) -> BuildGraph:
+        """The pipeline as stages with declared inputs and outputs
+
+        Generated templates, diagrams and scripts are literals of this file,
+        so it is an input of every stage that writes them.
+        """
+        scripts_dir = Path(__file__).parent
+        code = [str(Path(__file__))]
+        intermediate = self.paths['intermediate_dir']
+        graph = BuildGraph(self.base_dir, self.config, intermediate / 'build-stamps.json')
+
+        def extract(_):
+            content = self.extract_content(corpus=corpus, workers=workers, use_cache=use_cache,
+                                           profile=profile)
+            # The stamp keeps only the hash of the content; dependents read it from extracted_content.json
+            return {
+                'content_hash': file_hash(str(intermediate / 'extracted_content.json')),
+                'counts': {key: len(value) for key, value in content.items()},
+                'rule_categories': self.rule_index.categories(),
+                'traceability': self.traceability.summary()
+            }
+
+        def templates(_):
+            changed = self.create_all_templates()
+            self.completed_tasks.extend(['T016', 'T017', 'T018', 'T019', 'T020', 'T021'])
+            return {'changed': changed}
+
+        def scripts(_):
+            return {'changed': [name for name, changed in (
+                ('template-processor.py', self.create_template_processor()),
+                ('pdf-assembler.py', self.create_pdf_assembler()),
+                ('validators.py', self.create_validators())) if changed]}
+
+        def context(results):
+            extracted = results['extract']
+            context = self.prepare_template_context(self.load_extracted_content(), results['fpa'], results['budget'],
+                                                    extracted['rule_categories'], extracted['traceability'])
+            context_file = intermediate / 'template_context.json'
+            write_if_changed(context_file, json.dumps({k: v for k, v in context.items()
+                                                       if isinstance(v, (str, int, float, list, dict))},
+                                                      indent=2, ensure_ascii=False, default=str))
+
+        def prerequisites(_):
+            self.check_prerequisites(refresh=self.refresh_toolchain)
+            return self.toolchain
+
+        # Cheap to run with a cached probe; dependents only rerun when the toolchain changed
+        graph.add(Stage('prerequisites', prerequisites, config=['latex_settings.packages'], always=True))
+        graph.add(Stage('extract', extract,
+                        inputs=self.source_inputs(corpus) + code + [
+                            str(scripts_dir / name) for name in
+                            ('content_extractor.py', 'business_rule_index.py', 'traceability_matrix.py')],
+                        config=['section_aliases', 'paths.legacy_docs_dir'], params={'corpus': corpus},
+                        outputs=[str(intermediate / 'extracted_content.json')],
+                        tasks=[f'T{number:03d}' for number in range(41, 56)]))
+        graph.add(Stage('fpa', lambda _: self.calculate_function_points(self.load_extracted_content()),
+                        inputs=code, deps=['extract'],
+                        tasks=[f'T{number:03d}' for number in range(56, 66)]))
+        graph.add(Stage('budget', lambda results: self.calculate_budget(results['fpa']),
+                        inputs=code, config=['fpa_settings.rate_per_fp', 'budget_settings'], deps=['fpa'],
+                        tasks=[f'T{number:03d}' for number in range(71, 76)]))
+        graph.add(Stage('templates', templates, inputs=code,
+                        outputs=['contracts/section-templates/*.tex'],
+                        tasks=[f'T{number:03d}' for number in range(16, 31)]))
+        graph.add(Stage('diagrams', lambda _: {'changed': self.create_plantuml_diagrams()}, inputs=code,
+                        outputs=['contracts/diagram-definitions/*.puml'],
+                        tasks=[f'T{number:03d}' for number in range(31, 41)]))
+        # Renders are looked up by content hash, so checking every build is cheap and restores deleted ones
+        graph.add(Stage('render', lambda results: self.render_diagrams(results['prerequisites']),
+                        deps=['prerequisites', 'diagrams'], always=True))
+        graph.add(Stage('gantt', lambda _: {'changed': self.generate_timeline_gantt()}, inputs=code,
+                        outputs=['contracts/diagram-definitions/gantt-timeline.tex'],
+                        tasks=[f'T{number:03d}' for number in range(66, 71)]))
+        graph.add(Stage('scripts', scripts, inputs=code,
+                        outputs=[str(scripts_dir / name) for name in
+                                 ('template-processor.py', 'pdf-assembler.py', 'validators.py')],
+                        tasks=[f'T{number:03d}' for number in range(76, 86)]))
+        graph.add(Stage('context', context, inputs=code, deps=['extract', 'fpa', 'budget'],
+                        outputs=[str(intermediate / 'template_context.json')]))
+        graph.add(Stage('report', lambda results: self.generate_final_report(results['prerequisites']['ready']),
+                        inputs=code, deps=['prerequisites'], outputs=['IMPLEMENTATION_REPORT.md']))
+        return graph
+
+    def run(self, skip_validation: bool = False, corpus: bool = False, workers: Optional[int] = None,
+            use_cache: bool = True, profile: bool = False, force: Optional[List[str]] = None,
+            explain: bool = False, jobs: Optional[int] = None):
+        """Run the complete PDF generation pipeline
+
+        Only stages whose inputs changed since their last run are executed,
+        up to ``jobs`` at once (default: build_settings.jobs, else one per
+        CPU) as their dependencies allow. ``force`` lists stages to run
+        anyway (empty: all of them) and ``explain`` prints why each stage
+        ran or was skipped. Returns False when a stage failed.
+        """
         print("\n🚀 Starting Visual Age Migration PDF Generation Pipeline")
         print("=" * 60)
 
-        # Check prerequisites but don't fail if LaTeX missing
-        has_latex = self.check_prerequisites()
-
-        # Extract content (T041-T055)
-        content = self.extract_content()
-
-        # Calculate function points (T056-T065)
-        fpa_results = self.calculate_function_points(content)
-
-        # Calculate budget (T071-T075)
-        budget_results = self.calculate_budget(fpa_results)
-
-        # Create all templates (T016-T030)
-        self.create_all_templates()
-        self.completed_tasks.extend(['T016', 'T017', 'T018', 'T019', 'T020', 'T021'])
-
-        # Create PlantUML diagrams (T031-T040)
-        self.create_plantuml_diagrams()
-
-        # Generate timeline Gantt (T066-T070)
-        self.generate_timeline_gantt()
-
-        # Create processing scripts
-        self.create_template_processor()
-        self.create_pdf_assembler()
-        self.create_validators()
+        graph = self.build_graph(corpus=corpus, workers=workers, use_cache=use_cache, profile=profile)
+        if force is not None and not force:
+            force = list(graph.stages)
+        else:
+            force = list(force or [])
+        # A profile or a cache bypass was asked for explicitly, so extraction has to run
+        if (profile or not use_cache) and 'extract' not in force:
+            force.append('extract')
+
+        self.refresh_toolchain = 'prerequisites' in force
+
+        jobs = jobs or self.config.get('build_settings', {}).get('jobs') or None
+        if explain:
+            print("\n🔎 Build plan:")
+        started = time.perf_counter()
+        try:
+            results, records = graph.run(force=force, explain=explain, max_workers=jobs)
+        except BuildError as e:
+            print(f"\n❌ {len(e.errors)} stage(s) failed:")
+            for record in e.records:
+                if 'error' in record:
+                    print(f"  ❌ {record['stage']}: {record['error']}")
+                elif record['reason'].startswith('blocked'):
+                    print(f"  ⏸️  {record['stage']}: {record['reason']}")
+            return False
+        elapsed = time.perf_counter() - started
+
+        skipped = [record['stage'] for record in records if not record['ran']]
+        for name in skipped:
+            self.completed_tasks.extend(graph.stages[name].tasks)
+        if skipped:
+            print(f"\n⏭️  Up to date: {', '.join(skipped)}")
+        ran = [record for record in records if record['ran']]
+        if ran:
+            longest = max(ran, key=lambda record: record['seconds'])
+            print(f"⏱️  {len(ran)} stages in {elapsed:.2f} s ({sum(r['seconds'] for r in ran):.2f} s of stage work, "
+                  f"longest {longest['stage']} {longest['seconds']:.2f} s)")
+        has_latex = results['prerequisites']['ready']
 
         # Mark final tasks as complete
         self.completed_tasks.extend(['T086', 'T087', 'T088', 'T089', 'T090'])
 
-        # Prepare template context
-        context = self.prepare_template_context(content, fpa_results, budget_results)
-
-        # Save context for debugging
-        context_file = self.paths['intermediate_dir'] / 'template_context.json'
-        with open(context_file, 'w', encoding='utf-8') as f:
-            json.dump({k: v for k, v in context.items()
-                      if isinstance(v, (str, int, float, list, dict))},
-                     f, indent=2, ensure_ascii=False, default=str)
-
-        # Generate final report
-        self.generate_final_report(has_latex)
-
         print("\n" + "=" * 60)
         print("✅ PDF Generation Pipeline Complete!")
         print(f"📊 Total tasks completed: {len(self.completed_tasks)}/90")
@@ -1018,7 +1284,7 @@ class PDFValidator:
         return True
 
     def generate_final_report(self, has_latex: bool):
-        """Generate final implementation report"""
+        """Generate final implementation report; True when the report changed"""
         report_content = f"""
 # PDF Generation Implementation Report
 
@@ -1132,10 +1398,10 @@ class PDFValidator:
 """
 
         report_file = self.base_dir / 'IMPLEMENTATION_REPORT.md'
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write(report_content.strip())
+        changed = write_if_changed(report_file, report_content.strip())
 
         print(f"\n📄 Implementation report saved to: {report_file}")
+        return changed
 
 
 def main():
@@ -1151,6 +1417,28 @@ def main():
                        help='Skip PDF validation')
     parser.add_argument('--output', '-o',
                        help='Output PDF path (overrides config)')
+    parser.add_argument('--corpus',
+                       action='store_true',
+                       help='Extract and merge every spec directory under specs/')
+    parser.add_argument('--workers', '-w',
+                       type=int,
+                       help='Worker processes for corpus extraction (default: CPU count)')
+    parser.add_argument('--no-cache',
+                       action='store_true',
+                       help='Ignore the persistent extraction cache')
+    parser.add_argument('--profile',
+                       action='store_true',
+                       help='Profile each content extractor and save the report')
+    parser.add_argument('--force',
+                       nargs='*',
+                       metavar='STAGE',
+                       help='Run the given stages (all without names) even if they are up to date')
+    parser.add_argument('--jobs', '-j',
+                       type=int,
+                       help='Stages run at once (default: build_settings.jobs or CPU count)')
+    parser.add_argument('--explain',
+                       action='store_true',
+                       help='Show why each stage runs or is skipped')
 
     args = parser.parse_args()
 
@@ -1168,7 +1456,14 @@ def main():
 
     # Run generator
     generator = PDFGenerator(str(config_path))
-    success = generator.run(skip_validation=args.skip_validation)
+    try:
+        success = generator.run(skip_validation=args.skip_validation,
+                                corpus=args.corpus, workers=args.workers,
+                                use_cache=not args.no_cache, profile=args.profile,
+                                force=args.force, explain=args.explain, jobs=args.jobs)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
 
     sys.exit(0 if success else 1)
 
@@ -20,6 +20,29 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY, TA_RIGHT
 from reportlab.graphics.charts.piecharts import Pie
 from reportlab.graphics.shapes import Drawing
 
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent / "utils"))
+
+from business_rule_index import BusinessRuleIndex
+from markdown_parser import MarkdownParser
+from reportlab_emitter import FlowableEmitter
+
+# Legacy documentation (repository docs/ directory)
+DOCS_DIR = Path(__file__).parent.parent.parent.parent.parent / "docs"
+
+# Emitter roles mapped to the styles of create_styles
+STYLE_NAMES = {
+    'heading1': 'CustomHeading1',
+    'heading2': 'CustomHeading2',
+    'heading3': 'CustomHeading3',
+    'heading4': 'CustomHeading4',
+    'body': 'CustomBody',
+    'code': 'CodeBlock',
+    'quote': 'BusinessRule',
+    'table_header': 'TableHeader',
+    'table_cell': 'TableCell'
+}
+
 
 def create_styles():
     """Create professional styles based on Site.css"""
@@ -270,10 +293,8 @@ def generate_cover_page(story, styles):
 
 def load_markdown_content():
     """Load content from markdown files"""
-    docs_dir = Path("/Users/brunosouza/Development/Caixa Seguradora/POC Visual Age/docs")
-
-    complete_analysis_path = docs_dir / "LEGACY_SIWEA_COMPLETE_ANALYSIS.md"
-    business_rules_path = docs_dir / "BUSINESS_RULES_INDEX.md"
+    complete_analysis_path = DOCS_DIR / "LEGACY_SIWEA_COMPLETE_ANALYSIS.md"
+    business_rules_path = DOCS_DIR / "BUSINESS_RULES_INDEX.md"
 
     if complete_analysis_path.exists():
         complete_analysis = complete_analysis_path.read_text()
@@ -289,22 +310,18 @@ def load_markdown_content():
 
 
 def parse_business_rules(br_content):
-    """Parse business rules from markdown"""
-    import re
-
-    rules = []
-    # Extract all BR-XXX rules
-    pattern = r'\| (BR-\d{3}) \| (.+?) \| (.+?) \|'
-    matches = re.findall(pattern, br_content)
-
-    for match in matches:
-        rules.append({
-            'id': match[0],
-            'description': match[1].strip(),
-            'location': match[2].strip()
-        })
-
-    return rules
+    """Parse business rules from markdown through the business rule index"""
+    index = BusinessRuleIndex()
+    index.add_rules_index_text(br_content)
+
+    return [
+        {
+            'id': rule['id'],
+            'description': rule['description'],
+            'location': rule['location']
+        }
+        for rule in index.rules
+    ]
 
 
 def main():
@@ -340,6 +357,11 @@ def main():
     print("✓ Carregando conteúdo markdown...")
     complete_analysis, business_rules = load_markdown_content()
 
+    # Parsed once; the same tree can feed the LaTeX emitter
+    print("✓ Convertendo análise completa...")
+    document = MarkdownParser().parse_ast(complete_analysis)
+    story.extend(FlowableEmitter(styles, STYLE_NAMES).emit(document))
+
     print("✓ Compilando PDF...")
 
     # Build PDF
@@ -22,6 +22,15 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from content_extractor import iter_entities_from_file
+from business_rule_index import BusinessRuleIndex
+from traceability_matrix import TraceabilityMatrix
+
+# Legacy documentation (repository docs/ directory)
+DOCS_DIR = Path(__file__).parent.parent.parent.parent.parent / "docs"
+DATA_MODEL_PATH = DOCS_DIR / "SISTEMA_LEGADO_MODELO_DADOS.md"
 
 
 def create_styles():
@@ -463,8 +472,104 @@ def generate_appendices(story, styles, content):
     story.append(glossary_table)
     story.append(Spacer(1, 0.5*cm))
 
+    # Data model, streamed entity by entity from the legacy documentation
+    if DATA_MODEL_PATH.exists():
+        story.append(Paragraph("Apêndice B: Modelo de Dados Legado", styles['CustomHeading2']))
+
+        entity_data = [["#", "Entidade", "Tabela DB2", "Campos"]]
+        for number, entity in enumerate(iter_entities_from_file(str(DATA_MODEL_PATH)), 1):
+            entity_data.append([str(number), entity['name'], entity['table'] or "-", str(len(entity['fields']))])
+
+        entity_table = Table(entity_data, colWidths=[1*cm, 9*cm, 4*cm, 2*cm], repeatRows=1)
+        entity_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0066CC')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]))
+        story.append(entity_table)
+        story.append(Spacer(1, 0.5*cm))
+
+    # Legacy business rules per category, from the business rule index
+    rule_index = BusinessRuleIndex.build(str(DOCS_DIR))
+    categories = rule_index.categories()
+    if categories:
+        story.append(Paragraph("Apêndice C: Regras de Negócio Legadas", styles['CustomHeading2']))
+
+        rule_data = [["Categoria", "Regras", "Faixa", "Tabelas"]]
+        for category in categories:
+            tables = sorted({table for rule in rule_index.by_category(category['name']) for table in rule['tables']})
+            rule_data.append([
+                Paragraph(category['name'].replace('&', '&amp;'), styles['CustomBody']),
+                str(category['count']),
+                f"{category['first']} a {category['last']}",
+                Paragraph(", ".join(tables) or "-", styles['CustomBody'])
+            ])
+
+        rule_table = Table(rule_data, colWidths=[5*cm, 2*cm, 4*cm, 5*cm], repeatRows=1)
+        rule_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0066CC')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]))
+        story.append(rule_table)
+        story.append(Spacer(1, 0.5*cm))
+
+    # Task coverage of user stories, requirements and success criteria
+    if content.get('tasks'):
+        story.append(Paragraph("Apêndice D: Matriz de Rastreabilidade", styles['CustomHeading2']))
+
+        matrix = TraceabilityMatrix.from_content(content)
+        for summary in matrix.summary():
+            coverage = summary['coverage']
+            heading = f"{summary['source']}: " if summary['source'] else ""
+            story.append(Paragraph(
+                f"{heading}{coverage['US']['covered']}/{coverage['US']['total']} histórias, "
+                f"{coverage['FR']['covered']}/{coverage['FR']['total']} requisitos e "
+                f"{coverage['SC']['covered']}/{coverage['SC']['total']} critérios de sucesso cobertos por "
+                f"{summary['tasks']} tarefas",
+                styles['CustomBody']
+            ))
+
+            trace_data = [["História", "Tarefas", "Concluídas", "Requisitos", "Critérios"]]
+            for row in summary['rows']:
+                trace_data.append([row['story'], str(row['tasks']), str(row['done']),
+                                   str(row['requirements']), str(row['criteria'])])
+
+            trace_table = Table(trace_data, colWidths=[4*cm, 3*cm, 3*cm, 3*cm, 3*cm], repeatRows=1)
+            trace_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0066CC')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+                ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ]))
+            story.append(trace_table)
+            story.append(Spacer(1, 0.5*cm))
+
     # Version History
-    story.append(Paragraph("Apêndice D: Histórico de Versões", styles['CustomHeading2']))
+    story.append(Paragraph("Apêndice E: Histórico de Versões", styles['CustomHeading2']))
 
     version_data = [
         ["Versão", "Data", "Autor", "Alterações"],
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Toolchain Probe for Visual Age Migration PDF Generation
+Probes the external tools concurrently and caches versions, paths and capabilities on disk
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+if __name__ == '__main__':
+    # Run as a script: the caches build on utils/persistent_cache.py
+    sys.path.insert(0, str(Path(__file__).parent / "utils"))
+
+from artifact_writer import write_if_changed
+from extraction_cache import content_hash
+
+
+# Tool name, executable and version command
+TOOLS = {
+    'python': ['python3', '--version'],
+    'java': ['java', '-version'],
+    'latex': ['pdflatex', '--version'],
+}
+
+# Executables whose location and modification time key the cache
+KEY_EXECUTABLES = ('python3', 'java', 'pdflatex', 'kpsewhich')
+
+DEFAULT_TTL_HOURS = 24
+
+PROBE_TIMEOUT = 30
+
+
+def _executable_state(name: str) -> str:
+    path = shutil.which(name)
+    if path is None:
+        return f"{name}:missing"
+    try:
+        return f"{name}:{os.path.realpath(path)}:{os.stat(path).st_mtime_ns}"
+    except OSError:
+        return f"{name}:{path}:unreadable"
+
+
+def toolchain_key(plantuml_jar: Path, packages: List[str]) -> str:
+    """Hash of PATH, of where each tool resolves with its mtime, of the PlantUML jar and of the packages asked for"""
+    jar = Path(plantuml_jar)
+    parts = [os.environ.get('PATH', '')]
+    parts.extend(_executable_state(name) for name in KEY_EXECUTABLES)
+    parts.append(f"plantuml:{jar}:{jar.stat().st_mtime_ns if jar.exists() else 'missing'}")
+    parts.append(' '.join(sorted(packages)))
+    return content_hash('\n'.join(parts))
+
+
+def probe_version(command: List[str]) -> Dict[str, Any]:
+    """Resolved path and first output line (the version) of a tool, found False when it does not run"""
+    path = shutil.which(command[0])
+    if path is None:
+        return {'found': False, 'path': None, 'version': None}
+    try:
+        result = subprocess.run([path] + command[1:], capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+    except (OSError, subprocess.SubprocessError):
+        return {'found': False, 'path': path, 'version': None}
+    # java prints its version on stderr
+    lines = [line.strip() for line in (result.stdout or result.stderr).splitlines() if line.strip()]
+    return {'found': result.returncode == 0, 'path': path, 'version': lines[0] if lines else None}
+
+
+def package_name(package: str) -> str:
+    """Package of a latex_settings entry, without its options (``babel[portuguese]`` is babel)"""
+    return package.partition('[')[0].strip()
+
+
+def probe_packages(packages: List[str]) -> Dict[str, bool]:
+    """Which LaTeX packages kpsewhich finds, with a single call for all of them"""
+    kpsewhich = shutil.which('kpsewhich')
+    if kpsewhich is None or not packages:
+        return {package: False for package in packages}
+    try:
+        result = subprocess.run([kpsewhich] + [f"{package_name(package)}.sty" for package in packages],
+                                capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+    except (OSError, subprocess.SubprocessError):
+        return {package: False for package in packages}
+    found = {Path(line.strip()).stem for line in result.stdout.splitlines() if line.strip()}
+    return {package: package_name(package) in found for package in packages}
+
+
+def probe_plantuml(plantuml_jar: Path) -> Dict[str, Any]:
+    """Path and version of the PlantUML jar; the version needs a JVM"""
+    jar = Path(plantuml_jar)
+    if not jar.exists():
+        return {'found': False, 'path': None, 'version': None}
+    java = shutil.which('java')
+    version = None
+    if java:
+        try:
+            result = subprocess.run([java, '-jar', str(jar), '-version'],
+                                    capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+            lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+            version = lines[0] if result.returncode == 0 and lines else None
+        except (OSError, subprocess.SubprocessError):
+            pass
+    return {'found': True, 'path': str(jar), 'version': version}
+
+
+def probe_toolchain(plantuml_jar: Path, packages: List[str], max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """Probe every tool and capability at once; each probe is a separate process, so threads suffice"""
+    jobs = dict(TOOLS)
+    with ThreadPoolExecutor(max_workers=max_workers or len(jobs) + 2) as executor:
+        tools = {name: executor.submit(probe_version, command) for name, command in jobs.items()}
+        plantuml = executor.submit(probe_plantuml, plantuml_jar)
+        latex_packages = executor.submit(probe_packages, list(packages))
+
+        result = {'tools': {name: future.result() for name, future in tools.items()}}
+        result['tools']['plantuml'] = plantuml.result()
+    result['capabilities'] = {
+        'latex_packages': latex_packages.result(),
+        'plantuml_version': result['tools']['plantuml']['version'],
+        'plantuml_render': result['tools']['plantuml']['found'] and result['tools']['java']['found']
+    }
+    result['ready'] = all(tool['found'] for tool in result['tools'].values())
+    return result
+
+
+def load_toolchain(cache_file: Path, plantuml_jar: Path, packages: List[str],
+                   ttl_hours: float = DEFAULT_TTL_HOURS, refresh: bool = False) -> Tuple[Dict[str, Any], bool]:
+    """The toolchain probe, from ``cache_file`` while its key matches and it is younger than the TTL
+
+    Returns the probe and whether it came from the cache. A fresh probe is
+    written back to the cache.
+    """
+    cache_file = Path(cache_file)
+    key = toolchain_key(plantuml_jar, packages)
+    if not refresh and cache_file.exists():
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('key') == key and time.time() - cached.get('probed_at', 0) < ttl_hours * 3600:
+                return cached['result'], True
+        except (OSError, ValueError, KeyError):
+            pass
+
+    result = probe_toolchain(plantuml_jar, packages)
+    write_if_changed(cache_file, json.dumps({'key': key, 'probed_at': time.time(), 'result': result},
+                                            indent=2, ensure_ascii=False))
+    return result, False
+
+
+def main():
+    """Print the toolchain probe"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Probe the external tools used to build the PDF')
+    parser.add_argument('--jar', default=str(Path(__file__).parent.parent.parent / 'plantuml.jar'),
+                        help='PlantUML jar')
+    parser.add_argument('--package', '-p', action='append', default=[], help='LaTeX package to look for')
+    parser.add_argument('--cache', help='Cache file (default: probe without caching)')
+    parser.add_argument('--refresh', action='store_true', help='Probe even if the cache is fresh')
+
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.cache:
+        result, cached = load_toolchain(Path(args.cache), Path(args.jar), args.package, refresh=args.refresh)
+    else:
+        result, cached = probe_toolchain(Path(args.jar), args.package), False
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    print(f"{'cached' if cached else 'probed'} in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Traceability Matrix for Visual Age Migration PDF Generation
+Links tasks.md tasks to the user stories, requirements and success criteria they cover
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+if __name__ == '__main__':
+    # Run as a script: the caches build on utils/persistent_cache.py
+    sys.path.insert(0, str(Path(__file__).parent / "utils"))
+
+from content_extractor import parse_tasks
+from extraction_cache import file_hash
+
+
+KINDS = ('US', 'FR', 'SC')
+
+
+class TraceabilityMatrix:
+    """Set-based task ↔ user story ↔ requirement ↔ success criterion matrix
+
+    IDs repeat across spec directories, so every item is keyed by
+    ``(source, id)``. The sets of tasks linked to each item and of covered
+    items per kind are maintained on update, which makes coverage queries
+    O(1); replacing the tasks of one source only touches that source.
+    """
+
+    def __init__(self):
+        """Initialize an empty matrix"""
+        self.sources: List[str] = []
+        self.tasks: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.titles: Dict[Tuple[str, str], str] = {}
+
+        self._defined: Dict[Tuple[str, str], Set[str]] = {}
+        self._task_links: Dict[Tuple[str, str], Set[str]] = {}
+        self._story_requirements: Dict[Tuple[str, str], Set[str]] = {}
+        self._covered: Dict[Tuple[str, str], Set[str]] = {}
+        self._digests: Dict[str, str] = {}
+
+    @classmethod
+    def from_content(cls, content: Dict[str, Any]) -> 'TraceabilityMatrix':
+        """Build the matrix from extract_all or merged corpus output"""
+        matrix = cls()
+        for source in content.get('sources') or ['']:
+            def of_source(items):
+                return [item for item in items if item.get('source', '') == source]
+
+            requirements = [req for reqs in content['functional_requirements'].values() for req in of_source(reqs)]
+            matrix.set_items(source, of_source(content['user_stories']), requirements,
+                             of_source(content['success_criteria']))
+            matrix.set_tasks(source, of_source(content.get('tasks', [])))
+        return matrix
+
+    def _add_source(self, source: str):
+        if source not in self.sources:
+            self.sources.append(source)
+            self.tasks[source] = {}
+
+    def set_items(self, source: str, user_stories: List[Dict[str, Any]],
+                  requirements: List[Dict[str, Any]], criteria: List[Dict[str, Any]]):
+        """Define the user stories, requirements and success criteria of a source"""
+        self._add_source(source)
+        for kind, items in (('US', user_stories), ('FR', requirements), ('SC', criteria)):
+            self._defined[(source, kind)] = {item['id'] for item in items}
+            for item in items:
+                self.titles[(source, item['id'])] = item.get('title') or item.get('description', '')
+        self._update_coverage(source)
+
+    def set_tasks(self, source: str, tasks: List[Dict[str, Any]], digest: Optional[str] = None) -> bool:
+        """Replace the tasks of one source; returns False when ``digest`` is unchanged"""
+        if digest is not None and self._digests.get(source) == digest:
+            return False
+        self._add_source(source)
+
+        for key in [key for key in self._task_links if key[0] == source]:
+            del self._task_links[key]
+        for key in [key for key in self._story_requirements if key[0] == source]:
+            del self._story_requirements[key]
+
+        self.tasks[source] = {task['id']: task for task in tasks}
+        for task in tasks:
+            linked = task['requirements'] + task['criteria']
+            if task['story']:
+                linked.append(task['story'])
+                self._story_requirements.setdefault((source, task['story']), set()).update(task['requirements'])
+            for item_id in linked:
+                self._task_links.setdefault((source, item_id), set()).add(task['id'])
+
+        if digest is not None:
+            self._digests[source] = digest
+        self._update_coverage(source)
+        return True
+
+    def update_tasks_file(self, source: str, tasks_path: str) -> bool:
+        """Re-read one tasks.md file, skipping the parse when its content is unchanged"""
+        digest = file_hash(tasks_path)
+        if self._digests.get(source) == digest:
+            return False
+        with open(tasks_path, 'r', encoding='utf-8') as f:
+            tasks, _ = parse_tasks(f.read())
+        return self.set_tasks(source, tasks, digest)
+
+    def _update_coverage(self, source: str):
+        """Recompute the covered item sets of one source"""
+        for kind in KINDS:
+            defined = self._defined.get((source, kind), set())
+            self._covered[(source, kind)] = {item for item in defined if (source, item) in self._task_links}
+
+    def tasks_for(self, source: str, item_id: str) -> Set[str]:
+        """Task IDs linked to a user story, requirement or success criterion"""
+        return self._task_links.get((source, item_id), set())
+
+    def is_covered(self, source: str, item_id: str) -> bool:
+        """Whether at least one task is linked to an item"""
+        return (source, item_id) in self._task_links
+
+    def requirements_for_story(self, source: str, story: str) -> Set[str]:
+        """Requirements referenced by the tasks of a user story"""
+        return self._story_requirements.get((source, story), set())
+
+    def coverage(self, source: str, kind: str) -> Dict[str, Any]:
+        """Covered and total defined items of one kind in a source"""
+        total = len(self._defined.get((source, kind), ()))
+        covered = len(self._covered.get((source, kind), ()))
+        return {
+            'covered': covered,
+            'total': total,
+            'ratio': covered / total if total else 0.0
+        }
+
+    def uncovered(self, source: str, kind: str) -> List[str]:
+        """Defined items of one kind without any task"""
+        return sorted(self._defined.get((source, kind), set()) - self._covered.get((source, kind), set()))
+
+    def undefined_references(self, source: str) -> List[str]:
+        """IDs referenced by tasks that the spec does not define"""
+        defined = set().union(*(self._defined.get((source, kind), set()) for kind in KINDS))
+        return sorted(item_id for (item_source, item_id) in self._task_links
+                      if item_source == source and item_id not in defined)
+
+    def rows(self, source: str) -> List[Dict[str, Any]]:
+        """One appendix row per user story, plus cross-cutting tasks without a story"""
+        stories: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for story in sorted(self._defined.get((source, 'US'), set()), key=lambda s: int(s[2:])):
+            stories[story] = []
+        for task in self.tasks.get(source, {}).values():
+            stories.setdefault(task['story'], []).append(task)
+
+        rows = []
+        for story, tasks in stories.items():
+            criteria = {criterion for task in tasks for criterion in task['criteria']}
+            rows.append({
+                'story': story or '-',
+                'title': self.titles.get((source, story), '') if story else 'Tarefas transversais',
+                'tasks': len(tasks),
+                'done': sum(1 for task in tasks if task['done']),
+                'requirements': len(self.requirements_for_story(source, story)) if story else 0,
+                'criteria': len(criteria)
+            })
+        return rows
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Coverage per source and kind with the appendix rows"""
+        return [
+            {
+                'source': source,
+                'tasks': len(self.tasks.get(source, {})),
+                'coverage': {kind: self.coverage(source, kind) for kind in KINDS},
+                'rows': self.rows(source)
+            }
+            for source in self.sources
+        ]
+
+
+def main():
+    """Print the traceability summary of an extracted content file"""
+    parser = argparse.ArgumentParser(description='Task / US / FR / SC traceability coverage')
+    parser.add_argument('content',
+                       nargs='?', default='../../../output/intermediate/extracted_content.json',
+                       help='extracted_content.json written by the content extractor')
+    parser.add_argument('--uncovered',
+                       action='store_true',
+                       help='List requirements and success criteria without tasks')
+
+    args = parser.parse_args()
+
+    content_path = (Path(__file__).parent / args.content).resolve()
+    if not content_path.exists():
+        print(f"Content file not found: {content_path}", file=sys.stderr)
+        sys.exit(1)
+    with open(content_path, 'r', encoding='utf-8') as f:
+        matrix = TraceabilityMatrix.from_content(json.load(f))
+
+    for source_summary in matrix.summary():
+        source = source_summary['source']
+        coverage = ', '.join(f"{kind} {c['covered']}/{c['total']}" for kind, c in source_summary['coverage'].items())
+        print(f"{source or 'spec'}: {source_summary['tasks']} tasks, coverage {coverage}")
+        if args.uncovered:
+            for kind in ('FR', 'SC'):
+                missing = matrix.uncovered(source, kind)
+                if missing:
+                    print(f"  {kind} without tasks: {', '.join(missing)}")
+
+
+if __name__ == '__main__':
+    main()
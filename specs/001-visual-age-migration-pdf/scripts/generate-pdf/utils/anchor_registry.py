@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Anchor Registry for Visual Age Migration PDF Generation
+Unique anchors for headings and rule IDs, shared by the LaTeX and ReportLab emitters
+"""
+
+import bisect
+import hashlib
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from markdown_ast import Node, HEADING, LINK, CODE, CODE_SPAN, TEXT
+
+
+# Rule, requirement and task IDs; a heading or list item starting with one
+# defines it, and other mentions link to the definition
+REFERENCE_ID = re.compile(r'\b(?:BR-\d{3}|FR-\d{3}|T\d{3})\b')
+
+# Word runs are kept, runs of spaces and hyphens become one hyphen and any
+# other character is dropped
+SLUG_TOKEN = re.compile(r'(\w+)|[-\s]+')
+
+# pdflatex cannot build control sequence names from non-ASCII label text
+LABEL_UNSAFE = re.compile(r'[^A-Za-z0-9:._-]+')
+
+# Markup that may precede an ID at the start of a heading or item
+DEFINITION_MARKUP = '*_` '
+
+
+def is_internal(url: str) -> bool:
+    """Whether a link URL points into the registered documents (a fragment or a .md file)"""
+    return url.startswith('#') or url.partition('#')[0].endswith('.md')
+
+
+def ascii_anchor(anchor: str) -> str:
+    """ASCII form of an anchor for LaTeX labels (accents dropped, other characters as '-')"""
+    folded = unicodedata.normalize('NFKD', anchor).encode('ascii', 'ignore').decode('ascii')
+    return LABEL_UNSAFE.sub('-', folded)
+
+
+def slugify(title: str) -> str:
+    """Anchor name of a heading title: lowercase words joined by hyphens"""
+    parts: List[str] = []
+    for match in SLUG_TOKEN.finditer(title.lower()):
+        if match.group(1):
+            parts.append(match.group(1))
+        elif parts and parts[-1] != '-':
+            parts.append('-')
+    if parts and parts[-1] == '-':
+        parts.pop()
+    return ''.join(parts)
+
+
+class AnchorRegistry:
+    """Unique anchors for the headings and rule IDs of a document or a corpus
+
+    Documents are registered in order, each under a ``scope`` (its path in
+    a corpus, '' for a single document). A heading's anchor is the slug of
+    its title; repeats get -1, -2, ... in registration order, so anchors
+    are unique across scopes, and so are their ASCII forms (``validações``
+    and ``validacoes`` would share a LaTeX label), and the same input
+    always gives the same anchors. Within a scope the nth repeat of a title is also reachable as
+    ``slug-n``, which is how markdown renderers number duplicate headings.
+
+    An ID defined in a scope resolves there first, then to its first
+    definition in any scope. Every lookup is a dictionary access.
+    """
+
+    def __init__(self):
+        """Start an empty registry"""
+        self._anchors: Dict[str, str] = {}
+        self._ascii: Set[str] = set()
+        self._suffixes: Dict[str, int] = {}
+        self._local: Dict[str, Dict[str, str]] = {}
+        self._positions: Dict[Tuple[str, int], str] = {}
+        self._offsets: Dict[str, List[int]] = {}
+        self._references: Dict[str, Dict[str, str]] = {}
+        self._first_definition: Dict[str, str] = {}
+        self._slugs: Dict[str, str] = {}
+        self._records: List[str] = []
+        self._fingerprint: Optional[str] = None
+
+    def __contains__(self, anchor: str) -> bool:
+        return anchor in self._anchors
+
+    def __len__(self) -> int:
+        return len(self._anchors)
+
+    def slug(self, title: str) -> str:
+        """Slug of a title, computed once per distinct title"""
+        slug = self._slugs.get(title)
+        if slug is None:
+            slug = self._slugs[title] = slugify(title) or 'section'
+        return slug
+
+    def _unique(self, base: str, title: str) -> str:
+        anchor, folded = base, ascii_anchor(base)
+        while anchor in self._anchors or folded in self._ascii:
+            self._suffixes[base] = self._suffixes.get(base, 0) + 1
+            anchor = f"{base}-{self._suffixes[base]}"
+            folded = ascii_anchor(anchor)
+        self._anchors[anchor] = title
+        self._ascii.add(folded)
+        self._records.append(f"{anchor}\0{title}\n")
+        self._fingerprint = None
+        return anchor
+
+    def add_heading(self, title: str, scope: str = '', offset: Optional[int] = None) -> str:
+        """Register a heading and return its anchor; a title starting with an ID defines it"""
+        base = self.slug(title)
+        anchor = self._unique(base, title)
+
+        local = self._local.setdefault(scope, {})
+        name, repeat = base, 0
+        while name in local:
+            repeat += 1
+            name = f"{base}-{repeat}"
+        local[name] = anchor
+
+        self._place(anchor, scope, offset)
+        definition = REFERENCE_ID.match(title.lstrip(DEFINITION_MARKUP))
+        if definition:
+            self._define(definition.group(), anchor, scope)
+        return anchor
+
+    def add_definition(self, reference: str, scope: str = '', offset: Optional[int] = None) -> Optional[str]:
+        """Register a list item that defines an ID; None when the scope already defines it"""
+        if reference in self._references.get(scope, {}):
+            return None
+        anchor = self._unique(self.slug(reference), reference)
+        self._place(anchor, scope, offset)
+        self._define(reference, anchor, scope)
+        return anchor
+
+    def _place(self, anchor: str, scope: str, offset: Optional[int]):
+        if offset is None:
+            return
+        self._positions[(scope, offset)] = anchor
+        offsets = self._offsets.setdefault(scope, [])
+        if offsets and offset < offsets[-1]:
+            bisect.insort(offsets, offset)
+        else:
+            offsets.append(offset)
+
+    def _define(self, reference: str, anchor: str, scope: str):
+        self._references.setdefault(scope, {}).setdefault(reference, anchor)
+        self._first_definition.setdefault(reference, anchor)
+        self._records.append(f"{scope}\0{reference}\0{anchor}\n")
+        self._fingerprint = None
+
+    def add_outline(self, outline: List[Tuple[int, int, str]], scope: str = ''):
+        """Register (offset, level, text) entries; level 0 marks an item defining the ID ``text``"""
+        for offset, level, text in outline:
+            if level:
+                self.add_heading(text, scope, offset)
+            else:
+                self.add_definition(text, scope, offset)
+
+    def at(self, offset: int, scope: str = '') -> Optional[str]:
+        """Anchor of the heading or defining item whose line starts at ``offset``"""
+        return self._positions.get((scope, offset))
+
+    def between(self, start: int, end: int, scope: str = '') -> List[str]:
+        """Anchors of the headings and defining items whose lines start in [start, end)"""
+        offsets = self._offsets.get(scope, [])
+        first, last = bisect.bisect_left(offsets, start), bisect.bisect_left(offsets, end)
+        return [self._positions[(scope, offset)] for offset in offsets[first:last]]
+
+    def title(self, anchor: str) -> Optional[str]:
+        """Heading title (or ID) an anchor was made for"""
+        return self._anchors.get(anchor)
+
+    def reference(self, reference: str, scope: str = '') -> Optional[str]:
+        """Anchor of an ID's definition, preferring one in ``scope``"""
+        local = self._references.get(scope)
+        if local and reference in local:
+            return local[reference]
+        return self._first_definition.get(reference)
+
+    def first(self, scope: str = '') -> Optional[str]:
+        """Anchor of the first heading of a scope"""
+        local = self._local.get(scope)
+        return next(iter(local.values()), None) if local else None
+
+    def resolve(self, url: str, scope: str = '') -> Optional[str]:
+        """Anchor a link URL points to, or None when it leaves the registered documents
+
+        ``#name`` is looked up among the headings of ``scope``, then as an
+        ID. A relative ``.md`` path is taken relative to ``scope`` (a file
+        path); without a fragment, or with one that file lacks, it goes to
+        the file's first heading.
+        """
+        path, _, fragment = url.partition('#')
+        if path:
+            if not path.endswith('.md') or '://' in path:
+                return None
+            scope = str((Path(scope).parent / path).resolve())
+            if scope not in self._local:
+                return None
+
+        local = self._local.get(scope, {})
+        anchor = local.get(fragment) or local.get(self.slug(fragment)) if fragment else None
+        if anchor is None and fragment:
+            anchor = self.reference(fragment.upper(), scope)
+        if anchor is None and path:
+            anchor = self.first(scope)
+        return anchor
+
+    def fingerprint(self) -> str:
+        """Digest of every anchor and ID definition, in registration order (offsets excluded)"""
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.sha256(''.join(self._records).encode('utf-8')).hexdigest()
+        return self._fingerprint
+
+    def link(self, document: Node, scope: str = '') -> Dict[str, int]:
+        """Resolve link URLs and turn ID mentions into links, in one pass over the tree
+
+        Links that resolve get ``#anchor`` URLs; the others keep theirs.
+        Mentions in headings, links and code are left alone, as is an ID
+        inside the block that defines it. Returns counts of ``references``
+        linked and internal ``links`` resolved and ``unresolved``.
+        """
+        counts = {'references': 0, 'links': 0, 'unresolved': 0}
+        stack: List[Tuple[Node, Optional[str]]] = [(document, None)]
+
+        while stack:
+            node, owner = stack.pop()
+            if node.kind == LINK:
+                url = node.get('url', '')
+                internal = is_internal(url)
+                anchor = self.resolve(url, scope) if internal else None
+                if anchor:
+                    node.attrs['url'] = f"#{anchor}"
+                    counts['links'] += 1
+                elif internal:
+                    counts['unresolved'] += 1
+                continue
+            if node.kind in (HEADING, CODE, CODE_SPAN):
+                continue
+            owner = node.get('id', owner)
+
+            children = []
+            for child in node.children:
+                if child.kind == TEXT:
+                    pieces = self._split_references(child, scope, owner)
+                    if len(pieces) > 1 or pieces[0] is not child:
+                        counts['references'] += sum(1 for piece in pieces if piece.kind == LINK)
+                    children.extend(pieces)
+                else:
+                    children.append(child)
+                    stack.append((child, owner))
+            node.children = children
+
+        return counts
+
+    def _split_references(self, node: Node, scope: str, owner: Optional[str]) -> List[Node]:
+        """A text node split around the ID mentions that have a definition"""
+        text = node.value
+        pieces: List[Node] = []
+        position = 0
+        for match in REFERENCE_ID.finditer(text):
+            anchor = self.reference(match.group(), scope)
+            if anchor is None or anchor == owner:
+                continue
+            start, end = match.span()
+            if start > position:
+                pieces.append(Node(TEXT, node.start + position, node.start + start, None, text[position:start]))
+            mention = Node(TEXT, node.start + start, node.start + end, None, match.group())
+            pieces.append(Node(LINK, node.start + start, node.start + end, [mention], attrs={'url': f"#{anchor}"}))
+            position = end
+
+        if not pieces:
+            return [node]
+        if position < len(text):
+            pieces.append(Node(TEXT, node.start + position, node.end, None, text[position:]))
+        return pieces
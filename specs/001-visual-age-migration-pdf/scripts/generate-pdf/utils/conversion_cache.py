@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Conversion Cache for Visual Age Migration PDF Generation
+Persists the LaTeX of markdown sections keyed by the hash of their content
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+
+from persistent_cache import DEFAULT_MAX_BYTES, PersistentCache, sources_version
+
+
+CONVERTER_SOURCES = (
+    Path(__file__).parent / 'markdown_parser.py',
+    Path(__file__).parent / 'markdown_ast.py',
+    Path(__file__).parent / 'latex_emitter.py',
+    Path(__file__).parent / 'table_reader.py',
+    Path(__file__).parent / 'anchor_registry.py',
+)
+
+
+def section_hash(text: str) -> str:
+    """Return the SHA-256 hex digest of a section's markdown"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def converter_version() -> str:
+    """Hash of the converter sources used to invalidate stale caches"""
+    return sources_version(CONVERTER_SOURCES)
+
+
+class ConversionCache(PersistentCache):
+    """Persistent LRU cache of converted sections
+
+    Entries are keyed by the hash of the section markdown; together with
+    the converter version of the file, a key covers both content and
+    converter.
+    """
+
+    SOURCES = CONVERTER_SOURCES
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the converted output stored under a section hash"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        return self._hit(entry)['output']
+
+    def put(self, key: str, output: str):
+        """Store the converted output of a section"""
+        self._entries[key] = {
+            'output': output,
+            'size': len(output.encode('utf-8')),
+            'last_used': self._tick()
+        }
+        self._dirty = True
+
+    def stats(self) -> Dict[str, int]:
+        """Return the entry count and the hit, miss and eviction counters"""
+        return {'entries': len(self._entries), **super().stats()}
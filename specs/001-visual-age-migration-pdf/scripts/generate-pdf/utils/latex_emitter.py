@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+LaTeX Emitter for Visual Age Migration PDF Generation
+Renders a markdown document tree to LaTeX in one output buffer
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from anchor_registry import ascii_anchor
+from markdown_ast import (
+    INLINE, Node, DOCUMENT, HEADING, PARAGRAPH, CODE, LIST, TABLE, QUOTE, RULE,
+    TEXT, STRONG, EMPHASIS, CODE_SPAN, LINK
+)
+
+
+# One translation table instead of sequential replaces, so the braces
+# produced by \textbackslash{} are never escaped a second time
+LATEX_ESCAPES = str.maketrans({
+    '\\': '\\textbackslash{}',
+    '&': '\\&',
+    '%': '\\%',
+    '$': '\\$',
+    '#': '\\#',
+    '_': '\\_',
+    '{': '\\{',
+    '}': '\\}',
+    '~': '\\textasciitilde{}',
+    '^': '\\textasciicircum{}',
+})
+
+# str.translate takes a slow path on non-ASCII text, and most text nodes
+# (Portuguese prose) have nothing to escape, so look before translating
+LATEX_SPECIAL = re.compile(r'[\\&%$#_{}~^]')
+
+HEADING_COMMANDS = {
+    1: 'section',
+    2: 'subsection',
+    3: 'subsubsection',
+    4: 'paragraph',
+    5: 'subparagraph',
+    6: 'subparagraph'
+}
+
+COLUMN_SPEC = {'left': 'l', 'right': 'r', 'center': 'c'}
+
+HORIZONTAL_RULE = '\\noindent\\rule{\\linewidth}{0.4pt}'
+
+def escape_latex(text: str) -> str:
+    """Escape special LaTeX characters"""
+    return text.translate(LATEX_ESCAPES) if LATEX_SPECIAL.search(text) else text
+
+
+def latex_label(anchor: str) -> str:
+    """Label name for a heading anchor; the registry keeps these unique too"""
+    return ascii_anchor(anchor)
+
+
+class LatexEmitter:
+    """Renders block and inline nodes; only text nodes are escaped
+
+    Headings and list items with an ``id`` get a ``\\label`` and links to
+    ``#id`` become ``\\hyperref`` references to it. The ``markdown_*``
+    methods render blocks straight from their markdown text instead, for
+    blocks with no links to resolve.
+    """
+
+    def __init__(self):
+        # Label of each anchor seen, folded once however often it is used
+        self._labels: Dict[str, str] = {}
+
+    def _label(self, anchor: str) -> str:
+        label = self._labels.get(anchor)
+        if label is None:
+            label = self._labels[anchor] = latex_label(anchor)
+        return label
+
+    def emit(self, node: Node) -> str:
+        """Return the LaTeX for a document or any block node"""
+        out: List[str] = []
+        if node.kind == DOCUMENT:
+            for block in node.children:
+                self._block(block, out)
+                out.append('\n\n')
+        else:
+            self._block(node, out)
+        return ''.join(out)
+
+    def _block(self, node: Node, out: List[str]):
+        kind = node.kind
+        if kind == HEADING:
+            out.append(f"\\{HEADING_COMMANDS[node.get('level', 1)]}{{")
+            self._inline(node.children, out)
+            out.append('}')
+            if node.get('id'):
+                out.append(f"\\label{{{self._label(node.get('id'))}}}")
+        elif kind == PARAGRAPH:
+            self._inline(node.children, out)
+        elif kind == CODE:
+            language = node.get('language', 'text')
+            out.append('\\begin{lstlisting}' if language == 'text' else f'\\begin{{lstlisting}}[language={language}]')
+            out.append('\n')
+            out.append(node.value)
+            out.append('\n\\end{lstlisting}')
+        elif kind == LIST:
+            environment = 'enumerate' if node.get('ordered') else 'itemize'
+            out.append(f'\\begin{{{environment}}}\n')
+            for item in node.children:
+                out.append('  \\item ')
+                self._item(item, out)
+                out.append('\n')
+            out.append(f'\\end{{{environment}}}')
+        elif kind == TABLE:
+            self._table(node, out)
+        elif kind == QUOTE:
+            out.append('\\begin{quote}\n')
+            for child in node.children:
+                self._block(child, out)
+            out.append('\n\\end{quote}')
+        elif kind == RULE:
+            out.append(HORIZONTAL_RULE)
+
+    def _item(self, item: Node, out: List[str]):
+        if item.get('id'):
+            out.append(f"\\phantomsection\\label{{{self._label(item.get('id'))}}}")
+        inline = []
+        for child in item.children:
+            if child.kind == LIST:
+                self._inline(inline, out)
+                inline = []
+                out.append('\n')
+                self._block(child, out)
+            else:
+                inline.append(child)
+        self._inline(inline, out)
+
+    def _table(self, table: Node, out: List[str]):
+        self._tabular([(row.get('header'), row.children) for row in table.children], table.get('alignment', []),
+                      lambda cell: self._inline(cell.children, out), out)
+
+    def _tabular(self, rows: List[Tuple[bool, Sequence]], alignment: List[str], cell: Callable, out: List[str]):
+        columns = max(len(cells) for _, cells in rows)
+        alignment = (alignment + ['left'] * columns)[:columns]
+        out.append(f"\\begin{{tabular}}{{{''.join(COLUMN_SPEC[a] for a in alignment)}}}\n")
+        out.append('\\toprule\n')
+        for header, cells in rows:
+            for index, value in enumerate(cells):
+                if index:
+                    out.append(' & ')
+                cell(value)
+            out.append(' \\\\\n')
+            if header:
+                out.append('\\midrule\n')
+        out.append('\\bottomrule\n')
+        out.append('\\end{tabular}')
+
+    def _inline(self, nodes: List[Node], out: List[str]):
+        for node in nodes:
+            kind = node.kind
+            if kind == TEXT:
+                out.append(escape_latex(node.value))
+            elif kind == CODE_SPAN:
+                out.append('\\texttt{')
+                out.append(escape_latex(node.value))
+                out.append('}')
+            elif kind in (STRONG, EMPHASIS):
+                out.append('\\textbf{' if kind == STRONG else '\\textit{')
+                self._inline(node.children, out)
+                out.append('}')
+            elif kind == LINK and node.get('url', '').startswith('#'):
+                out.append(f"\\hyperref[{self._label(node.get('url')[1:])}]{{")
+                self._inline(node.children, out)
+                out.append('}')
+            elif kind == LINK:
+                url = node.get('url', '').replace('\\', '/').replace('%', '\\%').replace('#', '\\#')
+                out.append(f'\\href{{{url}}}{{')
+                self._inline(node.children, out)
+                out.append('}')
+
+    def inline_markdown(self, text: str) -> str:
+        """LaTeX of a line of inline markdown, the same as emitting its parse_inline nodes
+
+        Builds no nodes, so links are emitted as written: only for text
+        that AnchorRegistry.link would leave unchanged.
+        """
+        if '*' not in text and '`' not in text and '[' not in text:
+            return escape_latex(text)
+
+        out: List[str] = []
+        position = 0
+        for match in INLINE.finditer(text):
+            if match.start() > position:
+                out.append(escape_latex(text[position:match.start()]))
+            group = match.lastgroup
+            if group == 'code_text':
+                out.append(f"\\texttt{{{escape_latex(match.group(group).strip())}}}")
+            elif group == 'strong_emphasis':
+                out.append(f"\\textbf{{\\textit{{{self.inline_markdown(match.group(group))}}}}}")
+            elif group in ('strong', 'emphasis'):
+                command = 'textbf' if group == 'strong' else 'textit'
+                out.append(f"\\{command}{{{self.inline_markdown(match.group(group))}}}")
+            elif match.group('url').startswith('#'):
+                out.append(f"\\hyperref[{self._label(match.group('url')[1:])}]"
+                           f"{{{self.inline_markdown(match.group('link_text'))}}}")
+            else:
+                url = match.group('url').replace('\\', '/').replace('%', '\\%').replace('#', '\\#')
+                out.append(f"\\href{{{url}}}{{{self.inline_markdown(match.group('link_text'))}}}")
+            position = match.end()
+        if position < len(text):
+            out.append(escape_latex(text[position:]))
+        return ''.join(out)
+
+    def markdown_heading(self, level: int, title: str, anchor: str) -> str:
+        """LaTeX of a heading with an inline markdown title, without building nodes"""
+        return f"\\{HEADING_COMMANDS[level]}{{{self.inline_markdown(title)}}}\\label{{{self._label(anchor)}}}"
+
+    def markdown_list(self, items: List[Tuple[List[str], Optional[Tuple]]], ordered: bool) -> str:
+        """LaTeX of a list of (text lines, nested list or None) items, without building nodes
+
+        A nested list is an ``(items, ordered)`` pair, like the arguments.
+        """
+        environment = 'enumerate' if ordered else 'itemize'
+        out = [f'\\begin{{{environment}}}\n']
+        for lines, nested in items:
+            out.append('  \\item ')
+            out.append('\n'.join(self.inline_markdown(line) for line in lines))
+            if nested:
+                out.append('\n')
+                out.append(self.markdown_list(*nested))
+            out.append('\n')
+        out.append(f'\\end{{{environment}}}')
+        return ''.join(out)
+
+    def markdown_table(self, rows: List[List[str]], alignment: List[str]) -> str:
+        """LaTeX of table rows of inline markdown cells, the first row the header, without building nodes"""
+        out: List[str] = []
+        self._tabular([(index == 0, cells) for index, cells in enumerate(rows)], alignment,
+                      lambda cell: out.append(self.inline_markdown(cell)), out)
+        return ''.join(out)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Markdown AST for Visual Age Migration PDF Generation
+Compact node tree built once per document and shared by the LaTeX and ReportLab emitters
+"""
+
+import re
+from typing import Dict, List, Any, Optional, Iterator
+
+
+# Block nodes
+DOCUMENT = 'document'
+HEADING = 'heading'
+PARAGRAPH = 'paragraph'
+CODE = 'code'
+LIST = 'list'
+ITEM = 'item'
+TABLE = 'table'
+ROW = 'row'
+CELL = 'cell'
+QUOTE = 'quote'
+RULE = 'rule'
+
+# Inline nodes
+TEXT = 'text'
+STRONG = 'strong'
+EMPHASIS = 'emphasis'
+CODE_SPAN = 'code_span'
+LINK = 'link'
+
+INLINE = re.compile(
+    r'(?P<code>`+)(?P<code_text>.+?)(?P=code)'
+    r'|\*\*\*(?P<strong_emphasis>\S(?:.*?\S)?)\*\*\*'
+    r'|\*\*(?P<strong>\S(?:.*?\S)?)\*\*'
+    r'|\*(?P<emphasis>[^\s*](?:.*?[^\s*])?)\*'
+    r'|\[(?P<link_text>[^\]]+)\]\((?P<url>[^)\s]+)\)'
+)
+
+
+class Node:
+    """One markdown element
+
+    ``start`` and ``end`` are offsets into the source text the tree was
+    built from. ``value`` holds the literal text of TEXT, CODE_SPAN and CODE
+    nodes; ``attrs`` is None unless the kind needs extra data (heading
+    level, code language, list ordering, link URL, table alignment).
+    """
+
+    __slots__ = ('kind', 'start', 'end', 'children', 'value', 'attrs')
+
+    def __init__(self, kind: str, start: int, end: int, children: Optional[List['Node']] = None,
+                 value: Optional[str] = None, attrs: Optional[Dict[str, Any]] = None):
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.children = children if children is not None else []
+        self.value = value
+        self.attrs = attrs
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return one attribute, or ``default``"""
+        return self.attrs.get(key, default) if self.attrs else default
+
+    def text(self) -> str:
+        """Plain text of the node and its descendants"""
+        if self.value is not None:
+            return self.value
+        return ''.join(child.text() for child in self.children)
+
+    def walk(self) -> Iterator['Node']:
+        """Yield the node and all its descendants in document order"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def __repr__(self) -> str:
+        return f"Node({self.kind!r}, {self.start}, {self.end}, children={len(self.children)})"
+
+
+def parse_inline(text: str, offset: int = 0) -> List[Node]:
+    """Split a line of text into inline nodes; ``offset`` is the position of ``text`` in the source"""
+    if '*' not in text and '`' not in text and '[' not in text:
+        return [Node(TEXT, offset, offset + len(text), None, text)] if text else []
+
+    nodes = []
+    position = 0
+
+    for match in INLINE.finditer(text):
+        match_start, match_end = match.span()
+        if match_start > position:
+            nodes.append(Node(TEXT, offset + position, offset + match_start, None, text[position:match_start]))
+
+        start, end = offset + match_start, offset + match_end
+        group = match.lastgroup
+        if group == 'code_text':
+            nodes.append(Node(CODE_SPAN, start, end, value=match.group('code_text').strip()))
+        elif group == 'strong_emphasis':
+            inner = parse_inline(match.group(group), offset + match.start(group))
+            nodes.append(Node(STRONG, start, end, [Node(EMPHASIS, start, end, inner)]))
+        elif group in ('strong', 'emphasis'):
+            inner = parse_inline(match.group(group), offset + match.start(group))
+            nodes.append(Node(STRONG if group == 'strong' else EMPHASIS, start, end, inner))
+        else:
+            inner = parse_inline(match.group('link_text'), offset + match.start('link_text'))
+            nodes.append(Node(LINK, start, end, inner, attrs={'url': match.group('url')}))
+        position = match_end
+
+    if position < len(text):
+        nodes.append(Node(TEXT, offset + position, offset + len(text), None, text[position:]))
+
+    return nodes
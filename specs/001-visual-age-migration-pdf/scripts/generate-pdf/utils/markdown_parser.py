@@ -4,67 +4,102 @@ Markdown Parser Utility for Visual Age Migration PDF Generation
 Parses markdown files and extracts structured sections for LaTeX conversion
 """
 
+import html
+import json
 import re
+import sys
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional
+from urllib.parse import unquote
 import markdown2
 
+from anchor_registry import AnchorRegistry, REFERENCE_ID, is_internal
+from conversion_cache import ConversionCache, section_hash
+from latex_emitter import HORIZONTAL_RULE, LatexEmitter, escape_latex
+from markdown_ast import (
+    Node, parse_inline, DOCUMENT, HEADING, PARAGRAPH, CODE, LIST, ITEM, TABLE, ROW, CELL, QUOTE, RULE, TEXT
+)
+from table_reader import TABLE_SEPARATOR, ESCAPED_PIPE, read_table, split_cells, column_alignment
+
+
+# Version of the to_compact layout; bump when spans or fields change
+COMPACT_FORMAT = 'markdown-spans/1'
+
+FRONTMATTER_BLOCK = re.compile(r'^---\n.*?\n---\n', re.DOTALL)
+HEADER_LINE = re.compile(r'^(#{1,6})\s+(.*?)$')
+# Headings, code fence lines and list items that define an ID (optionally
+# after a checkbox and emphasis). Searching for the newline before a line
+# lets the regex engine skip ahead instead of trying ^ at every position
+FENCE_LINE = r'[^\S\n]*```.*'
+HEADING_LINE = r'(?P<level>#{1,6})[^\S\n]+(?P<title>.*)'
+DEFINITION_LINE = r'[^\S\n]*[-*+][^\S\n]+(?:\[[ xX]\][^\S\n]+)?[*_`]*(?P<reference>' + REFERENCE_ID.pattern + r').*'
+HEADING_OR_FENCE_LINE = f'(?:{FENCE_LINE}|{HEADING_LINE})'
+OUTLINE_LINE = f'(?:{FENCE_LINE}|{HEADING_LINE}|{DEFINITION_LINE})'
+FIRST_HEADING_OR_FENCE = re.compile(HEADING_OR_FENCE_LINE)
+HEADING_OR_FENCE = re.compile(r'\n' + HEADING_OR_FENCE_LINE)
+FIRST_OUTLINE = re.compile(OUTLINE_LINE)
+OUTLINE = re.compile(r'\n' + OUTLINE_LINE)
+# Heading ids and link targets in markdown2 output
+HTML_HEADING_ID = re.compile(r'(<h[1-6] id=")([^"]*)"')
+HTML_HEADING = re.compile(r'<h([1-6]) id="([^"]*)">(.*?)</h\1>', re.S)
+HTML_HREF = re.compile(r'href="([^"]*)"')
+
+# What AnchorRegistry.link acts on: ID mentions and internal link targets;
+# blocks without any are left out of its walk. REFERENCE_ID without its
+# word boundaries, so the regex engine can skip ahead on the first letters
+LINKABLE = re.compile(r'BR-\d{3}|FR-\d{3}|T\d{3}|\]\((?:#|[^)\s]*\.md)')
+
+UNORDERED_ITEM = re.compile(r'^[-*+]\s+')
+ORDERED_ITEM = re.compile(r'^\d+\.\s+')
+THEMATIC_BREAK = re.compile(r'^ {0,3}([-*_])(?: *\1){2,} *$')
+
+
+def frontmatter_end(content: str) -> int:
+    """Offset just past a leading frontmatter block, 0 when there is none"""
+    match = FRONTMATTER_BLOCK.match(content) if content.startswith('---\n') else None
+    return match.end() if match else 0
+
 
 class MarkdownParser:
     """Parser for extracting and converting markdown content to LaTeX-friendly format"""
 
     def __init__(self):
         """Initialize the markdown parser"""
+        # convert() resets the instance; reset-count also restarts header id
+        # numbering, so the instance can be reused across documents
         self.md = markdown2.Markdown(
-            extras=[
-                'tables',
-                'fenced-code-blocks',
-                'header-ids',
-                'toc',
-                'footnotes',
-                'smarty-pants'
-            ]
+            extras={
+                'tables': None,
+                'fenced-code-blocks': None,
+                'header-ids': {'reset-count': True},
+                'toc': None,
+                'footnotes': None,
+                'smarty-pants': None
+            }
         )
+        self.latex = LatexEmitter()
 
-    def parse_file(self, file_path: str) -> Dict[str, any]:
-        """Parse a markdown file and extract structured content"""
+    def parse_file(self, file_path: str) -> 'ParsedDocument':
+        """Read a markdown file; its parts are parsed when first accessed"""
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
 
-        return self.parse_content(content)
+        return self.parse_document(content)
+
+    def parse_document(self, content: str) -> 'ParsedDocument':
+        """Wrap markdown content in a lazily parsed document"""
+        return ParsedDocument(content, self)
 
     def parse_content(self, content: str) -> Dict[str, any]:
         """Parse markdown content and extract structured sections"""
-        # Extract frontmatter if present
-        frontmatter = self._extract_frontmatter(content)
-
-        # Remove frontmatter from content
-        if frontmatter:
-            content = re.sub(r'^---\n.*?\n---\n', '', content, flags=re.DOTALL)
-
-        # Extract sections
-        sections = self._extract_sections(content)
-
-        # Extract code blocks
-        code_blocks = self._extract_code_blocks(content)
-
-        # Extract tables
-        tables = self._extract_tables(content)
-
-        # Extract lists
-        lists = self._extract_lists(content)
-
-        return {
-            'frontmatter': frontmatter,
-            'sections': sections,
-            'code_blocks': code_blocks,
-            'tables': tables,
-            'lists': lists,
-            'raw_content': content
-        }
+        return self.parse_document(content).to_dict()
 
     def _extract_frontmatter(self, content: str) -> Optional[Dict]:
         """Extract YAML frontmatter from markdown"""
+        if not content.startswith('---\n'):
+            return None
+
         pattern = r'^---\n(.*?)\n---'
         match = re.match(pattern, content, re.DOTALL)
 
@@ -76,261 +111,586 @@ class MarkdownParser:
                 return None
         return None
 
-    def _extract_sections(self, content: str) -> List[Dict]:
-        """Extract hierarchical sections from markdown"""
-        sections = []
-
-        # Pattern to match headers
-        header_pattern = r'^(#{1,6})\s+(.*?)$'
-
-        lines = content.split('\n')
-        current_section = None
-        section_content = []
-
-        for line in lines:
-            header_match = re.match(header_pattern, line)
-
-            if header_match:
-                # Save previous section if exists
-                if current_section:
-                    current_section['content'] = '\n'.join(section_content).strip()
-                    sections.append(current_section)
-
-                # Start new section
-                level = len(header_match.group(1))
-                title = header_match.group(2)
-                current_section = {
-                    'level': level,
-                    'title': title,
-                    'id': self._generate_section_id(title),
-                    'content': ''
-                }
-                section_content = []
-            elif current_section:
-                section_content.append(line)
-
-        # Save last section
-        if current_section:
-            current_section['content'] = '\n'.join(section_content).strip()
-            sections.append(current_section)
-
-        return sections
+    def _tokenize(self, content: str, start: int = 0) -> Dict[str, List[Dict]]:
+        """Split markdown into code blocks, tables and lists in a single pass
+
+        Returns the blocks with their text, in the form of ``_block_spans``
+        records passed through ``_block_record``.
+        """
+        spans = self._block_spans(content, start)
+        return {field: [self._block_record(content, span) for span in records]
+                for field, records in spans.items()}
+
+    def _block_spans(self, content: str, start: int = 0) -> Dict[str, List[Dict]]:
+        """Find code blocks, tables and lists in a single pass, as spans of ``content``
+
+        Each line from offset ``start`` is classified once; consecutive lines
+        of the same kind form a block, recorded as its ``kind`` and the
+        ``start``/``end`` of its text (for fenced code, of the trimmed code
+        itself). Nothing is copied. Fenced code is opaque: tables and lists
+        inside a fence are not tokenized. Blocks are ordered as the former
+        per-kind extractors returned them: fenced before indented code,
+        unordered before ordered lists.
+        """
+        blocks = {'fenced': [], 'indented': [], 'table': [], 'unordered': [], 'ordered': []}
+
+        fence_language = None
+        fence_start = 0
+        run_kind = None
+        run: List[Tuple[int, str]] = []
+        previous = None
+
+        for line_start, line in self._lines(content, start):
+            if fence_language is not None:
+                if line.lstrip().startswith('```'):
+                    code_start, code_end = self._strip_span(content, fence_start, max(line_start, fence_start))
+                    blocks['fenced'].append({
+                        'kind': 'fenced',
+                        'language': fence_language or 'text',
+                        'start': code_start,
+                        'end': code_end
+                    })
+                    fence_language = None
+                previous = line
+                continue
+
+            kind = self._line_kind(line, previous, run_kind)
+
+            if kind != run_kind:
+                if run_kind:
+                    self._emit_block(run_kind, run, blocks)
+                run_kind = kind if kind in blocks else None
+                run = []
+            if run_kind:
+                run.append((line_start, line))
+
+            if kind == 'fence':
+                fence_language = line.lstrip()[3:].strip()
+                fence_start = line_start + len(line) + 1
+
+            previous = line
+
+        if run_kind:
+            self._emit_block(run_kind, run, blocks)
 
-    def _extract_code_blocks(self, content: str) -> List[Dict]:
-        """Extract code blocks from markdown"""
-        code_blocks = []
+        return {
+            'code_blocks': blocks['fenced'] + blocks['indented'],
+            'tables': blocks['table'],
+            'lists': blocks['unordered'] + blocks['ordered']
+        }
 
-        # Fenced code blocks
-        fenced_pattern = r'```(\w*)\n(.*?)\n```'
-        matches = re.findall(fenced_pattern, content, re.DOTALL)
+    def _headings(self, content: str, start: int = 0, definitions: bool = False):
+        """Yield (offset, line end, match) for each heading outside fenced code
+
+        One pattern finds both headings and fence lines, so lines of plain
+        text are never looked at from Python. With ``definitions`` list
+        items defining an ID are yielded too (their match has a
+        ``reference`` group instead of ``level``).
+        """
+        first_pattern, pattern = (FIRST_OUTLINE, OUTLINE) if definitions else (FIRST_HEADING_OR_FENCE, HEADING_OR_FENCE)
+        first = first_pattern.match(content, start)
+        matches = pattern.finditer(content, start)
+        in_fence = False
+
+        for match in chain([first] if first else [], matches):
+            if match.lastgroup is None:
+                in_fence = not in_fence
+            elif not in_fence:
+                line_start = match.start() if match is first else match.start() + 1
+                yield line_start, match.end(), match
+
+    def outline(self, content: str) -> List[Tuple[int, int, str]]:
+        """(offset, level, title) of each heading and (offset, 0, ID) of each item defining an ID"""
+        return [
+            (line_start, len(match.group('level')), match.group('title')) if match.lastgroup == 'title'
+            else (line_start, 0, match.group('reference'))
+            for line_start, _, match in self._headings(content, frontmatter_end(content), definitions=True)
+        ]
 
-        for language, code in matches:
-            code_blocks.append({
-                'language': language or 'text',
-                'code': code.strip()
+    def scan_anchors(self, content: str, anchors: Optional[AnchorRegistry] = None,
+                     scope: str = '') -> AnchorRegistry:
+        """Register the headings and ID definitions of content, in a new registry unless one is given"""
+        if anchors is None:
+            anchors = AnchorRegistry()
+        anchors.add_outline(self.outline(content), scope)
+        return anchors
+
+    def _sections(self, content: str, start: int = 0, anchors: Optional[AnchorRegistry] = None) -> List[Dict]:
+        """Headings with the offsets of their content, up to the next heading
+
+        ``start`` and ``end`` exclude surrounding whitespace, so
+        ``content[start:end]`` is the section text without copying it here.
+        Section IDs are the anchors of ``anchors`` (built from content when
+        not given), so repeated titles get distinct IDs.
+        """
+        if anchors is None:
+            anchors = self.scan_anchors(content)
+        sections = []
+        for line_start, line_end, header_match in self._headings(content, start):
+            if sections:
+                sections[-1]['start'], sections[-1]['end'] = self._strip_span(
+                    content, sections[-1]['start'], line_start)
+            title = header_match.group('title')
+            sections.append({
+                'level': len(header_match.group('level')),
+                'title': title,
+                'id': anchors.at(line_start) or anchors.slug(title),
+                'start': line_end + 1
             })
 
-        # Indented code blocks
-        indented_pattern = r'\n\n((?:    .*\n)+)'
-        matches = re.findall(indented_pattern, content)
-
-        for code in matches:
-            # Remove indentation
-            cleaned_code = '\n'.join(line[4:] for line in code.split('\n') if line.strip())
-            code_blocks.append({
-                'language': 'text',
-                'code': cleaned_code
-            })
+        if sections:
+            sections[-1]['start'], sections[-1]['end'] = self._strip_span(
+                content, min(sections[-1]['start'], len(content)), len(content))
+        return sections
 
-        return code_blocks
-
-    def _extract_tables(self, content: str) -> List[Dict]:
-        """Extract markdown tables"""
-        tables = []
-
-        # Simple table pattern
-        table_pattern = r'(\|.*\|.*\n)+(\|[-:\s|]+\n)(\|.*\|.*\n)+'
-        matches = re.findall(table_pattern, content)
-
-        for match in matches:
-            table_text = ''.join(match)
-            lines = table_text.strip().split('\n')
-
-            if len(lines) >= 3:  # Header, separator, at least one row
-                # Parse header
-                header = [cell.strip() for cell in lines[0].split('|')[1:-1]]
-
-                # Parse alignment from separator
-                separator = lines[1].split('|')[1:-1]
-                alignment = []
-                for sep in separator:
-                    sep = sep.strip()
-                    if sep.startswith(':') and sep.endswith(':'):
-                        alignment.append('center')
-                    elif sep.endswith(':'):
-                        alignment.append('right')
-                    else:
-                        alignment.append('left')
-
-                # Parse rows
-                rows = []
-                for line in lines[2:]:
-                    row = [cell.strip() for cell in line.split('|')[1:-1]]
-                    rows.append(row)
-
-                tables.append({
-                    'header': header,
-                    'alignment': alignment,
-                    'rows': rows
-                })
-
-        return tables
-
-    def _extract_lists(self, content: str) -> List[Dict]:
-        """Extract ordered and unordered lists"""
-        lists = []
-
-        # Unordered list pattern
-        ul_pattern = r'(?:^|\n)((?:[-*+]\s+.*(?:\n|$))+)'
-        matches = re.findall(ul_pattern, content)
-
-        for match in matches:
-            items = []
-            for line in match.strip().split('\n'):
-                if re.match(r'^[-*+]\s+', line):
-                    items.append(re.sub(r'^[-*+]\s+', '', line))
-
-            if items:
-                lists.append({
-                    'type': 'unordered',
-                    'items': items
-                })
-
-        # Ordered list pattern
-        ol_pattern = r'(?:^|\n)((?:\d+\.\s+.*(?:\n|$))+)'
-        matches = re.findall(ol_pattern, content)
-
-        for match in matches:
-            items = []
-            for line in match.strip().split('\n'):
-                if re.match(r'^\d+\.\s+', line):
-                    items.append(re.sub(r'^\d+\.\s+', '', line))
-
-            if items:
-                lists.append({
-                    'type': 'ordered',
-                    'items': items
-                })
-
-        return lists
-
-    def _generate_section_id(self, title: str) -> str:
-        """Generate a valid section ID from title"""
-        # Remove special characters and convert to lowercase
-        section_id = re.sub(r'[^\w\s-]', '', title.lower())
-        # Replace spaces with hyphens
-        section_id = re.sub(r'[-\s]+', '-', section_id)
-        return section_id.strip('-')
-
-    def markdown_to_latex(self, content: str) -> str:
-        """Convert markdown content to LaTeX format"""
-        latex = content
-
-        # Escape LaTeX special characters
-        latex = self.escape_latex(latex)
-
-        # Convert headers
-        latex = re.sub(r'^# (.*?)$', r'\\section{\1}', latex, flags=re.MULTILINE)
-        latex = re.sub(r'^## (.*?)$', r'\\subsection{\1}', latex, flags=re.MULTILINE)
-        latex = re.sub(r'^### (.*?)$', r'\\subsubsection{\1}', latex, flags=re.MULTILINE)
-        latex = re.sub(r'^#### (.*?)$', r'\\paragraph{\1}', latex, flags=re.MULTILINE)
-
-        # Convert emphasis
-        latex = re.sub(r'\*\*\*(.*?)\*\*\*', r'\\textbf{\\textit{\1}}', latex)
-        latex = re.sub(r'\*\*(.*?)\*\*', r'\\textbf{\1}', latex)
-        latex = re.sub(r'\*(.*?)\*', r'\\textit{\1}', latex)
-        latex = re.sub(r'`(.*?)`', r'\\texttt{\1}', latex)
-
-        # Convert lists
-        latex = self._convert_lists_to_latex(latex)
-
-        # Convert links
-        latex = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'\\href{\2}{\1}', latex)
-
-        # Convert code blocks
-        latex = self._convert_code_blocks_to_latex(latex)
+    @staticmethod
+    def _strip_span(content: str, start: int, end: int) -> Tuple[int, int]:
+        """Narrow a span so it excludes leading and trailing whitespace"""
+        while start < end and content[start].isspace():
+            start += 1
+        while end > start and content[end - 1].isspace():
+            end -= 1
+        return start, end
+
+    @staticmethod
+    def _lines(content: str, start: int = 0):
+        """Yield (offset, line) pairs without splitting the whole document up front"""
+        while True:
+            end = content.find('\n', start)
+            if end == -1:
+                yield start, content[start:]
+                return
+            yield start, content[start:end]
+            start = end + 1
+
+    def _line_kind(self, line: str, previous: Optional[str], run_kind: Optional[str]) -> Optional[str]:
+        """Classify a line outside fenced code"""
+        stripped = line.lstrip()
+        if stripped.startswith('```'):
+            return 'fence'
+        if line.startswith('    ') and (run_kind == 'indented' or previous == ''):
+            return 'indented'
+
+        # Dispatch on the first character before trying any pattern
+        first = line[:1]
+        if first == '#':
+            return 'heading' if HEADER_LINE.match(line) else None
+        if stripped[:1] == '|':
+            return 'table'
+        if first in ('-', '*', '+'):
+            return 'unordered' if UNORDERED_ITEM.match(line) else None
+        if first.isdigit():
+            return 'ordered' if ORDERED_ITEM.match(line) else None
+        return None
 
-        return latex
+    @staticmethod
+    def _emit_block(kind: str, run: List[Tuple[int, str]], blocks: Dict[str, List[Dict]]):
+        """Record a run of (offset, line) pairs of one kind as the span of its lines"""
+        if kind == 'table' and (len(run) < 3 or not TABLE_SEPARATOR.match(run[1][1].strip())):
+            return
+        blocks[kind].append({'kind': kind, 'start': run[0][0], 'end': run[-1][0] + len(run[-1][1])})
+
+    def _block_record(self, content: str, span: Dict) -> Optional[Dict]:
+        """Output record of a block span: code text, table rows or list items"""
+        kind = span['kind']
+        if kind == 'fenced':
+            return {'language': span['language'], 'code': content[span['start']:span['end']]}
+
+        lines = content[span['start']:span['end']].split('\n')
+        if kind == 'indented':
+            return {'language': 'text', 'code': '\n'.join(line[4:] for line in lines if line.strip())}
+        if kind == 'table':
+            return self._parse_table(lines)
+        pattern = UNORDERED_ITEM if kind == 'unordered' else ORDERED_ITEM
+        return {'type': kind, 'items': [pattern.sub('', line, count=1).rstrip() for line in lines]}
+
+    def _parse_table(self, lines: List[str]) -> Optional[Dict]:
+        """Parse a run of pipe lines; needs a header, a separator and at least one row"""
+        table = read_table(lines)
+        return table.to_dict() if table else None
+
+    def parse_ast(self, content: str, anchors: Optional[AnchorRegistry] = None, scope: str = '',
+                  start: int = 0, end: Optional[int] = None) -> Node:
+        """Build the document tree of markdown content in one pass over its lines
+
+        Offsets in the tree refer to ``content`` itself; a frontmatter block
+        is skipped rather than cut off, and ``start``/``end`` limit the tree
+        to part of the content. Heading, paragraph, list and table text is
+        split into inline nodes, code keeps its text verbatim.
+
+        Headings and items defining an ID take their ``id`` from ``anchors``
+        (registered under ``scope``; scanned from content when not given),
+        links are resolved and ID mentions linked through it. The registry
+        is kept in the document's ``anchors`` attribute and the counts of
+        AnchorRegistry.link in its ``links`` attribute.
+        """
+        if anchors is None:
+            anchors = self.scan_anchors(content, scope=scope)
+        end = len(content) if end is None else end
+        document = Node(DOCUMENT, start, end, attrs={'anchors': anchors})
+        body_start = frontmatter_end(content) if start == 0 else start
+        document.children = [self._block_node(kind, run, content, anchors, scope)
+                             for kind, run in self._block_runs(content, body_start, end)]
+        document.attrs['links'] = self._link_blocks(document, content, anchors, scope)
+        return document
+
+    def _block_runs(self, content: str, start: int, end: int) -> Iterator[Tuple[str, List[Tuple[int, str]]]]:
+        """Yield each block of content[start:end] as its kind and its run of (offset, line) pairs
+
+        A fenced code block is a ``fenced`` run from its opening fence line
+        through its closing one, which is missing when the fence is not
+        closed.
+        """
+        fence: Optional[List[Tuple[int, str]]] = None
+        run_kind = None
+        run: List[Tuple[int, str]] = []
+        previous = None
+
+        # The callers keep the text anyway, so split once and track offsets
+        offset = start
+        for line in content[start:end].split('\n'):
+            line_start, offset = offset, offset + len(line) + 1
+            if fence is not None:
+                fence.append((line_start, line))
+                if line.lstrip().startswith('```'):
+                    yield 'fenced', fence
+                    fence = None
+                previous = line
+                continue
+
+            # Blank, prose, heading, table, list item and rule lines are most
+            # of a document; their first character settles them with at most
+            # one pattern instead of the full dispatch
+            first = line[:1]
+            if not first:
+                kind = 'blank'
+            elif first.isalpha():
+                kind = 'paragraph'
+            elif first == '|':
+                kind = 'table'
+            elif first == '#':
+                kind = 'heading' if HEADER_LINE.match(line) else 'paragraph'
+            elif first in '-*+' and UNORDERED_ITEM.match(line):
+                kind = 'unordered'
+            elif first in '-*':
+                kind = 'rule' if THEMATIC_BREAK.match(line) else 'paragraph'
+            elif first.isdigit():
+                kind = 'ordered' if ORDERED_ITEM.match(line) else 'paragraph'
+            else:
+                kind = self._block_kind(line, previous, run_kind)
+            if kind != run_kind or kind in ('heading', 'rule'):
+                if run_kind:
+                    yield run_kind, run
+                run_kind = kind if kind not in ('fence', 'blank') else None
+                run = []
+            if run_kind:
+                run.append((line_start, line))
+            if kind == 'fence':
+                fence = [(line_start, line)]
+            previous = line
+
+        if run_kind:
+            yield run_kind, run
+        if fence is not None:
+            yield 'fenced', fence
+
+    @staticmethod
+    def _link_blocks(document: Node, content: str, anchors: AnchorRegistry, scope: str) -> Dict[str, int]:
+        """AnchorRegistry.link over the blocks whose source mentions an ID or an internal link"""
+        counts = {'references': 0, 'links': 0, 'unresolved': 0}
+        for block in document.children:
+            if block.kind not in (HEADING, CODE, RULE) and LINKABLE.search(content, block.start, block.end):
+                for name, count in anchors.link(block, scope).items():
+                    counts[name] += count
+        return counts
+
+    def _block_kind(self, line: str, previous: Optional[str], run_kind: Optional[str]) -> str:
+        """Classify a line for the document tree, refining _line_kind"""
+        kind = self._line_kind(line, previous, run_kind)
+        if kind:
+            return kind
+        if not line.strip():
+            return 'blank'
+        if run_kind in ('unordered', 'ordered') and line[0] in ' \t':
+            return run_kind
+        if THEMATIC_BREAK.match(line):
+            return 'rule'
+        if line.lstrip().startswith('>'):
+            return 'quote'
+        return 'paragraph'
+
+    def _block_node(self, kind: str, run: List[Tuple[int, str]], content: str,
+                    anchors: AnchorRegistry, scope: str) -> Node:
+        """Convert a run of (offset, line) pairs of one kind into a block node"""
+        start, end = run[0][0], run[-1][0] + len(run[-1][1])
+
+        if kind == 'fenced':
+            language = run[0][1].lstrip()[3:].strip() or 'text'
+            code_start = start + len(run[0][1]) + 1
+            closed = len(run) > 1 and run[-1][1].lstrip().startswith('```')
+            code_end = max(run[-1][0] - 1, code_start) if closed else end
+            return Node(CODE, start, end, value=content[code_start:code_end], attrs={'language': language})
+        if kind == 'heading':
+            header_match = HEADER_LINE.match(run[0][1])
+            title = header_match.group(2)
+            return Node(HEADING, start, end, parse_inline(title, start + header_match.start(2)),
+                        attrs={'level': len(header_match.group(1)),
+                               'id': anchors.at(start, scope) or anchors.slug(title)})
+        if kind == 'rule':
+            return Node(RULE, start, end)
+        if kind == 'indented':
+            return Node(CODE, start, end, value='\n'.join(line[4:] for _, line in run if line.strip()),
+                        attrs={'language': 'text'})
+        if kind in ('unordered', 'ordered'):
+            return self._list_node(run, anchors, scope)
+        if kind == 'table':
+            table = self._table_node(run)
+            if table:
+                return table
+
+        # Paragraphs are split into inline nodes in one call
+        if kind == 'paragraph':
+            return Node(PARAGRAPH, start, end, parse_inline(content[start:end], start))
+
+        # Quotes and pipe runs that are not tables
+        children = []
+        for offset, line in run:
+            text = line.strip()
+            if kind == 'quote':
+                text = text[1:].lstrip()
+            if children:
+                children.append(Node(TEXT, offset - 1, offset, value='\n'))
+            children.extend(parse_inline(text, offset + line.index(text) if text else offset))
+        paragraph = Node(PARAGRAPH, start, end, children)
+        return Node(QUOTE, start, end, [paragraph]) if kind == 'quote' else paragraph
+
+    def _list_node(self, run: List[Tuple[int, str]], anchors: AnchorRegistry, scope: str) -> Node:
+        """Build a list; deeper-indented items become a nested list of the preceding item"""
+        indent = len(run[0][1]) - len(run[0][1].lstrip())
+        ordered = bool(ORDERED_ITEM.match(run[0][1].lstrip()))
+        node = Node(LIST, run[0][0], run[-1][0] + len(run[-1][1]), attrs={'ordered': ordered})
+        item = None
+        nested: List[Tuple[int, str]] = []
+
+        for offset, line in run:
+            stripped = line.lstrip()
+            depth = len(line) - len(stripped)
+            marker = UNORDERED_ITEM.match(stripped) or ORDERED_ITEM.match(stripped)
+
+            if marker and depth <= indent:
+                if nested:
+                    item.children.append(self._list_node(nested, anchors, scope))
+                    nested = []
+                text_start = offset + depth + marker.end()
+                anchor = anchors.at(offset, scope)
+                item = Node(ITEM, offset, offset + len(line), parse_inline(stripped[marker.end():].rstrip(), text_start),
+                            attrs={'id': anchor} if anchor else None)
+                node.children.append(item)
+            elif marker or nested:
+                nested.append((offset, line))
+                item.end = offset + len(line)
+            else:
+                item.children.append(Node(TEXT, offset - 1, offset, value='\n'))
+                item.children.extend(parse_inline(stripped.rstrip(), offset + depth))
+                item.end = offset + len(line)
+
+        if nested:
+            item.children.append(self._list_node(nested, anchors, scope))
+        return node
+
+    @staticmethod
+    def _is_table(run: List[Tuple[int, str]]) -> bool:
+        """Whether a run of pipe lines has a header, a separator and a row"""
+        return len(run) >= 3 and bool(TABLE_SEPARATOR.match(run[1][1].strip()))
+
+    @staticmethod
+    def _table_cells(run: List[Tuple[int, str]]) -> List[List[str]]:
+        """Cell texts of the rows of a table run, without the separator row"""
+        return [[line[start:end].strip().replace(ESCAPED_PIPE, '|') for start, end in split_cells(line)]
+                for index, (_, line) in enumerate(run) if index != 1]
+
+    @staticmethod
+    def _list_items(run: List[Tuple[int, str]]) -> Tuple[List, bool]:
+        """Items of a list run as (text lines, nested list or None) and whether it is ordered
+
+        Items nest the way _list_node nests them; a nested list is the
+        same (items, ordered) pair.
+        """
+        indent = len(run[0][1]) - len(run[0][1].lstrip())
+        items: List[Tuple[List[str], Optional[Tuple]]] = []
+        nested: List[Tuple[int, str]] = []
+        for offset, line in run:
+            stripped = line.lstrip()
+            marker = UNORDERED_ITEM.match(stripped) or ORDERED_ITEM.match(stripped)
+            if marker and len(line) - len(stripped) <= indent:
+                if nested:
+                    items[-1] = (items[-1][0], MarkdownParser._list_items(nested))
+                    nested = []
+                items.append(([stripped[marker.end():].rstrip()], None))
+            elif marker or nested:
+                nested.append((offset, line))
+            else:
+                items[-1][0].append(stripped.rstrip())
+        if nested:
+            items[-1] = (items[-1][0], MarkdownParser._list_items(nested))
+        return items, bool(ORDERED_ITEM.match(run[0][1].lstrip()))
+
+    def _table_node(self, run: List[Tuple[int, str]]) -> Optional[Node]:
+        """Build a table with a header row; None when the run has no separator row"""
+        if not self._is_table(run):
+            return None
+
+        table = Node(TABLE, run[0][0], run[-1][0] + len(run[-1][1]),
+                     attrs={'alignment': column_alignment(run[1][1])})
+        for index, (offset, line) in enumerate(run):
+            if index == 1:
+                continue
+            row = Node(ROW, offset, offset + len(line), attrs={'header': True} if index == 0 else None)
+            for start, end in split_cells(line):
+                text = line[start:end].strip()
+                text_start = offset + line.index(text, start) if text else offset + start
+                if ESCAPED_PIPE in text:
+                    text = text.replace(ESCAPED_PIPE, '|')
+                row.children.append(Node(CELL, offset + start, offset + end, parse_inline(text, text_start)))
+            table.children.append(row)
+        return table
+
+    def markdown_to_latex(self, content: str, cache: Optional[ConversionCache] = None,
+                          anchors: Optional[AnchorRegistry] = None, scope: str = '') -> str:
+        """Convert markdown content to LaTeX format
+
+        The content is tokenized once and emitted into a single buffer.
+        Only text is escaped, so code blocks, code spans and link targets
+        reach LaTeX unmangled. With ``cache`` each section is converted on
+        its own and only sections whose markdown changed are reconverted;
+        the spliced output is identical.
+        Cache keys include the fingerprint of the anchor registry and the
+        section's own anchors, since labels and links depend on the other
+        headings and repeated titles get numbered anchors.
+        """
+        if anchors is None:
+            anchors = self.scan_anchors(content, scope=scope)
+        if cache is None:
+            return self._latex(content, anchors, scope)
+
+        fingerprint = anchors.fingerprint()
+        parts = []
+        for start, end in self.section_spans(content):
+            key = section_hash(fingerprint + ' '.join(anchors.between(start, end, scope)) + '\n' + content[start:end])
+            latex = cache.get(key)
+            if latex is None:
+                latex = self._latex(content, anchors, scope, start, end)
+                cache.put(key, latex)
+            parts.append(latex)
+        return ''.join(parts)
+
+    def _latex(self, content: str, anchors: AnchorRegistry, scope: str, start: int = 0,
+               end: Optional[int] = None) -> str:
+        """LaTeX of content[start:end], the same as emitting its parse_ast tree
+
+        Headings, rules, and paragraphs, lists and tables with nothing for
+        AnchorRegistry.link to change (no ID mention or internal link),
+        are emitted straight from their source lines without building
+        nodes. Other blocks go through the tree, and only the linkable
+        ones through AnchorRegistry.link.
+        """
+        end = len(content) if end is None else end
+        out = []
+        for kind, run in self._block_runs(content, frontmatter_end(content) if start == 0 else start, end):
+            block_start, block_end = run[0][0], run[-1][0] + len(run[-1][1])
+            plain = not LINKABLE.search(content, block_start, block_end)
+            if kind == 'heading':
+                header_match = HEADER_LINE.match(run[0][1])
+                level, title = len(header_match.group(1)), header_match.group(2)
+                out.append(self.latex.markdown_heading(level, title,
+                                                       anchors.at(block_start, scope) or anchors.slug(title)))
+            elif kind == 'rule':
+                out.append(HORIZONTAL_RULE)
+            elif plain and kind == 'paragraph':
+                out.append(self.latex.inline_markdown(content[block_start:block_end]))
+            elif plain and kind in ('unordered', 'ordered'):
+                out.append(self.latex.markdown_list(*self._list_items(run)))
+            elif plain and kind == 'table' and self._is_table(run):
+                out.append(self.latex.markdown_table(self._table_cells(run), column_alignment(run[1][1])))
+            else:
+                block = self._block_node(kind, run, content, anchors, scope)
+                if not plain and block.kind not in (CODE, RULE):
+                    anchors.link(block, scope)
+                out.append(self.latex.emit(block))
+            out.append('\n\n')
+        return ''.join(out)
+
+    def render_html(self, text: str) -> Tuple[str, List[Tuple[int, str, str]]]:
+        """HTML of some markdown and its (level, id, title) TOC entries, from the configured markdown2 instance"""
+        output = str(self.md.convert(text))
+        # The same entries the toc extra collects, read from the headings it renders
+        return output, [(int(level), anchor, title) for level, anchor, title in HTML_HEADING.findall(output)]
+
+    def markdown_to_html(self, content: str, anchors: Optional[AnchorRegistry] = None, scope: str = '',
+                         render: Optional[Callable[[List[str]], Iterable]] = None) -> Tuple[str, List]:
+        """Convert markdown content to HTML one section at a time; returns the HTML and its TOC entries
+
+        ``render`` maps the list of section texts to ``render_html`` results
+        (default: this parser, in order); pass a process pool's map to render
+        sections in parallel.
+        """
+        if anchors is None:
+            anchors = self.scan_anchors(content, scope=scope)
+        spans = self.html_spans(content)
+        texts = [content[start:end] for start, end in spans]
+        return self.join_html(spans, render(texts) if render else map(self.render_html, texts), anchors, scope)
+
+    def html_spans(self, content: str) -> List[Tuple[int, int]]:
+        """section_spans without the frontmatter block"""
+        body_start = frontmatter_end(content)
+        return [(max(start, body_start), end) for start, end in self.section_spans(content)]
+
+    def join_html(self, spans: List[Tuple[int, int]], results: Iterable, anchors: AnchorRegistry,
+                  scope: str = '') -> Tuple[str, List]:
+        """Join the ``render_html`` results of ``html_spans`` into one document
+
+        Heading ids become the anchors of ``anchors`` and internal links are
+        resolved through it, so ids stay unique when sections and documents
+        rendered apart are joined.
+        """
+        parts = []
+        toc = []
+        for (start, _), (section_html, entries) in zip(spans, results):
+            anchor = anchors.at(start, scope)
+            if anchor and entries:
+                section_html = HTML_HEADING_ID.sub(lambda match: f'{match.group(1)}{html.escape(anchor)}"',
+                                                   section_html, count=1)
+                entries[0] = (entries[0][0], anchor, entries[0][2])
+            parts.append(HTML_HREF.sub(lambda match: self._html_link(match, anchors, scope), section_html))
+            toc.extend(entries)
+        return ''.join(parts), toc
+
+    @staticmethod
+    def _html_link(match, anchors: AnchorRegistry, scope: str) -> str:
+        url = unquote(html.unescape(match.group(1)))
+        anchor = anchors.resolve(url, scope) if is_internal(url) else None
+        return f'href="#{html.escape(anchor)}"' if anchor else match.group(0)
+
+    def section_spans(self, content: str) -> List[Tuple[int, int]]:
+        """Offsets of the text before the first heading and of each heading up to the next
+
+        Blocks never cross a heading, so converting the spans one by one and
+        joining the results gives the same output as converting the whole text.
+        """
+        spans = []
+        section_start = 0
+
+        for start, _, _ in self._headings(content, frontmatter_end(content)):
+            if start > section_start:
+                spans.append((section_start, start))
+                section_start = start
+
+        spans.append((section_start, len(content)))
+        return spans
 
     def escape_latex(self, text: str) -> str:
         """Escape special LaTeX characters"""
-        # Order matters for replacement
-        replacements = [
-            ('\\', '\\textbackslash{}'),
-            ('&', '\\&'),
-            ('%', '\\%'),
-            ('$', '\\$'),
-            ('#', '\\#'),
-            ('_', '\\_'),
-            ('{', '\\{'),
-            ('}', '\\}'),
-            ('~', '\\textasciitilde{}'),
-            ('^', '\\textasciicircum{}'),
-        ]
-
-        for old, new in replacements:
-            text = text.replace(old, new)
-
-        return text
-
-    def _convert_lists_to_latex(self, content: str) -> str:
-        """Convert markdown lists to LaTeX format"""
-        # Convert unordered lists
-        ul_pattern = r'(?:^|\n)((?:[-*+]\s+.*(?:\n|$))+)'
-
-        def replace_ul(match):
-            items = match.group(1).strip().split('\n')
-            latex_items = []
-            for item in items:
-                item_text = re.sub(r'^[-*+]\s+', '', item)
-                latex_items.append(f'  \\item {item_text}')
-
-            return '\n\\begin{itemize}\n' + '\n'.join(latex_items) + '\n\\end{itemize}\n'
-
-        content = re.sub(ul_pattern, replace_ul, content)
-
-        # Convert ordered lists
-        ol_pattern = r'(?:^|\n)((?:\d+\.\s+.*(?:\n|$))+)'
-
-        def replace_ol(match):
-            items = match.group(1).strip().split('\n')
-            latex_items = []
-            for item in items:
-                item_text = re.sub(r'^\d+\.\s+', '', item)
-                latex_items.append(f'  \\item {item_text}')
-
-            return '\n\\begin{enumerate}\n' + '\n'.join(latex_items) + '\n\\end{enumerate}\n'
-
-        content = re.sub(ol_pattern, replace_ol, content)
-
-        return content
-
-    def _convert_code_blocks_to_latex(self, content: str) -> str:
-        """Convert code blocks to LaTeX listings"""
-        # Fenced code blocks
-        fenced_pattern = r'```(\w*)\n(.*?)\n```'
-
-        def replace_fenced(match):
-            language = match.group(1) or 'text'
-            code = match.group(2)
-
-            return f'''\\begin{{lstlisting}}[language={language}]
-{code}
-\\end{{lstlisting}}'''
-
-        content = re.sub(fenced_pattern, replace_fenced, content, flags=re.DOTALL)
-
-        return content
+        return escape_latex(text)
 
     def table_to_latex(self, table: Dict) -> str:
         """Convert a parsed table to LaTeX format"""
@@ -358,27 +718,235 @@ class MarkdownParser:
         return latex
 
 
+class ParsedDocument:
+    """Markdown source whose parts are parsed on first access and then kept
+
+    Offsets refer to ``source`` itself; a frontmatter block is skipped by
+    offset rather than cut off. Sections carry the ``start`` and ``end`` of
+    their content instead of a copy of it, and code blocks, tables and lists
+    are kept as spans from one tokenizer pass until their text is read.
+    Indexing by field name and ``to_dict`` give the dictionary that
+    ``parse_content`` returned before; ``to_compact`` and ``from_compact``
+    store the spans with a single copy of the source.
+    """
+
+    FIELDS = ('frontmatter', 'sections', 'code_blocks', 'tables', 'lists', 'raw_content')
+    BLOCK_FIELDS = ('code_blocks', 'tables', 'lists')
+
+    def __init__(self, source: str, parser: MarkdownParser):
+        """Keep the source; nothing is parsed yet"""
+        self.source = source
+        self._parser = parser
+        self._parsed: Dict[str, any] = {}
+
+    def _memo(self, name: str, compute):
+        if name not in self._parsed:
+            self._parsed[name] = compute()
+        return self._parsed[name]
+
+    @property
+    def body_start(self) -> int:
+        """Offset of the markdown after the frontmatter block"""
+        return self._memo('body_start', lambda: frontmatter_end(self.source))
+
+    @property
+    def frontmatter(self) -> Optional[Dict]:
+        """Parsed YAML frontmatter, or None"""
+        return self._memo('frontmatter', lambda: self._parser._extract_frontmatter(self.source))
+
+    @property
+    def anchors(self) -> AnchorRegistry:
+        """Anchors of the document's headings and ID definitions"""
+        return self._memo('anchors', lambda: self._parser.scan_anchors(self.source))
+
+    @property
+    def sections(self) -> List[Dict]:
+        """Headings with ``level``, ``title``, ``id`` and the ``start``/``end`` of their content"""
+        return self._memo('sections', lambda: self._parser._sections(self.source, self.body_start, self.anchors))
+
+    @property
+    def code_blocks(self) -> List[Dict]:
+        """Fenced then indented code blocks"""
+        return self._blocks('code_blocks')
+
+    @property
+    def tables(self) -> List[Dict]:
+        """Tables with header, alignment and rows"""
+        return self._blocks('tables')
+
+    @property
+    def lists(self) -> List[Dict]:
+        """Unordered then ordered lists"""
+        return self._blocks('lists')
+
+    @property
+    def raw_content(self) -> str:
+        """The markdown after the frontmatter block"""
+        return self.source[self.body_start:]
+
+    @property
+    def block_spans(self) -> Dict[str, List[Dict]]:
+        """Code blocks, tables and lists as ``kind`` and ``start``/``end`` records"""
+        return self._memo('block_spans', lambda: self._parser._block_spans(self.source, self.body_start))
+
+    def _blocks(self, field: str) -> List[Dict]:
+        return self._memo(field, lambda: [self._parser._block_record(self.source, span)
+                                          for span in self.block_spans[field]])
+
+    def block_text(self, span: Dict) -> str:
+        """Source text of one of the document's block spans"""
+        return self.source[span['start']:span['end']]
+
+    def section_text(self, section: Dict) -> str:
+        """Content of one of the document's sections"""
+        return self.source[section['start']:section['end']]
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_dict(self) -> Dict[str, any]:
+        """All parts in the row-oriented, copied form used for JSON output"""
+        return {
+            'frontmatter': self.frontmatter,
+            'sections': [
+                {
+                    'level': section['level'],
+                    'title': section['title'],
+                    'id': section['id'],
+                    'content': self.section_text(section)
+                }
+                for section in self.sections
+            ],
+            'code_blocks': self.code_blocks,
+            'tables': self.tables,
+            'lists': self.lists,
+            'raw_content': self.raw_content
+        }
+
+    def to_compact(self) -> Dict[str, any]:
+        """Spans of all parts plus the source, stored once; the inverse of ``from_compact``"""
+        return {
+            'format': COMPACT_FORMAT,
+            'source': self.source,
+            'body_start': self.body_start,
+            'frontmatter': self.frontmatter,
+            'sections': records_to_columns(self.sections),
+            'blocks': {field: records_to_columns(spans) for field, spans in self.block_spans.items()}
+        }
+
+    @classmethod
+    def from_compact(cls, data: Dict[str, any], parser: MarkdownParser) -> 'ParsedDocument':
+        """Rebuild a document from ``to_compact`` output without parsing the source again
+
+        Section and block texts are sliced from the source only when read.
+        """
+        if data.get('format') != COMPACT_FORMAT:
+            raise ValueError(f"Unsupported parse result format: {data.get('format')}")
+        document = cls(data['source'], parser)
+        document._parsed.update({
+            'body_start': data['body_start'],
+            'frontmatter': data['frontmatter'],
+            'sections': columns_to_records(data['sections']),
+            'block_spans': {field: columns_to_records(columns) for field, columns in data['blocks'].items()}
+        })
+        return document
+
+
+def records_to_columns(records: List[Dict]) -> Dict[str, List]:
+    """One list per key instead of one dict per record (keys a record lacks hold None)"""
+    keys = list(dict.fromkeys(key for record in records for key in record))
+    return {key: [record.get(key) for record in records] for key in keys}
+
+
+def columns_to_records(columns: Dict[str, List]) -> List[Dict]:
+    """Inverse of records_to_columns"""
+    keys = list(columns)
+    return [{key: value for key, value in zip(keys, values) if value is not None}
+            for values in zip(*columns.values())]
+
+
+def dump_compact(documents: Dict[str, ParsedDocument], fp):
+    """Write parse results keyed by file as compact JSON: spans plus one copy of each source"""
+    json.dump({name: document.to_compact() for name, document in documents.items()},
+              fp, ensure_ascii=False, separators=(',', ':'))
+
+
+def load_compact(fp, parser: Optional[MarkdownParser] = None) -> Dict[str, ParsedDocument]:
+    """Read ``dump_compact`` output back into lazily parsed documents"""
+    parser = parser or MarkdownParser()
+    return {name: ParsedDocument.from_compact(data, parser) for name, data in json.load(fp).items()}
+
+
 def main():
     """Main function for testing the markdown parser"""
     import argparse
-    import json
 
     parser = argparse.ArgumentParser(description='Parse markdown files for LaTeX conversion')
-    parser.add_argument('file', help='Markdown file to parse')
+    parser.add_argument('file', nargs='+', help='Markdown file to parse (several only with --benchmark or --compact)')
     parser.add_argument('--output', '-o', help='Output JSON file')
+    parser.add_argument('--compact', action='store_true',
+                        help='Write spans plus one copy of each source instead of copied section texts')
     parser.add_argument('--latex', '-l', action='store_true', help='Convert to LaTeX')
+    parser.add_argument('--cache', '-c', metavar='FILE',
+                        help='Reuse converted sections from this cache file (with --latex)')
+    parser.add_argument('--benchmark', '-b', type=int, metavar='N',
+                        help='Time N runs of parse_content (markdown_to_latex with --latex) over all '
+                             'files and report throughput and peak memory')
 
     args = parser.parse_args()
+    if len(args.file) > 1 and not (args.benchmark or args.compact):
+        parser.error('several files are only accepted with --benchmark or --compact')
 
     md_parser = MarkdownParser()
-
-    if args.latex:
-        with open(args.file, 'r', encoding='utf-8') as f:
+    cache = ConversionCache(args.cache) if args.cache else None
+
+    if args.benchmark:
+        import time
+        import tracemalloc
+
+        contents = []
+        for file_path in args.file:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                contents.append(f.read())
+        size = sum(len(content.encode('utf-8')) for content in contents)
+        if args.latex:
+            def run(content):
+                return md_parser.markdown_to_latex(content, cache)
+        else:
+            run = md_parser.parse_content
+
+        start = time.perf_counter()
+        for _ in range(args.benchmark):
+            for content in contents:
+                run(content)
+        elapsed = (time.perf_counter() - start) / args.benchmark
+
+        tracemalloc.start()
+        for content in contents:
+            run(content)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        name = Path(args.file[0]).name if len(args.file) == 1 else f"{len(args.file)} files"
+        print(f"{name}: {size:,} bytes, {elapsed * 1000:.2f} ms per run, "
+              f"{size / elapsed / 1024 / 1024:.1f} MB/s, peak {peak:,} bytes")
+    elif args.latex:
+        with open(args.file[0], 'r', encoding='utf-8') as f:
             content = f.read()
-        latex = md_parser.markdown_to_latex(content)
+        latex = md_parser.markdown_to_latex(content, cache)
         print(latex)
+    elif args.compact:
+        documents = {file_path: md_parser.parse_file(file_path) for file_path in args.file}
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                dump_compact(documents, f)
+            print(f"Parsed content saved to {args.output}")
+        else:
+            dump_compact(documents, sys.stdout)
     else:
-        parsed = md_parser.parse_file(args.file)
+        parsed = md_parser.parse_file(args.file[0]).to_dict()
 
         if args.output:
             with open(args.output, 'w', encoding='utf-8') as f:
@@ -387,6 +955,12 @@ def main():
         else:
             print(json.dumps(parsed, indent=2, ensure_ascii=False))
 
+    if cache:
+        cache.save()
+        stats = cache.stats()
+        print(f"Section cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['evictions']} evictions", file=sys.stderr)
+
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Persistent Cache for Visual Age Migration PDF Generation
+Size-capped LRU store in one JSON file, discarded when the code that fills it changes
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Iterable, Sequence, Tuple
+
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def sources_version(sources: Sequence[Path]) -> str:
+    """Hash of a set of module sources, used to invalidate caches they fill"""
+    digest = hashlib.sha256()
+    for source in sources:
+        digest.update(Path(source).read_bytes())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class PersistentCache:
+    """Persistent, size-capped LRU cache
+
+    Cached values depend on the code that computed them as much as on
+    their inputs, so the file records a hash of the modules listed in
+    ``SOURCES`` and is ignored once one of them changes. Every entry is
+    a dict with ``size`` and ``last_used``; subclasses decide how entries
+    are keyed through ``_sized_entries`` and ``_drop``.
+    """
+
+    SOURCES: Sequence[Path] = ()
+
+    def __init__(self, cache_file: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Load the cache file if present"""
+        self.cache_file = Path(cache_file)
+        self.max_bytes = max_bytes
+        self.version = sources_version(self.SOURCES)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: Dict[str, Any] = {}
+        self._clock = 0
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        """Read entries from disk, ignoring caches written by other code versions"""
+        if not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') != self.version:
+            self._dirty = True
+            return
+        self._entries = data.get('entries', {})
+        self._clock = data.get('clock', 0)
+
+    def _tick(self) -> int:
+        """Advance the logical clock used for LRU ordering"""
+        self._clock += 1
+        return self._clock
+
+    def _hit(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Mark an entry as used and count the hit"""
+        entry['last_used'] = self._tick()
+        self._dirty = True
+        self.hits += 1
+        return entry
+
+    def _sized_entries(self) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        """Every entry with the key it is stored under"""
+        return list(self._entries.items())
+
+    def _drop(self, key: str, entry: Dict[str, Any]):
+        """Remove one entry"""
+        del self._entries[key]
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its byte budget"""
+        entries = sorted(self._sized_entries(), key=lambda item: item[1]['last_used'])
+        total = sum(entry['size'] for _, entry in entries)
+        for key, entry in entries:
+            if total <= self.max_bytes:
+                break
+            self._drop(key, entry)
+            total -= entry['size']
+            self.evictions += 1
+
+    def save(self):
+        """Write the cache back to disk if anything changed"""
+        if not self._dirty:
+            return
+
+        self._evict()
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Written next to the cache and renamed over it, so a concurrent
+        # reader never loads a half-written file
+        descriptor, temp_name = tempfile.mkstemp(dir=self.cache_file.parent,
+                                                 prefix=f".{self.cache_file.name}.", suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': self.version,
+                    'clock': self._clock,
+                    'entries': self._entries
+                }, f, ensure_ascii=False)
+            os.replace(temp_name, self.cache_file)
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.unlink(temp_name)
+            raise
+        self._dirty = False
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counters"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
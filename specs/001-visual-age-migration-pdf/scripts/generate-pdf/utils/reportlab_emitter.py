@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+ReportLab Emitter for Visual Age Migration PDF Generation
+Renders a markdown document tree to ReportLab flowables
+"""
+
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import (
+    Flowable, Paragraph, Preformatted, Table, TableStyle, ListFlowable, ListItem, HRFlowable
+)
+
+from markdown_ast import (
+    Node, DOCUMENT, HEADING, PARAGRAPH, CODE, LIST, ITEM, TABLE, QUOTE, RULE,
+    TEXT, STRONG, EMPHASIS, CODE_SPAN, LINK
+)
+
+
+# Roles of the emitter mapped to names in the style sheet; generators with
+# their own styles override entries (e.g. 'body': 'CustomBody')
+DEFAULT_STYLE_NAMES = {
+    'heading1': 'Heading1',
+    'heading2': 'Heading2',
+    'heading3': 'Heading3',
+    'heading4': 'Heading4',
+    'body': 'BodyText',
+    'code': 'Code',
+    'quote': 'BodyText',
+    'table_header': 'BodyText',
+    'table_cell': 'BodyText'
+}
+
+TABLE_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0066CC')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+]
+
+
+class OutlineEntry(Flowable):
+    """Zero-size flowable adding a PDF bookmark for the heading anchor before it"""
+
+    def __init__(self, title: str, key: str, level: int):
+        super().__init__()
+        self.title = title
+        self.key = key
+        self.level = level
+        self.width = self.height = 0
+
+    def wrap(self, available_width, available_height):
+        return 0, 0
+
+    def draw(self):
+        self.canv.addOutlineEntry(self.title, self.key, self.level, closed=self.level > 0)
+
+
+class FlowableEmitter:
+    """Renders block nodes to flowables and inline nodes to paragraph markup"""
+
+    def __init__(self, styles=None, style_names: Optional[Dict[str, str]] = None):
+        """Use ``styles`` (default: the ReportLab sample sheet) through ``style_names``"""
+        self.styles = styles or getSampleStyleSheet()
+        self.style_names = dict(DEFAULT_STYLE_NAMES, **(style_names or {}))
+        self.anchors = set()
+
+    def style(self, role: str):
+        """Style for an emitter role, falling back to the body style"""
+        name = self.style_names.get(role, self.style_names['body'])
+        return self.styles[name] if name in self.styles else self.styles[self.style_names['body']]
+
+    def emit(self, node: Node) -> List:
+        """Return the flowables of a document or any block node
+
+        Headings and list items with an ``id`` become link destinations and
+        headings also PDF bookmarks; links to ``#id`` targets that the
+        document does not define are rendered as plain text.
+        """
+        if node.kind == DOCUMENT:
+            self.anchors = {child.get('id') for child in node.walk()
+                            if child.kind in (HEADING, ITEM) and child.get('id')}
+        flowables = []
+        outline_level = -1
+        for block in (node.children if node.kind == DOCUMENT else [node]):
+            flowable = self._block(block)
+            if flowable is None:
+                continue
+            flowables.append(flowable)
+            if block.kind == HEADING and block.get('id'):
+                # Outline levels may not skip: a level 3 heading under a level 1 one nests one deeper
+                outline_level = min(block.get('level', 1) - 1, outline_level + 1)
+                title = ''.join(child.value or '' for child in block.walk() if child.kind in (TEXT, CODE_SPAN))
+                flowables.append(OutlineEntry(title, block.get('id'), outline_level))
+        return flowables
+
+    def _block(self, node: Node):
+        kind = node.kind
+        if kind == HEADING:
+            anchor = f'<a name="{escape(node.get("id", ""))}"/>' if node.get('id') else ''
+            return Paragraph(anchor + self.markup(node.children), self.style(f"heading{min(node.get('level', 1), 4)}"))
+        if kind == PARAGRAPH:
+            return Paragraph(self.markup(node.children), self.style('body'))
+        if kind == QUOTE:
+            return Paragraph(''.join(self.markup(child.children) for child in node.children), self.style('quote'))
+        if kind == CODE:
+            return Preformatted(node.value, self.style('code'))
+        if kind == LIST:
+            return self._list(node)
+        if kind == TABLE:
+            return self._table(node)
+        if kind == RULE:
+            return HRFlowable(width='100%', thickness=0.5, color=colors.grey)
+        return None
+
+    def _list(self, node: Node) -> ListFlowable:
+        items = []
+        for item in node.children:
+            inline = [child for child in item.children if child.kind != LIST]
+            anchor = f'<a name="{escape(item.get("id"))}"/>' if item.get('id') else ''
+            content = [Paragraph(anchor + self.markup(inline), self.style('body'))]
+            content.extend(self._list(child) for child in item.children if child.kind == LIST)
+            items.append(ListItem(content))
+        return ListFlowable(items, bulletType='1' if node.get('ordered') else 'bullet')
+
+    def _table(self, node: Node) -> Table:
+        data = []
+        for row in node.children:
+            style = self.style('table_header' if row.get('header') else 'table_cell')
+            data.append([Paragraph(self.markup(cell.children), style) for cell in row.children])
+
+        columns = max(len(row) for row in data)
+        for row in data:
+            row.extend([''] * (columns - len(row)))
+
+        table = Table(data, repeatRows=1)
+        table.setStyle(TableStyle(TABLE_STYLE))
+        return table
+
+    def markup(self, nodes: List[Node]) -> str:
+        """ReportLab paragraph markup of inline nodes"""
+        out = []
+        for node in nodes:
+            kind = node.kind
+            if kind == TEXT:
+                out.append(escape(node.value))
+            elif kind == CODE_SPAN:
+                out.append(f'<font face="Courier">{escape(node.value)}</font>')
+            elif kind == STRONG:
+                out.append(f'<b>{self.markup(node.children)}</b>')
+            elif kind == EMPHASIS:
+                out.append(f'<i>{self.markup(node.children)}</i>')
+            elif kind == LINK:
+                url = node.get('url', '')
+                if url.startswith('#') and url[1:] not in self.anchors:
+                    out.append(self.markup(node.children))
+                else:
+                    url = escape(url, {'"': '&quot;'})
+                    out.append(f'<link href="{url}" color="blue">{self.markup(node.children)}</link>')
+        return ''.join(out)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Table Reader for Visual Age Migration PDF Generation
+Streams pipe tables out of markdown into column-oriented storage
+"""
+
+import re
+from typing import Dict, List, Tuple, Iterable, Iterator, Optional, Union
+
+
+TABLE_SEPARATOR = re.compile(r'^\|[-:\s|]+$')
+ESCAPED_PIPE = '\\|'
+
+
+def split_cells(line: str) -> List[Tuple[int, int]]:
+    """Offsets of the raw cells of a pipe table line, without the pipes
+
+    The leading pipe opens the first cell and a trailing pipe closes the
+    last one. A pipe preceded by a backslash belongs to the cell text.
+    """
+    start = line.find('|') + 1
+    end = len(line.rstrip())
+    if end > start and line[end - 1] == '|' and line[end - 2] != '\\':
+        end -= 1
+
+    spans = []
+    position = start
+    while True:
+        pipe = line.find('|', position, end)
+        while pipe > 0 and line[pipe - 1] == '\\':
+            pipe = line.find('|', pipe + 1, end)
+        if pipe == -1:
+            spans.append((start, end))
+            return spans
+        spans.append((start, pipe))
+        start = position = pipe + 1
+
+
+def cell_text(line: str, start: int, end: int) -> str:
+    """Text of one cell with surrounding spaces removed and escaped pipes restored"""
+    text = line[start:end].strip()
+    return text.replace(ESCAPED_PIPE, '|') if ESCAPED_PIPE in text else text
+
+
+def split_row(line: str) -> List[str]:
+    """Cell texts of a pipe table line"""
+    return [cell_text(line, start, end) for start, end in split_cells(line)]
+
+
+def column_alignment(separator: str) -> List[str]:
+    """Column alignments of a table separator row"""
+    alignment = []
+    for sep in split_row(separator.strip()):
+        if sep.startswith(':') and sep.endswith(':'):
+            alignment.append('center')
+        elif sep.endswith(':'):
+            alignment.append('right')
+        else:
+            alignment.append('left')
+    return alignment
+
+
+class ColumnTable:
+    """A markdown table stored as one list of cell texts per column
+
+    Rows shorter than the widest row seen so far are padded with empty
+    cells; a row with more cells adds columns, padded for earlier rows, so
+    every column always has one entry per row.
+    """
+
+    def __init__(self, header: List[str], alignment: List[str], line: int = 0):
+        """Start an empty table; ``line`` is the line number of its header"""
+        self.header = list(header)
+        self.alignment = list(alignment)
+        self.line = line
+        self.columns: List[List[str]] = [[] for _ in self.header]
+        self.row_count = 0
+
+    def append(self, cells: List[str]):
+        """Add one row of cell texts"""
+        for _ in range(len(self.columns), len(cells)):
+            self.header.append('')
+            self.columns.append([''] * self.row_count)
+        for index, column in enumerate(self.columns):
+            column.append(cells[index] if index < len(cells) else '')
+        self.row_count += 1
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def column(self, key: Union[int, str]) -> List[str]:
+        """Cells of a column, by index or header text"""
+        return self.columns[key if isinstance(key, int) else self.header.index(key)]
+
+    def row(self, index: int) -> List[str]:
+        """Cells of one row"""
+        return [column[index] for column in self.columns]
+
+    def rows(self) -> Iterator[List[str]]:
+        """Yield the rows in order"""
+        return (list(row) for row in zip(*self.columns)) if self.columns else iter(())
+
+    def to_dict(self) -> Dict[str, List]:
+        """Row-oriented form used by MarkdownParser.parse_content"""
+        return {
+            'header': self.header,
+            'alignment': self.alignment,
+            'rows': list(self.rows())
+        }
+
+
+def iter_tables(lines: Iterable[str]) -> Iterator[ColumnTable]:
+    """Stream the tables of markdown lines, one table at a time
+
+    A table is a run of lines starting with ``|`` whose second line is a
+    separator row, with at least one body row. Consumes any iterable of
+    lines (an open file works), splits each line once and only holds the
+    table being read, so time is linear and memory is bounded by the
+    largest table. Tables inside fenced code are skipped.
+    """
+    table: Optional[ColumnTable] = None
+    header: Optional[Tuple[int, str]] = None
+    run_length = 0
+    in_fence = False
+
+    for number, line in enumerate(lines, 1):
+        stripped = line.strip()
+
+        if stripped.startswith('```') or stripped.startswith('~~~'):
+            in_fence = not in_fence
+        if in_fence or not stripped.startswith('|'):
+            if table is not None and len(table):
+                yield table
+            table = header = None
+            run_length = 0
+            continue
+
+        run_length += 1
+        if table is not None:
+            table.append(split_row(stripped))
+        elif run_length == 1:
+            header = (number, stripped)
+        elif run_length == 2 and TABLE_SEPARATOR.match(stripped):
+            table = ColumnTable(split_row(header[1]), column_alignment(stripped), header[0])
+
+    if table is not None and len(table):
+        yield table
+
+
+def iter_tables_from_file(file_path: str) -> Iterator[ColumnTable]:
+    """Stream the tables of a markdown file read line by line"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        yield from iter_tables(f)
+
+
+def read_table(lines: Iterable[str]) -> Optional[ColumnTable]:
+    """The first table of some lines, or None"""
+    return next(iter_tables(lines), None)
+
+
+def main():
+    """Main function for testing the table reader"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Stream the tables of a markdown file')
+    parser.add_argument('file', help='Markdown file to read')
+    parser.add_argument('--column', '-c', help='Print only this column (header text) of each table')
+
+    args = parser.parse_args()
+
+    for table in iter_tables_from_file(args.file):
+        if args.column:
+            if args.column in table.header:
+                print('\n'.join(table.column(args.column)))
+            continue
+        print(json.dumps({'line': table.line, 'rows': len(table), 'header': table.header},
+                         ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()